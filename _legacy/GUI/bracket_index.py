@@ -0,0 +1,307 @@
+"""CodeEditor 的括号/引号分析（逐块增量）。
+
+每个块的词法摘要（字符串外的括号、行尾未闭合的引号）由 JsonHighlighter 在重新着色时
+写进 BlockInfo，转义已在词法层面处理。BracketIndex 在此基础上为每个块记下进入/离开时
+的括号栈。栈只记录括号种类（如 "{[{"），不含位置，所以在行内插字、拆行之后，下游块
+的栈通常不变：
+
+- 文档变化只记录受影响的位置范围；从变化处的第一个块向后重新累加，越过变化范围后，
+  一旦某块记录的入栈与新算出的相同，后面的块都不会变，立即停止；
+- 累加在事件循环里按 WALK_SLICE 块一段进行，单次按键的开销有上限；需要结果的查询
+  （problems、光标所在块的配对）会先把累加推进到所需位置；
+- 出错的块登记在一张小表里，problems() 只需遍历这张表；未闭合的括号在累加完成后
+  从末块向前按 low 定位（只读每块的 low，不重放括号），同样分段进行并缓存结果；
+  request_problems() 请求一次检查，结果在这些分段都完成后由 problemsReady 发出；
+- match() 为光标处的括号找配对：按块向前或向后查找，块内深度始终不越过目标深度的块
+  整块跳过，最多查找 MATCH_SCAN_LIMIT 块。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt6 import QtCore, QtGui
+
+from GUI.json_highlighter import BlockInfo, scan_line
+
+
+WALK_SLICE = 2000  # 后台累加每段处理的块数
+MATCH_SCAN_LIMIT = 5000  # 查找配对括号时最多跨越的块数
+
+_OPENER = {"}": "{", "]": "["}
+
+
+class BracketIndex(QtCore.QObject):
+    updated = QtCore.pyqtSignal()  # 一轮累加完成，之前的查询结果可能已变化
+    problemsReady = QtCore.pyqtSignal(list)  # request_problems 的结果，格式同 problems()
+
+    def __init__(self, document: QtGui.QTextDocument) -> None:
+        super().__init__(document)
+        self._doc = document
+        # 尚未累加的字符范围 [dirty_from, dirty_to]；None 表示全部已是最新
+        self._dirty_from: Optional[int] = 0
+        self._dirty_to = document.characterCount()
+        self._error_blocks: Dict[int, Tuple[QtGui.QTextBlock, BlockInfo]] = {}
+        # 未闭合的开括号 [(所在块, 块信息, 括号)]，外层在前；None 表示需要重新定位
+        self._unclosed: Optional[List[Tuple[QtGui.QTextBlock, BlockInfo, str]]] = None
+        # 进行中的定位：(下一个要看的块, 尚未找到的最深层级, 已找到的部分)
+        self._scan: Optional[Tuple[QtGui.QTextBlock, int, List[Tuple[QtGui.QTextBlock, BlockInfo, str]]]] = None
+        self._problems_wanted = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._continue)
+        document.contentsChange.connect(self._on_contents_change)
+        self._timer.start()
+
+    def invalidate(self) -> None:
+        """整篇重新累加（例如整篇重新着色之后，所有 BlockInfo 都已替换）。"""
+        self._dirty_from = 0
+        self._dirty_to = self._doc.characterCount()
+        self._timer.start()
+
+    def request_problems(self) -> None:
+        """请求一次括号/引号检查：累加与未闭合括号的定位都在事件循环里分段完成，之后发出 problemsReady。"""
+        self._problems_wanted = True
+        self._timer.start()
+
+    def ensure(self, position: Optional[int] = None) -> None:
+        """把累加推进到包含 position 的块（None 表示整篇），之后这些块的栈信息可直接读取。"""
+        self._update(until=position)
+
+    def progress(self) -> float:
+        """累加进度（0~1）；1 表示所有块的栈信息都已是最新。"""
+        if self._dirty_from is None:
+            return 1.0
+        return min(1.0, self._dirty_from / max(1, self._doc.characterCount()))
+
+    def _on_contents_change(self, pos: int, removed: int, added: int) -> None:
+        if self._dirty_from is None:
+            self._dirty_from, self._dirty_to = pos, pos + added
+        else:
+            if self._dirty_to >= pos:
+                self._dirty_to = max(self._dirty_to + added - removed, pos + added)
+            else:
+                self._dirty_to = pos + added
+            self._dirty_from = min(self._dirty_from, pos)
+        self._timer.start()
+
+    def _continue(self) -> None:
+        if self._dirty_from is not None:
+            if not self._update(budget=WALK_SLICE):
+                self._timer.start()
+                return
+            self.updated.emit()
+            if self._problems_wanted:
+                self._timer.start()  # 下一段再定位未闭合的括号
+            return
+        if not self._problems_wanted:
+            return
+        if not self._locate_unclosed(budget=WALK_SLICE):
+            self._timer.start()
+            return
+        self._problems_wanted = False
+        self.problemsReady.emit(self.problems())
+
+    def _update(self, until: Optional[int] = None, budget: Optional[int] = None) -> bool:
+        """从第一个未累加的块向后累加。
+
+        until 给出时，处理到包含该位置的块为止；budget 限制本次处理的块数。
+        全部完成返回 True，否则把剩余部分留给后续调用。
+        """
+        if self._dirty_from is None:
+            return True
+        doc = self._doc
+        block = doc.findBlock(self._dirty_from)
+        stack = ""
+        prev = block.previous()
+        if prev.isValid():
+            pinfo = prev.userData()
+            if isinstance(pinfo, BlockInfo) and pinfo.indexed:
+                stack = pinfo.stack_out
+            else:
+                block = doc.firstBlock()
+        dirty_to = self._dirty_to
+        error_blocks = self._error_blocks
+        n = 0
+        while block.isValid():
+            if (budget is not None and n >= budget) or (until is not None and block.position() > until):
+                self._dirty_from = block.position()
+                return False
+            n += 1
+            info = block.userData()
+            if not isinstance(info, BlockInfo):
+                info = scan_line(block.text())
+                block.setUserData(info)
+            elif info.indexed and info.stack_in == stack and block.position() > dirty_to:
+                break  # 与上次结果汇合，后面的块不受影响
+            info.indexed = True
+            info.stack_in = stack
+            if info.brackets or info.open_quote >= 0:
+                low = len(stack)
+                errors: List[Tuple[int, str]] = []
+                for col, ch in info.brackets:
+                    if ch == "{" or ch == "[":
+                        stack += ch
+                    elif not stack or stack[-1] != _OPENER[ch]:
+                        errors.append((col, f"括号不匹配: 意外的 {ch}"))
+                    else:
+                        stack = stack[:-1]
+                        if len(stack) < low:
+                            low = len(stack)
+                if info.open_quote >= 0:
+                    errors.append((info.open_quote, '引号未闭合: "'))
+                info.low = low
+                info.errors = tuple(errors)
+                if errors:
+                    error_blocks[id(info)] = (block, info)
+                else:
+                    error_blocks.pop(id(info), None)
+            else:
+                info.low = len(stack)
+            info.stack_out = stack
+            block = block.next()
+        self._dirty_from = None
+        self._unclosed = None
+        self._scan = None
+        if not self._problems_wanted:
+            self._timer.stop()
+        return True
+
+    def problems(self) -> List[Tuple[int, str]]:
+        """[(行号, 说明)]，按行号排序；与原先整篇扫描的输出格式相同。
+
+        只读取已有的结果，不推进累加：需要最新结果时用 request_problems。
+        """
+        out: List[Tuple[int, str]] = []
+        for key, (block, info) in list(self._error_blocks.items()):
+            if not block.isValid() or block.userData() is not info:
+                del self._error_blocks[key]  # 块已删除或已重新分析
+                continue
+            ln = block.blockNumber() + 1
+            out.extend((ln, msg) for _col, msg in info.errors)
+        for block, info, op in self._unclosed or ():
+            if block.isValid() and block.userData() is info:
+                out.append((block.blockNumber() + 1, f"括号未闭合: {op}"))
+        out.sort(key=lambda p: p[0])
+        return out
+
+    def _locate_unclosed(self, budget: int) -> bool:
+        """从末块向前定位末尾栈中每个开括号所在的块；完成返回 True，否则留待下一段。
+
+        层级 d 的开括号位于最后一个块内深度低于 d 的块：之后的块都不再低于 d，
+        所以该块里 (low, d] 各层的开括号都未闭合，括号种类就是它离开时栈里的对应字符。
+        """
+        if self._unclosed is not None:
+            return True
+        if self._scan is None:
+            last = self._doc.lastBlock()
+            info = last.userData()
+            stack = info.stack_out if isinstance(info, BlockInfo) and info.indexed else ""
+            if not stack:
+                self._unclosed = []
+                return True
+            self._scan = (last, len(stack), [])
+        block, depth, found = self._scan
+        n = 0
+        while depth > 0 and block.isValid():
+            if n >= budget:
+                self._scan = (block, depth, found)
+                return False
+            n += 1
+            info = block.userData()
+            if isinstance(info, BlockInfo) and info.low < depth:
+                for d in range(depth, info.low, -1):
+                    found.append((block, info, info.stack_out[d - 1]))
+                depth = info.low
+            block = block.previous()
+        found.reverse()
+        self._unclosed = found
+        self._scan = None
+        return True
+
+    def match(self, position: int) -> Optional[Tuple[int, int]]:
+        """光标处（优先光标后，其次光标前）的括号及其配对的文档位置；找不到配对返回 None。"""
+        self._update(until=position)
+        block = self._doc.findBlock(position)
+        info = block.userData()
+        if not isinstance(info, BlockInfo) or not info.indexed or not info.brackets:
+            return None
+        col = position - block.position()
+        cols = [c for c, _ch in info.brackets]
+        for target in (col, col - 1):
+            if target in cols:
+                break
+        else:
+            return None
+        i = cols.index(target)
+        ch = info.brackets[i][1]
+        here = block.position() + target
+        if ch in _OPENER:
+            found = self._find_opener(block, info, i)
+            return (found, here) if found is not None else None
+        found = self._find_closer(block, info, i)
+        return (here, found) if found is not None else None
+
+    def _find_closer(self, block: QtGui.QTextBlock, info: BlockInfo, i: int) -> Optional[int]:
+        stack = _replay(info.stack_in, info.brackets[:i]) + info.brackets[i][1]
+        depth = len(stack)
+        rest = info.brackets[i + 1:]
+        for _ in range(MATCH_SCAN_LIMIT):
+            for c, ch in rest:
+                if ch in _OPENER and len(stack) == depth and stack[-1] == _OPENER[ch]:
+                    return block.position() + c
+                stack = _replay(stack, ((c, ch),))
+            block = block.next()
+            if not block.isValid():
+                return None
+            if self._dirty_from is not None and block.position() >= self._dirty_from:
+                # 后面的块尚未累加：先推进一段（查找本身最多 MATCH_SCAN_LIMIT 块）
+                self._update(budget=WALK_SLICE)
+            info = block.userData()
+            if not isinstance(info, BlockInfo):
+                return None
+            if info.low >= depth:
+                rest = ()  # 整块都在目标括号之内
+                continue
+            stack = info.stack_in
+            rest = info.brackets
+        return None
+
+    def _find_opener(self, block: QtGui.QTextBlock, info: BlockInfo, i: int) -> Optional[int]:
+        ch = info.brackets[i][1]
+        stack = _replay(info.stack_in, info.brackets[:i])
+        if not stack or stack[-1] != _OPENER[ch]:
+            return None  # 不配对的闭括号
+        depth = len(stack)
+        brackets = info.brackets[:i]
+        for _ in range(MATCH_SCAN_LIMIT):
+            if len(info.stack_in) < depth or info.low < depth:
+                # 目标开括号在本块内：最后一次从 depth-1 压到 depth 且之后没再弹出的那个
+                stack = info.stack_in
+                found = None
+                for c, b in brackets:
+                    before = len(stack)
+                    stack = _replay(stack, ((c, b),))
+                    if before == depth - 1 and len(stack) == depth:
+                        found = c
+                    elif len(stack) < depth:
+                        found = None
+                if found is not None:
+                    return block.position() + found
+            block = block.previous()
+            if not block.isValid():
+                return None
+            info = block.userData()
+            if not isinstance(info, BlockInfo):
+                return None
+            brackets = info.brackets
+        return None
+
+
+def _replay(stack: str, brackets: Iterable[Tuple[int, str]]) -> str:
+    for _col, ch in brackets:
+        if ch == "{" or ch == "[":
+            stack += ch
+        elif stack and stack[-1] == _OPENER[ch]:
+            stack = stack[:-1]
+    return stack
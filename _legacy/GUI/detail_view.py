@@ -0,0 +1,327 @@
+"""任务详情中的检查点描述列表（虚拟化）。
+
+原先把所有检查点描述拼接后一次性放进 QTextEdit，几百段文字要同步排版。这里改为
+QListView + 自绘 delegate：
+
+- DetailListModel 从一个惰性序列（iter_detail_entries 的生成器）按需取行，
+  视图滚动到末尾时才通过 canFetchMore/fetchMore 再取一块；总行数有上限 MAX_ROWS。
+- DetailDelegate 按字符数估算行高（不排版），只在绘制可见行时排版文字；
+  行高按 (行, 宽度) 缓存在有上限的 LRU 中。
+- 跳转到检查点时只需把序列取到目标行为止，再 scrollTo。
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from math import ceil
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+FETCH_CHUNK = 100  # 每次 fetchMore 取的行数
+MAX_ROWS = 5000  # 单个任务最多展示的行数，超出部分不再取出
+SIZE_CACHE = 2048  # 行高缓存的条目上限
+
+ROLE_ENTRY = QtCore.Qt.ItemDataRole.UserRole
+
+_KIND_LABELS = {"condition": "条件", "travelcondition": "移动条件"}
+
+
+@dataclass(frozen=True)
+class DetailEntry:
+    checkpoint: int  # 检查点序号；没有来源信息时为 -1
+    cp_id: str
+    kind: str  # condition / travelcondition
+    description: str
+    condition: str  # 条件表达式（DSL），可能为空
+
+    @property
+    def header(self) -> str:
+        if self.checkpoint < 0:
+            return ""
+        kind = _KIND_LABELS.get(self.kind, self.kind)
+        return f"#{self.checkpoint} {self.cp_id} · {kind}" if self.cp_id else f"#{self.checkpoint} · {kind}"
+
+
+def iter_detail_entries(obj: Any) -> Iterator[DetailEntry]:
+    """按检查点顺序逐条产出带描述的 condition / travelcondition。"""
+    cps = obj.get("checkpoints") if isinstance(obj, dict) else None
+    if not isinstance(cps, list):
+        return
+    for i, cp in enumerate(cps):
+        if not isinstance(cp, dict):
+            continue
+        cp_id = cp.get("id")
+        for key in ("condition", "travelcondition"):
+            blk = cp.get(key)
+            if not isinstance(blk, dict):
+                continue
+            desc = blk.get("description")
+            if not isinstance(desc, str) or not desc.strip():
+                continue
+            cond = blk.get("condition")
+            yield DetailEntry(i, str(cp_id) if cp_id is not None else "", key, desc.strip(), cond if isinstance(cond, str) else "")
+
+
+def plain_entries(descriptions: Iterable[str]) -> Iterator[DetailEntry]:
+    """只有描述文本（例如文件无法解析时用扫描得到的 descriptions）。"""
+    for d in descriptions:
+        yield DetailEntry(-1, "", "", d, "")
+
+
+class DetailListModel(QtCore.QAbstractListModel):
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._rows: List[DetailEntry] = []
+        self._source: Optional[Iterator[DetailEntry]] = None
+        self._truncated = False
+        # 检查点序号 / id → 第一行，随取行增量建立
+        self._by_index: Dict[int, int] = {}
+        self._by_id: Dict[str, int] = {}
+
+    def set_source(self, entries: Optional[Iterator[DetailEntry]]) -> None:
+        self.beginResetModel()
+        self._rows = []
+        self._source = entries
+        self._truncated = False
+        self._by_index = {}
+        self._by_id = {}
+        self.endResetModel()
+        # 先取一屏，其余等视图滚动时再取
+        if self.canFetchMore(QtCore.QModelIndex()):
+            self.fetchMore(QtCore.QModelIndex())
+
+    @property
+    def truncated(self) -> bool:
+        return self._truncated
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        e = self._rows[index.row()]
+        if role == ROLE_ENTRY:
+            return e
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return e.description
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return e.condition or None
+        return None
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        return not parent.isValid() and self._source is not None
+
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:
+        self._fetch(FETCH_CHUNK)
+
+    def _fetch(self, count: int) -> int:
+        if self._source is None:
+            return 0
+        want = min(count, MAX_ROWS - len(self._rows))
+        chunk = list(islice(self._source, want))
+        if len(chunk) < want:
+            self._source = None  # 序列已取完
+        elif len(self._rows) + len(chunk) >= MAX_ROWS:
+            self._truncated = next(self._source, None) is not None
+            self._source = None
+        if not chunk:
+            return 0
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(chunk) - 1)
+        self._rows.extend(chunk)
+        self.endInsertRows()
+        for row, e in enumerate(chunk, first):
+            if e.checkpoint >= 0:
+                self._by_index.setdefault(e.checkpoint, row)
+                if e.cp_id:
+                    self._by_id.setdefault(e.cp_id, row)
+        return len(chunk)
+
+    def row_for_checkpoint(self, key: str) -> int:
+        """按检查点 id 或序号查找第一行，必要时继续取行；找不到返回 -1。"""
+        key = key.strip()
+        if not key:
+            return -1
+        want_index = int(key) if key.isdigit() else None
+        while True:
+            if key in self._by_id:
+                return self._by_id[key]
+            if want_index is not None:
+                if want_index in self._by_index:
+                    return self._by_index[want_index]
+                if self._rows and self._rows[-1].checkpoint > want_index:
+                    # 该序号没有描述：落到其后第一个有描述的检查点
+                    return bisect_right(self._rows, want_index, key=lambda e: e.checkpoint)
+            if not self._fetch(FETCH_CHUNK * 10):
+                return -1
+
+
+class _Font:
+    """一种字体、换行方式及估算行数所需的度量。
+
+    anywhere=True 用于条件表达式：DSL 表达式没有空格，按词换行会整段溢出，
+    因此改为任意字符处换行，估算也按字符宽度逐行填满计算。
+    """
+
+    def __init__(self, font: QtGui.QFont, anywhere: bool = False) -> None:
+        fm = QtGui.QFontMetrics(font)
+        self.font = font
+        self.anywhere = anywhere
+        self.flags = int(QtCore.Qt.TextFlag.TextWrapAnywhere if anywhere else QtCore.Qt.TextFlag.TextWordWrap)
+        self.line = fm.lineSpacing()
+        self.wide = fm.horizontalAdvance("中")  # CJK 等宽字符
+        self.narrow = fm.averageCharWidth()
+        if anywhere:
+            # 逐字符填满时误差会按字符数累积，改用不取整的字宽（等宽字体约 7.2px 而不是 7px）
+            fmf = QtGui.QFontMetricsF(font)
+            self.wide = fmf.horizontalAdvance("中")
+            self.narrow = max(fmf.horizontalAdvance("M"), fmf.averageCharWidth())
+
+    def height(self, text: str, width: int) -> int:
+        """按字符数估算自动换行后的高度，不做文字排版（逐行 shaping 每段要几十微秒）。"""
+        lines = 0
+        for para in text.split("\n"):
+            n = len(para)
+            wide = (len(para.encode("utf-8")) - n) // 2  # 非 ASCII 字符多为 3 字节
+            est = wide * self.wide + (n - wide) * self.narrow
+            if self.anywhere:
+                # 任意处换行时每行最多浪费不到一个字符宽
+                lines += max(1, ceil(est / max(1, width - self.wide)))
+            else:
+                lines += max(1, ceil(est * 1.1 / width))  # 按词换行会浪费行尾，留一点余量
+        return lines * self.line
+
+
+class DetailDelegate(QtWidgets.QStyledItemDelegate):
+    """三段式绘制：标题行（粗体）、描述（自动换行）、条件表达式（灰色）。
+
+    行高由字符数估算，视图一次布局即可得到所有行的位置，跳转到任意行不必等待逐行排版；
+    真正的文字排版只发生在 paint 中，也就是只针对可见行。
+    """
+
+    PAD = 6
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._sizes: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._font_key = ""
+        self._fonts: Tuple[_Font, _Font, _Font] | None = None
+
+    def clear_cache(self) -> None:
+        self._sizes.clear()
+
+    def _font_set(self, option: QtWidgets.QStyleOptionViewItem) -> Tuple[_Font, _Font, _Font]:
+        key = option.font.key()
+        if self._fonts is None or key != self._font_key:
+            base = QtGui.QFont(option.font)
+            bold = QtGui.QFont(base)
+            bold.setBold(True)
+            mono = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont)
+            mono.setPointSizeF(base.pointSizeF())
+            self._fonts = (_Font(bold), _Font(base), _Font(mono, anywhere=True))
+            self._font_key = key
+            self._sizes.clear()
+        return self._fonts
+
+    def _layout(self, e: DetailEntry, option: QtWidgets.QStyleOptionViewItem, width: int) -> List[Tuple[_Font, str, QtCore.QRect]]:
+        bold, base, mono = self._font_set(option)
+        parts = []
+        if e.header:
+            parts.append((bold, e.header))
+        parts.append((base, e.description))
+        if e.condition:
+            parts.append((mono, e.condition))
+        out = []
+        y = self.PAD
+        for f, text in parts:
+            h = f.height(text, width)
+            out.append((f, text, QtCore.QRect(self.PAD, y, width, h)))
+            y += h + 2
+        return out
+
+    def _text_width(self, option: QtWidgets.QStyleOptionViewItem) -> int:
+        # sizeHint 调用时 option.rect 未必有宽度，以视口宽度为准
+        view = option.widget
+        full = view.viewport().width() if isinstance(view, QtWidgets.QAbstractItemView) else option.rect.width()
+        return max(80, full - 2 * self.PAD)
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        width = self._text_width(option)
+        key = (index.row(), width)
+        h = self._sizes.get(key)
+        if h is None:
+            e: DetailEntry = index.data(ROLE_ENTRY)
+            parts = self._layout(e, option, width)
+            h = parts[-1][2].bottom() + self.PAD if parts else self.PAD * 2
+            self._sizes[key] = h
+            if len(self._sizes) > SIZE_CACHE:
+                self._sizes.popitem(last=False)
+        else:
+            self._sizes.move_to_end(key)
+        return QtCore.QSize(width, h)
+
+    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> None:
+        e: DetailEntry = index.data(ROLE_ENTRY)
+        if e is None:
+            return
+        painter.save()
+        style = option.widget.style() if option.widget else QtWidgets.QApplication.style()
+        style.drawPrimitive(QtWidgets.QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        width = self._text_width(option)
+        pal = option.palette
+        selected = bool(option.state & QtWidgets.QStyle.StateFlag.State_Selected)
+        text_color = pal.highlightedText().color() if selected else pal.text().color()
+        dim = pal.color(QtGui.QPalette.ColorGroup.Disabled, QtGui.QPalette.ColorRole.Text)
+        parts = self._layout(e, option, width)
+        for i, (f, text, rect) in enumerate(parts):
+            painter.setFont(f.font)
+            is_cond = bool(e.condition) and i == len(parts) - 1
+            painter.setPen(dim if is_cond and not selected else text_color)
+            painter.drawText(rect.translated(option.rect.topLeft()), f.flags, text)
+        # 行间分隔线
+        painter.setPen(pal.color(QtGui.QPalette.ColorRole.Mid))
+        painter.drawLine(option.rect.bottomLeft(), option.rect.bottomRight())
+        painter.restore()
+
+
+class MissionDetailView(QtWidgets.QListView):
+    """只绘制可见行的检查点描述列表。"""
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._model = DetailListModel(self)
+        self._delegate = DetailDelegate(self)
+        self.setModel(self._model)
+        self.setItemDelegate(self._delegate)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+
+    @property
+    def detail_model(self) -> DetailListModel:
+        return self._model
+
+    def set_entries(self, entries: Optional[Iterator[DetailEntry]]) -> None:
+        self._delegate.clear_cache()
+        self._model.set_source(entries)
+        self.scrollToTop()
+
+    def scroll_to_checkpoint(self, key: str) -> bool:
+        row = self._model.row_for_checkpoint(key)
+        if row < 0:
+            return False
+        idx = self._model.index(row)
+        self.setCurrentIndex(idx)
+        self.scrollTo(idx, QtWidgets.QAbstractItemView.ScrollHint.PositionAtTop)
+        return True
+
+    def resizeEvent(self, e: QtGui.QResizeEvent) -> None:
+        if e.size().width() != e.oldSize().width():
+            self._delegate.clear_cache()
+        super().resizeEvent(e)
@@ -0,0 +1,98 @@
+"""大文件的分块载入。
+
+一次性 read_text + setPlainText 会让高亮器在同一次调用里为整篇文档着色，几 MB 的
+任务文件会让界面停住数秒。超过 LARGE_FILE_BYTES 的文件改由 DocumentLoader 载入：
+
+- 文件以 mmap 只读映射，每次只解码 CHUNK_BYTES 左右的一段（在换行处切开，UTF-8 多字节
+  字符与 \\r\\n 都不会被切断），不必同时持有整个字节串和整篇字符串；
+- 每段在事件循环的一次回调里追加到文档末尾，高亮器只处理新追加的块，单次回调的开销
+  有上限，首屏内容立即可见；
+- 换行按 read_text 的规则统一为 \\n，载入结果与小文件路径完全一致；
+- 载入期间关闭撤销记录，整个载入过程不会进入撤销栈。
+"""
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from PyQt6 import QtCore, QtGui
+
+
+LARGE_FILE_BYTES = 2 * 1024 * 1024  # 超过此大小的文件按大文件模式打开
+CHUNK_BYTES = 32 * 1024  # 每次回调追加的字节数（约一千行）
+
+
+def is_large_file(path: Path) -> bool:
+    """文件是否应按大文件模式打开；无法读取大小时抛出 OSError。"""
+    return Path(path).stat().st_size > LARGE_FILE_BYTES
+
+
+class DocumentLoader(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, int)  # 已载入字节数, 总字节数
+    finished = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, document: QtGui.QTextDocument, path: Path, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._doc = document
+        self._path = Path(path)
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pos = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+    def start(self) -> None:
+        try:
+            self._file = open(self._path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self._close()
+            self.failed.emit(str(e))
+            return
+        self._doc.setUndoRedoEnabled(False)
+        self._doc.clear()
+        self._pos = 0
+        self._timer.start()
+
+    def cancel(self) -> None:
+        if self._map is not None:
+            self._timer.stop()
+            self._close()
+            self._doc.setUndoRedoEnabled(True)
+
+    def _step(self) -> None:
+        mm = self._map
+        if mm is None:
+            return
+        end = mm.find(b"\n", self._pos + CHUNK_BYTES)
+        end = len(mm) if end < 0 else end + 1
+        try:
+            chunk = mm[self._pos:end].decode("utf-8")
+        except UnicodeDecodeError as e:
+            self.cancel()
+            self.failed.emit(str(e))
+            return
+        cur = QtGui.QTextCursor(self._doc)
+        cur.movePosition(QtGui.QTextCursor.MoveOperation.End)
+        cur.insertText(chunk.replace("\r\n", "\n").replace("\r", "\n"))
+        self._pos = end
+        self.progress.emit(end, len(mm))
+        if end < len(mm):
+            self._timer.start()
+            return
+        self._close()
+        self._doc.setUndoRedoEnabled(True)
+        self._doc.setModified(False)
+        self.finished.emit()
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,293 @@
+"""CodeEditor 的结构折叠（基于 BracketIndex 的逐块括号栈）。
+
+折叠区域直接由 JSON 结构得出，不在全文里找花括号：
+
+- 某块离开时的括号栈比块内到达过的最小深度（low）更深，说明本行打开了一个跨行的
+  对象/数组，它就是一个折叠区域的起始块，层级为 low + 1；
+- 区域在之后第一个 low 小于该层级的块结束（即闭括号所在行），该行保持可见；
+- 区域起始块上记有该括号所属的键（BlockInfo.key），可按键折叠，例如折叠
+  ``"checkpoints"`` 下的每个元素。
+
+这些块级信息随 BracketIndex 增量更新。已折叠的起始块登记在一张小表里，块的可见性
+始终满足“位于某个已折叠区域内部即隐藏”，重新计算时只需按块顺序走一遍，记住当前
+所在的最外层已折叠区域的层级；按层级、按键折叠时，登记与重设可见性在同一遍里完成。
+普通的按键不会触发重算；只有编辑落在已折叠区域的起始行、内部或结束行上时，才在
+事件循环里从变化处重算，直到可见性不再变化为止。
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt6 import QtCore, QtGui
+
+from GUI.bracket_index import BracketIndex
+from GUI.json_highlighter import BlockInfo
+
+
+def _opens(info: object) -> bool:
+    # 本块打开了一个到行尾仍未闭合的括号
+    return isinstance(info, BlockInfo) and info.indexed and len(info.stack_out) > info.low
+
+
+class FoldIndex(QtCore.QObject):
+    changed = QtCore.pyqtSignal()  # 有块的可见性发生了变化
+
+    def __init__(self, document: QtGui.QTextDocument, brackets: BracketIndex) -> None:
+        super().__init__(document)
+        self._doc = document
+        self._brackets = brackets
+        self._folded: Dict[int, Tuple[QtGui.QTextBlock, BlockInfo]] = {}
+        # 待重算的字符范围 [changed_from, changed_to]，由编辑累积
+        self._changed_from = 0
+        self._changed_to = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._rebuild)
+        document.contentsChange.connect(self._on_contents_change)
+
+    # ---- 查询 ----
+
+    def is_foldable(self, block: QtGui.QTextBlock) -> bool:
+        """block 打开的区域里至少有一行可以隐藏（只看下一块，供绘制折叠标记使用）。"""
+        info = block.userData()
+        if not _opens(info):
+            return False
+        nxt = block.next().userData()
+        return isinstance(nxt, BlockInfo) and nxt.indexed and nxt.low > info.low
+
+    def is_folded(self, block: QtGui.QTextBlock) -> bool:
+        info = block.userData()
+        entry = self._folded.get(id(info))
+        return entry is not None and entry[1] is info
+
+    def region(self, block: QtGui.QTextBlock) -> Optional[Tuple[QtGui.QTextBlock, int]]:
+        """block 打开的区域的 (结束块, 层级)；不是区域起始块、或括号未闭合时返回 None。"""
+        self._brackets.ensure()
+        info = block.userData()
+        if not _opens(info):
+            return None
+        level = info.low + 1
+        end = block.next()
+        while end.isValid():
+            einfo = end.userData()
+            if not isinstance(einfo, BlockInfo):
+                return None
+            if einfo.low < level:
+                return end, level
+            end = end.next()
+        return None
+
+    def enclosing(self, block: QtGui.QTextBlock) -> Optional[QtGui.QTextBlock]:
+        """包含 block 的最内层区域的起始块（block 本身是起始块时返回它自己）。"""
+        self._brackets.ensure(block.position())
+        info = block.userData()
+        if not isinstance(info, BlockInfo):
+            return None
+        if self.is_foldable(block):
+            return block
+        depth = info.low
+        if depth == 0:
+            return None
+        # 向前找第一个块内深度低于 depth 的块：目标开括号就在那一块里
+        start = block.previous()
+        while start.isValid():
+            sinfo = start.userData()
+            if not isinstance(sinfo, BlockInfo):
+                return None
+            if sinfo.low < depth:
+                return start if _opens(sinfo) else None
+            start = start.previous()
+        return None
+
+    def rekey(self) -> None:
+        """整篇重新着色后所有 BlockInfo 都已替换：按块把已折叠的起始块登记到新的 BlockInfo 上。
+
+        重新着色不改变文本，也不会触发 contentsChange，块的可见性保持不变，只需换登记的键。
+        """
+        folded: Dict[int, Tuple[QtGui.QTextBlock, BlockInfo]] = {}
+        for block, _info in self._folded.values():
+            if block.isValid():
+                info = block.userData()
+                if isinstance(info, BlockInfo):
+                    folded[id(info)] = (block, info)
+        self._folded = folded
+
+    # ---- 折叠/展开 ----
+
+    def fold(self, block: QtGui.QTextBlock) -> bool:
+        found = self.region(block)
+        if found is None or found[0].blockNumber() - block.blockNumber() < 2:
+            return False
+        info = block.userData()
+        self._folded[id(info)] = (block, info)
+        self._apply(block, found[0])
+        return True
+
+    def unfold(self, block: QtGui.QTextBlock) -> bool:
+        info = block.userData()
+        if self._folded.pop(id(info), None) is None:
+            return False
+        found = self.region(block)
+        self._apply(block, found[0] if found is not None else None)
+        return True
+
+    def toggle(self, block: QtGui.QTextBlock) -> bool:
+        return self.unfold(block) if self.is_folded(block) else self.fold(block)
+
+    def fold_level(self, level: int) -> int:
+        """折叠所有第 level 层（1 为最外层）的区域，返回新折叠的个数。"""
+        self._brackets.ensure()
+        return self._apply(self._doc.firstBlock(), match=lambda _block, info: info.low + 1 == level)
+
+    def fold_key(self, key: str, children: bool = False) -> int:
+        """折叠键为 key 的值；children 为 True 时改为折叠该值里的每个元素（如每个 checkpoint）。"""
+        self._brackets.ensure()
+        if not children:
+            return self._apply(self._doc.firstBlock(), match=lambda _block, info: info.key == key)
+        parent = 0  # 正在其中的 key 区域的层级，0 表示不在其中
+
+        def match(_block: QtGui.QTextBlock, info: BlockInfo) -> bool:
+            nonlocal parent
+            level = info.low + 1
+            if parent and level <= parent:
+                parent = 0
+            if not parent and info.key == key:
+                parent = level
+                return False
+            return parent > 0 and level == parent + 1
+
+        return self._apply(self._doc.firstBlock(), match=match)
+
+    def unfold_all(self) -> None:
+        self._folded.clear()
+        block = self._doc.firstBlock()
+        first: Optional[QtGui.QTextBlock] = None
+        last = block
+        while block.isValid():
+            if not block.isVisible():
+                block.setVisible(True)
+                if first is None:
+                    first = block
+                last = block
+            block = block.next()
+        if first is not None:
+            self._mark_dirty(first, last)
+
+    def reveal(self, block: QtGui.QTextBlock) -> None:
+        """展开所有把 block 藏起来的区域。"""
+        while block.isValid() and not block.isVisible():
+            header = block.previous()
+            while header.isValid() and not header.isVisible():
+                header = header.previous()
+            if not header.isValid() or not self.unfold(header):
+                # 可见性与登记表不一致（不应发生）：整篇重算
+                self._folded.clear()
+                self._apply(self._doc.firstBlock())
+                return
+
+    # ---- 内部 ----
+
+    def _apply(self, first: QtGui.QTextBlock, last: Optional[QtGui.QTextBlock] = None,
+               match: Optional[Callable[[QtGui.QTextBlock, BlockInfo], bool]] = None,
+               settle_after: int = -1) -> int:
+        """按登记表重设 [first, last]（last 为 None 时到文档末尾）内各块的可见性。
+
+        first 必须位于所有已折叠区域之外。给出 match 时，途经的每个区域起始块都交给它
+        判断，为真则登记为已折叠，登记与重设可见性在同一遍里完成。给出 settle_after
+        （块号）时，越过该块后一旦遇到不在折叠区域内、可见性也无需改动的块即停止：
+        后面的块不受之前编辑的影响。返回新登记的个数。
+        """
+        folded = self._folded
+        number = first.blockNumber()
+        stop = last.blockNumber() if last is not None else -1
+        depth = 0  # 所在的最外层已折叠区域的层级，0 表示不在其中；内层区域不影响可见性
+        added = 0
+        block = first
+        changed_first: Optional[QtGui.QTextBlock] = None
+        changed_last = first
+        while block.isValid():
+            info = block.userData()
+            if isinstance(info, BlockInfo):
+                if depth and info.low < depth:
+                    depth = 0
+                hidden = depth > 0
+                if info.indexed and len(info.stack_out) > info.low:
+                    key = id(info)
+                    if key in folded:
+                        if not hidden:
+                            depth = info.low + 1
+                    elif match is not None and match(block, info):
+                        nxt = block.next().userData()
+                        if isinstance(nxt, BlockInfo) and nxt.low > info.low:
+                            folded[key] = (block, info)
+                            added += 1
+                            if not hidden:
+                                depth = info.low + 1
+            else:
+                hidden = depth > 0
+            if block.isVisible() == hidden:
+                block.setVisible(not hidden)
+                if changed_first is None:
+                    changed_first = block
+                changed_last = block
+            elif not hidden and not depth and 0 <= settle_after < number:
+                break
+            if number == stop:
+                break
+            number += 1
+            block = block.next()
+        if changed_first is not None:
+            self._mark_dirty(changed_first, changed_last)
+        return added
+
+    def _mark_dirty(self, first: QtGui.QTextBlock, last: QtGui.QTextBlock) -> None:
+        # 只让可见性变化的块重新布局
+        start = first.position()
+        self._doc.markContentsDirty(start, last.position() + last.length() - start)
+        self.changed.emit()
+
+    def _on_contents_change(self, pos: int, removed: int, added: int) -> None:
+        if not self._folded:
+            return
+        if self._timer.isActive():
+            # 已有待重算的范围：合并进去
+            if self._changed_to >= pos:
+                self._changed_to = max(self._changed_to + added - removed, pos + added)
+            else:
+                self._changed_to = pos + added
+            self._changed_from = min(self._changed_from, pos)
+            return
+        # 编辑落在已折叠区域的起始行（下一块隐藏）、内部或结束行（上一块隐藏）上时才需重算
+        block = self._doc.findBlock(pos)
+        stop = self._doc.findBlock(pos + added).blockNumber()
+        while block.isValid():
+            prev, nxt = block.previous(), block.next()
+            if (not block.isVisible() or (prev.isValid() and not prev.isVisible())
+                    or (nxt.isValid() and not nxt.isVisible())):
+                self._changed_from, self._changed_to = pos, pos + added
+                self._timer.start()
+                return
+            if block.blockNumber() >= stop:
+                return
+            block = block.next()
+
+    def _rebuild(self) -> None:
+        self._brackets.ensure()
+        for key, (block, info) in list(self._folded.items()):
+            if block.isValid() and block.userData() is info:
+                continue
+            del self._folded[key]
+            # 起始行被重新分析过：只要它仍处于折叠状态（下一块隐藏）且仍打开区域，就保留折叠
+            if block.isValid() and block.isVisible() and not block.next().isVisible():
+                ninfo = block.userData()
+                if _opens(ninfo):
+                    self._folded[id(ninfo)] = (block, ninfo)
+        # 从变化处之前最近的可见块（编辑前就位于所有折叠区域之外）开始，重算到结果稳定为止
+        doc = self._doc
+        first = doc.findBlock(self._changed_from)
+        while first.isValid() and not first.isVisible():
+            first = first.previous()
+        if not first.isValid():
+            first = doc.firstBlock()
+        self._apply(first, settle_after=doc.findBlock(self._changed_to).blockNumber())
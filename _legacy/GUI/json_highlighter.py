@@ -0,0 +1,221 @@
+"""CodeEditor 的 JSON 语法高亮（逐块增量）。
+
+QSyntaxHighlighter 只对被编辑的块调用 highlightBlock；若某块结束时的状态
+（currentBlockState）与上次不同，Qt 才会继续处理下一块，直到状态不再变化。因此块
+状态里只放真正会影响下一行词法的信息：
+
+- JSON 字符串不能跨行，行尾未闭合的字符串按错误标出，不把“在字符串内”带到下一行，
+  否则敲一个引号就会让其后的整篇文档重新着色；
+- 唯一跨行的上下文是 ``"condition":`` 之后、值写在下一行的情况（_EXPECT_CONDITION）。
+
+嵌套深度不进块状态（每插入一个括号都会让下游所有块的状态改变），而是以本块内的括号
+序列存进 BlockInfo（QTextBlockUserData），括号栈由 BracketIndex 按块累加。
+
+``"condition"`` 键的字符串值按条件 DSL 着色：原子、SubCondition 引用、运算符、数值。
+
+顺带记下每行的缩进层级，供编辑器绘制缩进引导线时直接读取，不必每次重绘都逐字符数空白；
+以及本行第一个作为键值打开的括号所属的键（如 ``"checkpoints": [``），供按键折叠使用。
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6 import QtGui
+
+from src.condition_dsl import SUBCONDITION_PREFIX, scan_tokens
+
+
+_EXPECT_CONDITION = 1  # 上一行以 "condition": 结尾，值在本行
+
+TAB_WIDTH = 4  # 编辑器的制表位宽度（空格数），也是一个缩进层级的宽度
+
+_LINE_RE = re.compile(
+    r'(?P<str>"(?:[^"\\]|\\.)*(?P<close>")?)'
+    r"|(?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)"
+    r"|(?P<kw>true|false|null)\b"
+    r"|(?P<br>[{}\[\]])"
+    r"|(?P<colon>:)"
+    r"|(?P<comma>,)"
+    r"|(?P<ws>\s+)"
+    r"|(?P<bad>.)"
+)
+_KEY_COLON_RE = re.compile(r"\s*:")
+
+# (浅色主题, 深色主题)
+_COLORS: Dict[str, Tuple[str, str]] = {
+    "key": ("#0451a5", "#9cdcfe"),
+    "string": ("#a31515", "#ce9178"),
+    "number": ("#098658", "#b5cea8"),
+    "keyword": ("#0000ff", "#569cd6"),
+    "dsl_ident": ("#795e26", "#dcdcaa"),
+    "dsl_ref": ("#267f99", "#4ec9b0"),
+    "dsl_op": ("#af00db", "#c586c0"),
+}
+
+
+class BlockInfo(QtGui.QTextBlockUserData):
+    """一个块的摘要：字符串外的括号 (列, 字符)、行尾未闭合引号的列（无则为 -1）、缩进层级，
+    以及本行第一个以键值形式打开的括号所属的键（无则为 None）。
+
+    indexed 之后的字段由 BracketIndex 填写；块被重新分析时整个 BlockInfo 会被替换，
+    这些字段也就随之失效。
+
+    每个块都有一个实例，大文件里有几十万个：用 __slots__ 免去实例字典，括号与错误存成
+    元组，使每块只留下一个受循环垃圾回收跟踪的对象，否则整代回收的停顿会随文档变长。
+    """
+
+    __slots__ = ("brackets", "open_quote", "indent_level", "key", "indexed", "stack_in", "stack_out", "low", "errors")
+
+    def __init__(self, brackets: Tuple[Tuple[int, str], ...], open_quote: int, indent_level: int, key: Optional[str] = None) -> None:
+        super().__init__()
+        self.brackets = brackets
+        self.open_quote = open_quote
+        self.indent_level = indent_level
+        self.key = key
+        self.indexed = False
+        self.stack_in = ""  # 进入/离开本块时的括号栈，如 "{[{"
+        self.stack_out = ""
+        self.low = 0  # 块内括号栈到达过的最小深度
+        self.errors: Tuple[Tuple[int, str], ...] = ()
+
+
+def block_info(block: QtGui.QTextBlock) -> Optional[BlockInfo]:
+    data = block.userData()
+    return data if isinstance(data, BlockInfo) else None
+
+
+def indent_level(text: str) -> int:
+    """行首空白折算成的缩进层级（制表符按 TAB_WIDTH 个空格计）。"""
+    body = text.lstrip(" \t")
+    lead = len(text) - len(body)
+    if not lead:
+        return 0
+    return (lead + text.count("\t", 0, lead) * (TAB_WIDTH - 1)) // TAB_WIDTH
+
+
+def scan_line(text: str) -> BlockInfo:
+    """只做括号/引号分析、不着色的词法扫描，用于没有挂高亮器的文档。"""
+    brackets: List[Tuple[int, str]] = []
+    open_quote = -1
+    key: Optional[str] = None
+    pending: Optional[str] = None  # 刚读到的键，等待它的值
+    for m in _LINE_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "ws" or kind == "colon":
+            continue
+        if kind == "br":
+            ch = m.group(kind)
+            brackets.append((m.start(), ch))
+            if pending is not None and key is None and ch in "{[":
+                key = pending
+        elif kind == "str":
+            if m.group("close") is None:
+                open_quote = m.start()
+            elif _KEY_COLON_RE.match(text, m.end()):
+                pending = m.group(kind)[1:-1]
+                continue
+        pending = None
+    return BlockInfo(tuple(brackets), open_quote, indent_level(text), key)
+
+
+def _make_formats(dark: bool) -> Dict[str, QtGui.QTextCharFormat]:
+    formats: Dict[str, QtGui.QTextCharFormat] = {}
+    for kind, colors in _COLORS.items():
+        fmt = QtGui.QTextCharFormat()
+        fmt.setForeground(QtGui.QColor(colors[1] if dark else colors[0]))
+        formats[kind] = fmt
+    formats["dsl_ref"].setFontWeight(QtGui.QFont.Weight.Bold)
+    formats["dsl_num"] = formats["number"]
+    err = QtGui.QTextCharFormat()
+    err.setUnderlineStyle(QtGui.QTextCharFormat.UnderlineStyle.WaveUnderline)
+    err.setUnderlineColor(QtGui.QColor(230, 60, 60))
+    formats["error"] = err
+    formats["dsl_error"] = err
+    return formats
+
+
+class JsonHighlighter(QtGui.QSyntaxHighlighter):
+    def __init__(self, document: QtGui.QTextDocument, dark: bool = False) -> None:
+        super().__init__(document)
+        self._dark = dark
+        self._formats = _make_formats(dark)
+
+    @property
+    def dark(self) -> bool:
+        return self._dark
+
+    def set_dark(self, dark: bool) -> None:
+        """切换配色；只有配色真正变化时才整篇重新着色。"""
+        if dark == self._dark:
+            return
+        self._dark = dark
+        self._formats = _make_formats(dark)
+        self.rehighlight()
+
+    def highlightBlock(self, text: str) -> None:
+        fmts = self._formats
+        expect_cond = self.previousBlockState() == _EXPECT_CONDITION
+        brackets: List[Tuple[int, str]] = []
+        open_quote = -1
+        key: Optional[str] = None
+        pending: Optional[str] = None  # 刚读到的键，等待它的值
+        for m in _LINE_RE.finditer(text):
+            kind = m.lastgroup
+            if kind == "ws":
+                continue
+            start = m.start()
+            if kind == "str":
+                end = m.end()
+                if m.group("close") is None:
+                    open_quote = start
+                    self.setFormat(start, end - start, fmts["error"])
+                    expect_cond = False
+                    pending = None
+                    continue
+                if _KEY_COLON_RE.match(text, end):
+                    self.setFormat(start, end - start, fmts["key"])
+                    expect_cond = m.group(kind) == '"condition"'
+                    pending = m.group(kind)[1:-1]
+                    continue
+                self.setFormat(start, end - start, fmts["string"])
+                if expect_cond:
+                    self._highlight_condition(m.group(kind)[1:-1], start + 1)
+                expect_cond = False
+                pending = None
+                continue
+            if kind == "colon":
+                continue
+            expect_cond = False
+            if kind == "br":
+                ch = m.group(kind)
+                brackets.append((start, ch))
+                if pending is not None and key is None and ch in "{[":
+                    key = pending
+                pending = None
+                continue
+            pending = None
+            if kind == "num":
+                self.setFormat(start, m.end() - start, fmts["number"])
+            elif kind == "kw":
+                self.setFormat(start, m.end() - start, fmts["keyword"])
+            elif kind == "bad":
+                self.setFormat(start, 1, fmts["error"])
+        self.setCurrentBlockState(_EXPECT_CONDITION if expect_cond else 0)
+        self.setCurrentBlockUserData(BlockInfo(tuple(brackets), open_quote, indent_level(text), key))
+
+    def _highlight_condition(self, expr: str, offset: int) -> None:
+        fmts = self._formats
+        for kind, start, end in scan_tokens(expr):
+            if kind == "ident":
+                name = expr[start:end]
+                fmt = fmts["dsl_ref"] if name.startswith(SUBCONDITION_PREFIX) else fmts["dsl_ident"]
+            elif kind == "cmp" or (kind == "punct" and expr[start] == "!"):
+                fmt = fmts["dsl_op"]
+            elif kind == "num":
+                fmt = fmts["dsl_num"]
+            elif kind == "error":
+                fmt = fmts["dsl_error"]
+            else:
+                continue
+            self.setFormat(offset + start, end - start, fmt)
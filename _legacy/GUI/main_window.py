@@ -19,10 +19,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self._init_ui()
         # 初始语言/主题从设置读取并应用
         try:
-            from src.settings_manager import load_settings
-            s = load_settings()
-            self.apply_language(s.get("language", "zh-CN"))
-            self.apply_theme(s.get("theme", "light"))
+            from src.settings_manager import settings_store
+            store = settings_store()
+            self.apply_language(store.get("language", "zh-CN"))
+            self.apply_theme(store.get("theme", "light"))
         except Exception:
             pass
 
@@ -105,6 +105,15 @@ class MainWindow(QtWidgets.QMainWindow):
                 except Exception:
                     pass
 
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        # 退出前把尚未落盘的设置修改写出去
+        try:
+            from src.settings_manager import settings_store
+            settings_store().flush()
+        except Exception:
+            pass
+        super().closeEvent(event)
+
 
 def create_app() -> QtWidgets.QApplication:
     import sys
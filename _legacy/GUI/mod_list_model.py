@@ -0,0 +1,540 @@
+"""Mod 列表的 model/view 实现。
+
+ModListModel 是两层树：分组（传送门 / 各 stage / 其他）→ 任务。分组与任务的排序键、
+搜索用的小写文本都在载入时算好；勾选状态变化只发出受影响行与其分组的 dataChanged，
+分组的三态与标题中的“启用/总数”由每组维护的计数直接得出，不需要遍历子项；
+切换一项是 O(1)，批量切换按组累加增量。后台分批载入时用 merge_mods
+增量合并（原地更新或成段插入），不重置模型。
+
+ModFilterProxy 负责搜索过滤：命中的文件名集合由 GUI.search_worker 在工作线程中算出，
+filterAcceptsRow 只做集合查找。应用新结果时只对可见性变化的行（及分组）发出 dataChanged，
+代理据此只插入/移除这些行；变化过大时才整体重新过滤。
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from PyQt6 import QtCore
+
+from src.mod_manager import ModInfo, natural_key
+
+
+ROLE_FILENAME = QtCore.Qt.ItemDataRole.UserRole
+ROLE_VERSION = QtCore.Qt.ItemDataRole.UserRole + 1
+ROLE_AUTHOR = QtCore.Qt.ItemDataRole.UserRole + 2
+ROLE_DESCRIPTIONS = QtCore.Qt.ItemDataRole.UserRole + 3
+ROLE_GROUP_KEY = QtCore.Qt.ItemDataRole.UserRole + 10
+
+# 视图布局时会对每个可见项调用 flags()，这里预先算好，避免每次做枚举运算
+_GROUP_FLAGS = (
+    QtCore.Qt.ItemFlag.ItemIsEnabled
+    | QtCore.Qt.ItemFlag.ItemIsSelectable
+    | QtCore.Qt.ItemFlag.ItemIsUserCheckable
+)
+# 任务行声明“永无子项”，QTreeView 布局时不再逐行询问 hasChildren/rowCount
+_ROW_FLAGS = _GROUP_FLAGS | QtCore.Qt.ItemFlag.ItemNeverHasChildren
+
+# 启用状态变化时需要刷新的角色：分组的标题里带有启用计数
+_ROW_ROLES = [QtCore.Qt.ItemDataRole.CheckStateRole]
+_GROUP_ROLES = [QtCore.Qt.ItemDataRole.CheckStateRole, QtCore.Qt.ItemDataRole.DisplayRole]
+
+# 一次插入超过这么多个不连续的段时，改为追加到组末尾后整体排序（layoutChanged）
+_MAX_INSERT_SEGMENTS = 32
+
+GROUP_WARP = "__warp__"
+GROUP_OTHER = "__other__"
+
+STAGE_LABELS = {
+    "Alley": "小巷Alley",
+    "Apartment": "公寓Apartment",
+    "Convenience": "便利店Convenience",
+    "Downtown": "市中心Downtown",
+    "Mall": "商场Mall",
+    "Park": "公园Park",
+    "Residential": "住宅Residential",
+    "Shop": "商店Shop",
+    "Toilet": "厕所Toilet",
+}
+
+
+def display_group_name(stage: str) -> str:
+    # 仅替换展示，不改动原值
+    return STAGE_LABELS.get(stage, stage)
+
+
+@dataclass
+class ModRow:
+    filename: str
+    text: str
+    enabled: bool
+    version: Optional[str]
+    author: Optional[str]
+    descriptions: List[str]
+    stage: Optional[str]
+    is_warp: bool
+    haystack: str  # 小写的 "标题\n文件名"，搜索时直接做子串判断
+    sort_key: Tuple
+
+
+@dataclass
+class ModGroup:
+    key: str  # GROUP_WARP / stage 原值 / GROUP_OTHER
+    label: str
+    row: int = 0  # 在顶层中的行号
+    rows: List[ModRow] = field(default_factory=list)
+    enabled: int = 0  # 已启用的子项数
+
+    @property
+    def check_state(self) -> QtCore.Qt.CheckState:
+        if self.enabled == 0:
+            return QtCore.Qt.CheckState.Unchecked
+        if self.enabled == len(self.rows):
+            return QtCore.Qt.CheckState.Checked
+        return QtCore.Qt.CheckState.PartiallyChecked
+
+
+def _group_key(m: ModInfo) -> str:
+    if m.is_warp:
+        return GROUP_WARP
+    return m.stage or GROUP_OTHER
+
+
+def _group_label(key: str) -> str:
+    return {GROUP_WARP: "传送门", GROUP_OTHER: "其他"}.get(key) or display_group_name(key)
+
+
+def _make_row(m: ModInfo, enabled: bool) -> ModRow:
+    fn = m.path.name
+    text = m.name or fn
+    return ModRow(
+        filename=fn,
+        text=text,
+        enabled=enabled,
+        version=m.version,
+        author=m.author,
+        descriptions=list(m.descriptions),
+        stage=m.stage,
+        is_warp=m.is_warp,
+        haystack=f"{text}\n{fn}".lower(),
+        sort_key=(natural_key(text), fn),
+    )
+
+
+def _runs(positions: List[int]) -> List[Tuple[int, int]]:
+    """把升序的行号压缩成 [(起, 止)] 的连续区间。"""
+    out: List[Tuple[int, int]] = []
+    for p in positions:
+        if out and out[-1][1] + 1 == p:
+            out[-1] = (out[-1][0], p)
+        else:
+            out.append((p, p))
+    return out
+
+
+def _group_order(key: str) -> Tuple:
+    # 传送门在最前，其他在最后，stage 之间按名称自然排序
+    if key == GROUP_WARP:
+        return (0, ())
+    if key == GROUP_OTHER:
+        return (2, ())
+    return (1, natural_key(key))
+
+
+class ModListModel(QtCore.QAbstractItemModel):
+    # 用户点击了复选框：(源模型索引, 期望启用)；由页面执行实际的启用/禁用后回调 set_enabled
+    checkRequested = QtCore.pyqtSignal(QtCore.QModelIndex, bool)
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._groups: List[ModGroup] = []
+        self._where: Dict[str, Tuple[ModGroup, int]] = {}
+        self._enabled_total = 0
+
+    # ---- 数据 ----
+    def set_mods(self, mods: Iterable[ModInfo], enabled: Set[str]) -> None:
+        by_key: Dict[str, ModGroup] = {}
+        for m in mods:
+            key = _group_key(m)
+            grp = by_key.get(key)
+            if grp is None:
+                grp = by_key[key] = ModGroup(key, _group_label(key))
+            grp.rows.append(_make_row(m, m.path.name in enabled))
+        self.beginResetModel()
+        self._groups = sorted(by_key.values(), key=lambda g: _group_order(g.key))
+        self._where = {}
+        self._enabled_total = 0
+        for gi, grp in enumerate(self._groups):
+            grp.row = gi
+            grp.rows.sort(key=lambda r: r.sort_key)
+            grp.enabled = sum(1 for r in grp.rows if r.enabled)
+            self._enabled_total += grp.enabled
+            for ri, r in enumerate(grp.rows):
+                self._where[r.filename] = (grp, ri)
+        self.endResetModel()
+
+    def merge_mods(self, items: Iterable[Tuple[ModInfo, bool]]) -> List[ModRow]:
+        """增量载入一批 (任务, 是否启用)：已有的行原地更新，新行按排序位置成段插入。
+
+        与 set_mods 不同，不会重置模型，视图的选中、展开与滚动位置都得以保留；
+        后台分批载入时每批调用一次，最后用 remove_missing 删去已不存在的任务。
+        返回本批中新插入或内容有变化的行（未变化的行不在其中）。
+        """
+        changed: List[ModRow] = []
+        fresh: Dict[str, List[ModRow]] = {}
+        touched: Dict[str, ModGroup] = {}
+        for m, enabled in items:
+            row = _make_row(m, enabled)
+            key = _group_key(m)
+            hit = self._where.get(row.filename)
+            if hit is not None:
+                grp, ri = hit
+                if grp.key == key and grp.rows[ri].sort_key == row.sort_key:
+                    old = grp.rows[ri]
+                    if old != row:
+                        if old.haystack != row.haystack:
+                            changed.append(row)
+                        delta = int(row.enabled) - int(old.enabled)
+                        grp.rows[ri] = row
+                        grp.enabled += delta
+                        self._enabled_total += delta
+                        idx = self.createIndex(ri, 0, grp)
+                        self.dataChanged.emit(idx, idx)
+                        touched[grp.key] = grp
+                    continue
+                # 标题或分组变了：先从原位置移除，再按新位置插入
+                self._remove_rows(grp, [ri])
+                touched[grp.key] = grp
+            fresh.setdefault(key, []).append(row)
+        for key, rows in fresh.items():
+            grp = self._ensure_group(key)
+            self._insert_rows(grp, rows)
+            touched[key] = grp
+            changed.extend(rows)
+        for grp in touched.values():
+            if grp.rows:
+                gidx = self.createIndex(grp.row, 0, None)
+                self.dataChanged.emit(gidx, gidx, _GROUP_ROLES)
+        return changed
+
+    def remove_missing(self, keep: Set[str]) -> None:
+        """删除文件名不在 keep 中的行（以及因此变空的分组）。"""
+        for grp in list(self._groups):
+            gone = [i for i, r in enumerate(grp.rows) if r.filename not in keep]
+            if gone:
+                self._remove_rows(grp, gone)
+                if grp.rows:
+                    gidx = self.createIndex(grp.row, 0, None)
+                    self.dataChanged.emit(gidx, gidx, _GROUP_ROLES)
+
+    def _ensure_group(self, key: str) -> ModGroup:
+        for grp in self._groups:
+            if grp.key == key:
+                return grp
+        grp = ModGroup(key, _group_label(key))
+        order = _group_order(key)
+        pos = next((g.row for g in self._groups if _group_order(g.key) > order), len(self._groups))
+        self.beginInsertRows(QtCore.QModelIndex(), pos, pos)
+        self._groups.insert(pos, grp)
+        for gi in range(pos, len(self._groups)):
+            self._groups[gi].row = gi
+        self.endInsertRows()
+        return grp
+
+    def _insert_rows(self, grp: ModGroup, rows: List[ModRow]) -> None:
+        rows.sort(key=lambda r: r.sort_key)
+        keys = [r.sort_key for r in grp.rows]
+        # 同一插入位置的新行是连续的一段
+        segments: List[Tuple[int, List[ModRow]]] = []
+        for r in rows:
+            pos = bisect_right(keys, r.sort_key)
+            if segments and segments[-1][0] == pos:
+                segments[-1][1].append(r)
+            else:
+                segments.append((pos, [r]))
+        added = sum(1 for r in rows if r.enabled)
+        grp.enabled += added
+        self._enabled_total += added
+        parent = self.createIndex(grp.row, 0, None)
+        if len(segments) > _MAX_INSERT_SEGMENTS:
+            # 段数多时逐段插入的代价（代理与视图每段都要处理一次）超过一次性追加再排序
+            self._append_and_sort(grp, parent, rows)
+            return
+        # 从后往前插入，前面的位置不受影响
+        for pos, seg in reversed(segments):
+            self.beginInsertRows(parent, pos, pos + len(seg) - 1)
+            grp.rows[pos:pos] = seg
+            self.endInsertRows()
+        self._reindex(grp, segments[0][0] if segments else len(grp.rows))
+
+    def _append_and_sort(self, grp: ModGroup, parent: QtCore.QModelIndex, rows: List[ModRow]) -> None:
+        n = len(grp.rows)
+        self.beginInsertRows(parent, n, n + len(rows) - 1)
+        grp.rows.extend(rows)
+        self.endInsertRows()
+        self.layoutAboutToBeChanged.emit([QtCore.QPersistentModelIndex(parent)])
+        before = list(grp.rows)
+        grp.rows.sort(key=lambda r: r.sort_key)
+        moved = {id(r): i for i, r in enumerate(grp.rows)}
+        olds = [i for i in self.persistentIndexList() if i.internalPointer() is grp]
+        self.changePersistentIndexList(olds, [self.createIndex(moved[id(before[i.row()])], 0, grp) for i in olds])
+        self._reindex(grp, 0)
+        self.layoutChanged.emit([QtCore.QPersistentModelIndex(parent)])
+
+    def _remove_rows(self, grp: ModGroup, indices: List[int]) -> None:
+        parent = self.createIndex(grp.row, 0, None)
+        for first, last in reversed(_runs(sorted(indices))):
+            self.beginRemoveRows(parent, first, last)
+            for r in grp.rows[first:last + 1]:
+                self._where.pop(r.filename, None)
+                if r.enabled:
+                    grp.enabled -= 1
+                    self._enabled_total -= 1
+            del grp.rows[first:last + 1]
+            self.endRemoveRows()
+        if not grp.rows:
+            pos = grp.row
+            self.beginRemoveRows(QtCore.QModelIndex(), pos, pos)
+            del self._groups[pos]
+            for gi in range(pos, len(self._groups)):
+                self._groups[gi].row = gi
+            self.endRemoveRows()
+            return
+        self._reindex(grp, min(indices))
+
+    def _reindex(self, grp: ModGroup, start: int) -> None:
+        for ri in range(start, len(grp.rows)):
+            self._where[grp.rows[ri].filename] = (grp, ri)
+
+    def set_enabled(self, filenames: Iterable[str], enabled: bool) -> None:
+        """更新若干任务的启用状态，只刷新变化的行与它们所在的分组。
+
+        计数按组累加成一次增量；行的 dataChanged 按连续区间合并，每组只通知一次。
+        """
+        changed: Dict[int, List[int]] = {}
+        for fn in filenames:
+            hit = self._where.get(fn)
+            if hit is None:
+                continue
+            grp, ri = hit
+            row = grp.rows[ri]
+            if row.enabled != enabled:
+                row.enabled = enabled
+                changed.setdefault(grp.row, []).append(ri)
+        for gi, lst in changed.items():
+            grp = self._groups[gi]
+            delta = len(lst) if enabled else -len(lst)
+            grp.enabled += delta
+            self._enabled_total += delta
+            for first, last in _runs(sorted(lst)):
+                self.dataChanged.emit(self.createIndex(first, 0, grp), self.createIndex(last, 0, grp), _ROW_ROLES)
+            gidx = self.createIndex(gi, 0, None)
+            self.dataChanged.emit(gidx, gidx, _GROUP_ROLES)
+
+    def pending_changes(self, filenames: Iterable[str], enabled: bool) -> List[str]:
+        """filenames 中启用状态与 enabled 不同的那些；批量操作只需处理它们。"""
+        out: List[str] = []
+        for fn in filenames:
+            hit = self._where.get(fn)
+            if hit is not None and hit[0].rows[hit[1]].enabled != enabled:
+                out.append(fn)
+        return out
+
+    @property
+    def total(self) -> int:
+        return len(self._where)
+
+    @property
+    def enabled_count(self) -> int:
+        return self._enabled_total
+
+    @property
+    def groups(self) -> List[ModGroup]:
+        return self._groups
+
+    def search_entries(self) -> List[Tuple[str, str]]:
+        """供 SearchPipeline 使用的 (文件名, 搜索文本) 列表，按显示顺序排列。"""
+        return [(r.filename, r.haystack) for grp in self._groups for r in grp.rows]
+
+    def group_of(self, filename: str) -> Optional[ModGroup]:
+        hit = self._where.get(filename)
+        return hit[0] if hit is not None else None
+
+    def notify_groups(self, groups: Iterable[ModGroup]) -> None:
+        for grp in groups:
+            idx = self.createIndex(grp.row, 0, None)
+            self.dataChanged.emit(idx, idx)
+
+    def notify_rows(self, filenames: Iterable[str]) -> None:
+        """对给定任务发出 dataChanged；同组连续的行合并为一个区间。"""
+        rows: Dict[int, List[int]] = {}
+        for fn in filenames:
+            hit = self._where.get(fn)
+            if hit is not None:
+                rows.setdefault(hit[0].row, []).append(hit[1])
+        for gi, lst in rows.items():
+            grp = self._groups[gi]
+            for first, last in _runs(sorted(lst)):
+                self.dataChanged.emit(self.createIndex(first, 0, grp), self.createIndex(last, 0, grp))
+
+    def mod_at(self, index: QtCore.QModelIndex) -> Optional[ModRow]:
+        if not index.isValid():
+            return None
+        grp = index.internalPointer()
+        return grp.rows[index.row()] if grp is not None else None
+
+    def group_at(self, index: QtCore.QModelIndex) -> Optional[ModGroup]:
+        if not index.isValid() or index.internalPointer() is not None:
+            return None
+        return self._groups[index.row()]
+
+    def index_of(self, filename: str) -> QtCore.QModelIndex:
+        hit = self._where.get(filename)
+        if hit is None:
+            return QtCore.QModelIndex()
+        grp, ri = hit
+        return self.createIndex(ri, 0, grp)
+
+    # ---- QAbstractItemModel ----
+    def index(self, row: int, column: int, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+        if column != 0 or row < 0:
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, 0, None) if row < len(self._groups) else QtCore.QModelIndex()
+        if parent.internalPointer() is not None:
+            return QtCore.QModelIndex()
+        grp = self._groups[parent.row()]
+        return self.createIndex(row, 0, grp) if row < len(grp.rows) else QtCore.QModelIndex()
+
+    def parent(self, index: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:  # type: ignore[override]
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        grp = index.internalPointer()
+        if grp is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(grp.row, 0, None)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalPointer() is None:
+            return len(self._groups[parent.row()].rows)
+        return 0
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 1
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return "任务"
+        return None
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        grp = index.internalPointer()
+        if grp is None:
+            g = self._groups[index.row()]
+            if role == QtCore.Qt.ItemDataRole.DisplayRole:
+                return f"{g.label} ({g.enabled}/{len(g.rows)})"
+            if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+                return g.check_state
+            if role == ROLE_GROUP_KEY:
+                return g.key
+            return None
+        r = grp.rows[index.row()]
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return r.text
+        if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+            return QtCore.Qt.CheckState.Checked if r.enabled else QtCore.Qt.CheckState.Unchecked
+        if role == ROLE_FILENAME:
+            return r.filename
+        if role == ROLE_VERSION:
+            return r.version
+        if role == ROLE_AUTHOR:
+            return r.author
+        if role == ROLE_DESCRIPTIONS:
+            return r.descriptions
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlag:
+        if not index.isValid():
+            return QtCore.Qt.ItemFlag.NoItemFlags
+        return _GROUP_FLAGS if index.internalPointer() is None else _ROW_FLAGS
+
+    def setData(self, index: QtCore.QModelIndex, value: Any, role: int = QtCore.Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or role != QtCore.Qt.ItemDataRole.CheckStateRole:
+            return False
+        want = QtCore.Qt.CheckState(value) == QtCore.Qt.CheckState.Checked
+        # 模型本身不做文件操作：交给页面处理，成功后再调用 set_enabled
+        self.checkRequested.emit(index, want)
+        return False
+
+
+class ModFilterProxy(QtCore.QSortFilterProxyModel):
+    """按命中集合过滤；分组在没有命中的子项时隐藏。"""
+
+    # 可见性变化超过总数的这个比例时，逐行通知不如整体重新过滤
+    FULL_REFILTER_RATIO = 0.25
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._hits: Optional[Set[str]] = None  # None 表示不过滤
+        self._groups_hit: Set[str] = set()
+
+    def _groups_for(self, hits: Optional[Set[str]]) -> Set[str]:
+        model = self.sourceModel()
+        if hits is None or not isinstance(model, ModListModel):
+            return set()
+        out: Set[str] = set()
+        for fn in hits:
+            grp = model.group_of(fn)
+            if grp is not None:
+                out.add(grp.key)
+        return out
+
+    def apply_hits(self, hits: Optional[Set[str]]) -> None:
+        """应用新的命中集合（None 表示显示全部），只通知可见性变化的行。"""
+        model = self.sourceModel()
+        old, old_groups = self._hits, self._groups_hit
+        self._hits, self._groups_hit = hits, self._groups_for(hits)
+        if not isinstance(model, ModListModel):
+            return
+        if old is None and hits is None:
+            return
+        if old is None or hits is None:
+            self.invalidateRowsFilter()
+            return
+        diff = old ^ hits
+        if len(diff) > max(256, model.total * self.FULL_REFILTER_RATIO):
+            self.invalidateRowsFilter()
+            return
+        # 先处理分组的出现/消失：新出现的分组会按新集合过滤其子项
+        model.notify_groups(g for g in model.groups if (g.key in old_groups) != (g.key in self._groups_hit))
+        model.notify_rows(diff)
+
+    def refresh(self) -> None:
+        """源模型整体重置后按当前命中集合重新计算分组。"""
+        self._groups_hit = self._groups_for(self._hits)
+        self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        if self._hits is None:
+            return True
+        model = self.sourceModel()
+        if not source_parent.isValid():
+            return model.groups[source_row].key in self._groups_hit
+        grp = model.groups[source_parent.row()]
+        return grp.rows[source_row].filename in self._hits
+
+    def visible_filenames(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> List[str]:
+        """当前可见的任务文件名；parent 为代理中的分组索引时只取该组。"""
+        out: List[str] = []
+        parents = [parent] if parent.isValid() else [self.index(i, 0) for i in range(self.rowCount())]
+        for p in parents:
+            for i in range(self.rowCount(p)):
+                fn = self.index(i, 0, p).data(ROLE_FILENAME)
+                if fn:
+                    out.append(fn)
+        return out
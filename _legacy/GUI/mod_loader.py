@@ -0,0 +1,131 @@
+"""任务库的后台分批载入。
+
+ModLoader 在 QThreadPool 中列目录、解析任务元数据并对照游戏目录得出启用状态，
+按数量或时间攒成一批就发回 GUI 线程（batchReady），由页面增量合并进模型；
+全部完成后发出 finished(本次见到的文件名集合)，用于删去已不存在的任务。
+
+插入行后视图要按已有行数重新布局，所以批次大小随已发出的数量按比例增长（至少
+batch_size），总的布局开销与任务数成线性；上一批还没被 GUI 线程处理完时也不会发下
+一批。进度则按 batch_interval 单独发出，不依赖批次。
+
+每次 start 都会递增代号：旧任务在下一次检查时退出，已在队列中的旧批次到达时被丢弃，
+所以再次点击“刷新”即可打断正在进行的载入。
+"""
+from __future__ import annotations
+
+import time
+from typing import List, Optional, Set, Tuple
+
+from PyQt6 import QtCore
+
+from src.game_sync import enabled_in_game
+from src.mod_manager import ModInfo, list_mod_files, load_mods
+
+
+Batch = List[Tuple[ModInfo, bool]]
+
+
+class _LoadSignals(QtCore.QObject):
+    batch = QtCore.pyqtSignal(int, object)  # 代号, 批次
+    progress = QtCore.pyqtSignal(int, int, int)  # 代号, 已完成数, 总数
+    finished = QtCore.pyqtSignal(int, object)  # 代号, 文件名集合
+
+
+class _LoadJob(QtCore.QRunnable):
+    def __init__(self, loader: "ModLoader", generation: int, game_dir: Optional[str]) -> None:
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.game_dir = game_dir
+        self.signals = loader.signals
+        self.sent = 0  # 已发出的批次数；与 loader.applied 相等说明 GUI 线程已处理完
+
+    def _stale(self) -> bool:
+        return self.loader.generation != self.generation
+
+    def run(self) -> None:
+        try:
+            self._run()
+        except RuntimeError:
+            pass  # 载入期间页面已销毁
+
+    def _run(self) -> None:
+        paths = list_mod_files()
+        enabled: Set[str] = set()
+        if self.game_dir:
+            try:
+                enabled = enabled_in_game(self.game_dir)
+            except OSError:
+                enabled = set()
+        total = len(paths)
+        seen: Set[str] = set()
+        batch: Batch = []
+        last = time.monotonic()
+        done = shown = 0
+        for m in load_mods(paths):
+            if self._stale():
+                return
+            batch.append((m, m.path.name in enabled))
+            seen.add(m.path.name)
+            done += 1
+            if len(batch) >= max(self.loader.batch_size, shown // 2) and self.sent == self.loader.applied:
+                self.sent += 1
+                shown += len(batch)
+                self.signals.batch.emit(self.generation, batch)
+                batch = []
+            now = time.monotonic()
+            if now - last >= self.loader.batch_interval:
+                self.signals.progress.emit(self.generation, done, total)
+                last = now
+        if self._stale():
+            return
+        if batch:
+            self.signals.batch.emit(self.generation, batch)
+        self.signals.progress.emit(self.generation, done, total)
+        self.signals.finished.emit(self.generation, seen)
+
+
+class ModLoader(QtCore.QObject):
+    batchReady = QtCore.pyqtSignal(object)  # Batch
+    progress = QtCore.pyqtSignal(int, int)  # 已完成数, 总数
+    finished = QtCore.pyqtSignal(object)  # Set[str]
+
+    def __init__(self, parent: QtCore.QObject | None = None, batch_size: int = 500, batch_interval: float = 0.05) -> None:
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval  # 秒，进度的刷新间隔
+        self.generation = 0
+        self._running = False
+        self.applied = 0  # 当前代号已处理的批次数
+        self.signals = _LoadSignals(self)
+        self.signals.batch.connect(self._on_batch)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, game_dir: Optional[str]) -> None:
+        """开始（或重新开始）载入；正在进行的旧任务会被打断。"""
+        self.generation += 1
+        self._running = True
+        self.progress.emit(0, 0)
+        self.applied = 0
+        QtCore.QThreadPool.globalInstance().start(_LoadJob(self, self.generation, game_dir))
+
+    def _on_batch(self, generation: int, batch: Batch) -> None:
+        if generation != self.generation:
+            return
+        self.batchReady.emit(batch)
+        self.applied += 1
+
+    def _on_progress(self, generation: int, done: int, total: int) -> None:
+        if generation == self.generation:
+            self.progress.emit(done, total)
+
+    def _on_finished(self, generation: int, seen: Set[str]) -> None:
+        if generation != self.generation:
+            return
+        self._running = False
+        self.finished.emit(seen)
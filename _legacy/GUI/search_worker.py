@@ -0,0 +1,134 @@
+"""列表搜索的后台流水线：输入去抖 → 工作线程匹配 → 丢弃过期结果 → GUI 线程应用差异。
+
+SearchPipeline 持有一份 (key, 小写文本) 条目列表。每次输入都会重新计时，停止输入
+delay_ms 后才把查询交给 QThreadPool；每个查询带一个递增的代号，工作线程发现自己已
+过期会提前退出，过期结果到达 GUI 线程时也会被直接丢弃。新查询包含上一次完成的查询时
+（继续输入），只在上一次的命中条目中匹配。
+
+结果通过 resultsReady(hits) 发出：hits 为命中的 key 集合，空查询时为 None。
+调用方只需对比前后两次的集合，把可见性变化的条目应用到视图上。
+
+后台分批载入时用 add_entries 追加每批新条目：只对这一批匹配当前查询并并入已有结果，
+不重新匹配全部条目；进行中的查询完成时，会补上它开始之后追加的条目。
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Set, Tuple
+
+from PyQt6 import QtCore
+
+
+Entry = Tuple[str, str]  # (key, 已小写的搜索文本)
+
+_CHECK_EVERY = 4096  # 工作线程每匹配这么多条检查一次是否过期
+
+
+class _SearchSignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(int, int, str, object, object)  # 代号, 条目版本, 查询, 命中条目, 命中 key 集合
+
+
+class _SearchJob(QtCore.QRunnable):
+    def __init__(self, pipeline: "SearchPipeline", generation: int, version: int, query: str, entries: Sequence[Entry]) -> None:
+        super().__init__()
+        self.pipeline = pipeline
+        self.generation = generation
+        self.version = version
+        self.query = query
+        self.entries = entries
+
+    def run(self) -> None:
+        q = self.query
+        hit_entries: List[Entry] = []
+        for i, entry in enumerate(self.entries):
+            if i % _CHECK_EVERY == 0 and self.pipeline.generation != self.generation:
+                return  # 已有更新的查询，放弃
+            if q in entry[1]:
+                hit_entries.append(entry)
+        hits = {k for k, _ in hit_entries}
+        self.pipeline.signals.done.emit(self.generation, self.version, q, hit_entries, hits)
+
+
+class SearchPipeline(QtCore.QObject):
+    resultsReady = QtCore.pyqtSignal(object)  # Optional[Set[str]]
+
+    def __init__(self, parent: QtCore.QObject | None = None, delay_ms: int = 150) -> None:
+        super().__init__(parent)
+        self.generation = 0
+        self.signals = _SearchSignals(self)
+        self.signals.done.connect(self._on_done)
+        self._entries: List[Entry] = []
+        self._version = 0
+        self._query = ""
+        self._hits: Optional[Set[str]] = None  # 最近一次发出的结果
+        self._in_flight = False  # 当前代号的查询已交给工作线程、尚未返回
+        self._dispatched_len = 0  # 该查询开始时的条目数；之后追加的条目在它返回时补匹配
+        # 上一次完成的查询 (条目版本, 查询, 命中条目)，用于继续输入时缩小匹配范围
+        self._last: Optional[Tuple[int, str, List[Entry]]] = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    def set_entries(self, entries: List[Entry]) -> None:
+        """替换条目（例如重新扫描之后），并对当前查询立即重新匹配。"""
+        self._entries = entries
+        self._version += 1
+        self._last = None
+        self._timer.stop()
+        self._dispatch()
+
+    def add_entries(self, entries: List[Entry]) -> None:
+        """追加一批条目（例如后台分批载入的新任务），只对这批条目匹配当前查询。
+
+        已有 key 的旧条目不会被移除，直到下一次 set_entries；载入完成时调用方应以完整
+        列表调用一次 set_entries。
+        """
+        if not entries:
+            return
+        # 进行中的查询可能正在遍历同一列表：原地追加只会让它多看到几条，完成时补匹配的结果相同
+        self._entries.extend(entries)
+        self._last = None  # 上一次的命中条目不含新条目，不能再用来缩小范围
+        q = self._query
+        if not q or self._in_flight or self._timer.isActive():
+            return  # 没有查询；或查询尚未开始/仍在进行，新条目会在它完成时一并匹配
+        new_hits = {k for k, text in entries if q in text}
+        if self._hits is not None and not new_hits <= self._hits:
+            self._hits = self._hits | new_hits
+            self.resultsReady.emit(self._hits)
+
+    def set_query(self, text: str) -> None:
+        self._query = (text or "").lower().strip()
+        self._timer.start()
+
+    def _dispatch(self) -> None:
+        self.generation += 1
+        q = self._query
+        if not q:
+            self._in_flight = False
+            self._hits = None
+            self.resultsReady.emit(None)
+            return
+        entries: Sequence[Entry] = self._entries
+        last = self._last
+        if last is not None and last[0] == self._version and last[1] in q:
+            entries = last[2]
+        self._in_flight = True
+        self._dispatched_len = len(self._entries)
+        QtCore.QThreadPool.globalInstance().start(_SearchJob(self, self.generation, self._version, q, entries))
+
+    def _on_done(self, generation: int, version: int, query: str, hit_entries: List[Entry], hits: Set[str]) -> None:
+        if generation != self.generation:
+            return  # 过期结果
+        self._in_flight = False
+        added = self._entries[self._dispatched_len:] if version == self._version else []
+        if added:
+            # 查询进行期间追加的条目：补匹配后并入；命中条目不完整，不用于之后缩小范围
+            hits = hits | {k for k, text in added if query in text}
+        else:
+            self._last = (version, query, hit_entries)
+        self._hits = hits
+        self.resultsReady.emit(hits)
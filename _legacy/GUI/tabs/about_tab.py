@@ -2,16 +2,30 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 from datetime import datetime
 import webbrowser
 
-from src.update_checker import check_for_updates_github
+from src.settings_manager import settings_store
+from src.update_checker import DEFAULT_REPO, UpdateService
 from src.version import __version__
 
 
+class _UpdateSignals(QtCore.QObject):
+    # 后台线程通过信号把检查结果送回 GUI 线程
+    finished = QtCore.pyqtSignal(dict)
+
+
 class AboutTab(QtWidgets.QWidget):
     """关于标签页（布局与占位控件）。"""
 
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
+        self._updates = UpdateService(__version__, repo=DEFAULT_REPO)
+        self._update_signals = _UpdateSignals(self)
+        self._update_signals.finished.connect(self._on_update_result)
+        self._checking = False
+        self._manual_check = False
         self._build_ui()
+        # 启动时检查：TTL 内直接使用缓存，不发请求；只有发现新版本才弹窗
+        if settings_store().get("updateCheckAtStartup"):
+            QtCore.QTimer.singleShot(0, lambda: self._start_check(manual=False))
 
     def _build_ui(self) -> None:
         root = QtWidgets.QVBoxLayout(self)
@@ -32,7 +46,7 @@ class AboutTab(QtWidgets.QWidget):
         root.addWidget(info)
 
         link_layout = QtWidgets.QHBoxLayout()
-        btn_check_update = QtWidgets.QPushButton("检查更新", self)
+        self.btn_check_update = btn_check_update = QtWidgets.QPushButton("检查更新", self)
         btn_home = QtWidgets.QPushButton("官方网站", self)
         btn_forum = QtWidgets.QPushButton("支持论坛", self)
         link_layout.addWidget(btn_check_update)
@@ -53,7 +67,8 @@ class AboutTab(QtWidgets.QWidget):
         bottom.setFrameShape(QtWidgets.QFrame.Shape.StyledPanel)
         b = QtWidgets.QHBoxLayout(bottom)
         self.lbl_version = QtWidgets.QLabel(f"当前版本：{__version__}", bottom)
-        self.lbl_last_check = QtWidgets.QLabel("最后检查：从未", bottom)
+        last = settings_store().get("lastUpdateCheck")
+        self.lbl_last_check = QtWidgets.QLabel(f"最后检查：{last or '从未'}", bottom)
         b.addWidget(self.lbl_version)
         b.addStretch(1)
         b.addWidget(self.lbl_last_check)
@@ -61,32 +76,47 @@ class AboutTab(QtWidgets.QWidget):
 
 
     def _check_update(self) -> None:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.lbl_last_check.setText(f"最后检查：{now}")
-        # 从界面读取当前版本号（期望格式：x.y.z）
-        cur_text = self.lbl_version.text().strip()
-        # 尝试提取版本号
-        cur_ver = "0.0.0"
-        try:
-            if ":" in cur_text:
-                cur_ver = cur_text.split(":", 1)[1].strip()
-            else:
-                cur_ver = cur_text
-        except Exception:
-            cur_ver = "0.0.0"
-
-        # 查询 GitHub releases latest
-        repo = "felixchaos/Manaka-MOD-Station"
-        try:
-            res = check_for_updates_github(repo, cur_ver)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "检查更新失败", f"无法检查更新：{e}")
+        # 手动检查忽略 TTL，但仍是条件请求：没有新发布时服务器只回 304
+        self._start_check(manual=True)
+
+    def _start_check(self, manual: bool) -> None:
+        if self._checking:
+            return
+        self._checking = True
+        self._manual_check = manual
+        self.btn_check_update.setEnabled(False)
+        self.lbl_last_check.setText("最后检查：正在检查…")
+        self._updates.check_in_background(self._update_signals.finished.emit, force=manual)
+
+    def _on_update_result(self, res: dict) -> None:
+        self._checking = False
+        self.btn_check_update.setEnabled(True)
+        checked_at = res.get("checked_at")
+        if checked_at:
+            stamp = datetime.fromtimestamp(checked_at).strftime("%Y-%m-%d %H:%M:%S")
+            settings_store().set("lastUpdateCheck", stamp)
+        else:
+            stamp = settings_store().get("lastUpdateCheck") or "从未"
+        self.lbl_last_check.setText(f"最后检查：{stamp}")
+        if not self._manual_check:
+            if res.get("update_available"):
+                self._show_update_dialog(res)
             return
 
+        cur_ver = __version__
+        if res.get("error"):
+            # 请求失败：即使有上次缓存的结果（source 为 stale）也要告知这次检查没有成功
+            QtWidgets.QMessageBox.warning(self, "检查更新失败", f"无法检查更新：{res.get('error')}")
+            if not res.get("update_available"):
+                return
         if not res.get("update_available"):
             QtWidgets.QMessageBox.information(self, "已是最新", f"当前版本 {cur_ver} 已经是最新。")
             return
+        self._show_update_dialog(res)
 
+    def _show_update_dialog(self, res: dict) -> None:
+        cur_ver = __version__
+        repo = DEFAULT_REPO
         latest = res.get("latest_version") or "?"
         assets = res.get("assets", [])
 
@@ -97,7 +127,7 @@ class AboutTab(QtWidgets.QWidget):
         dlg.setText(msg)
         open_releases = dlg.addButton("打开 Releases 页面", QtWidgets.QMessageBox.ButtonRole.AcceptRole)
         if assets:
-            open_asset = dlg.addButton(f"下载：{assets[0]['name']}", QtWidgets.QMessageBox.ButtonRole.ActionRole)
+            open_asset = dlg.addButton(f"下载：{assets[0].name}", QtWidgets.QMessageBox.ButtonRole.ActionRole)
         cancel = dlg.addButton(QtWidgets.QMessageBox.StandardButton.Cancel)
         dlg.exec()
 
@@ -107,7 +137,7 @@ class AboutTab(QtWidgets.QWidget):
         elif assets and clicked == open_asset:
             # 打开第一个资产下载链接
             try:
-                url = assets[0]['url']
+                url = assets[0].url
                 webbrowser.open(url)
             except Exception:
                 webbrowser.open(f"https://github.com/{repo}/releases/latest")
@@ -4,6 +4,7 @@ from typing import Optional, List, Dict
 import json
 from src.config import CUSTOM_MISSIONS_DIR
 from .json_editor_tab import CodeEditor, PreviewTree
+from GUI.validation_worker import PreviewRow
 from src.mission_validator import validate_text, ValidationIssue
 
 
@@ -93,8 +94,8 @@ class JsonCreatorTab(QtWidgets.QWidget):
         preview_box = QtWidgets.QGroupBox("快速预览", self)
         pv = QtWidgets.QVBoxLayout(preview_box)
         self.tree_preview = PreviewTree(preview_box)
-        self.tree_preview.navigateTo.connect(self._goto_line)
-        self.tree_preview.itemDoubleClicked.connect(self._on_preview_item_double_clicked)
+        self.tree_preview.rowActivated.connect(self._on_preview_row_activated)
+        self.tree_preview.rowCopyRequested.connect(self._on_preview_row_copy)
         pv.addWidget(self.tree_preview)
         self._splitter.addWidget(preview_box)
 
@@ -173,8 +174,8 @@ class JsonCreatorTab(QtWidgets.QWidget):
         v = QtWidgets.QVBoxLayout(page)
         editor = CodeEditor(page)
         editor.cursorPositionChangedDetailed.connect(self._on_cursor_changed)
-        editor.validationReady.connect(self._update_errors)
-        editor.validationReady.connect(self._maybe_refresh_preview)
+        editor.validationReady.connect(lambda issues: self._on_validation_ready(editor, issues))
+        editor.lintChanged.connect(lambda: self._on_lint_changed(editor))
         editor.textChanged.connect(lambda: self._on_editor_text_changed(editor))
         # 上下文菜单回调
         editor._save_cb = self._on_save
@@ -341,6 +342,8 @@ class JsonCreatorTab(QtWidgets.QWidget):
 
     def _on_tab_changed(self, _idx: int) -> None:
         self._update_saved_label()
+        self._refresh_errors()
+        self._refresh_preview()
         self._update_action_states()
 
     def _close_tab(self, idx: int) -> None:
@@ -505,6 +508,22 @@ class JsonCreatorTab(QtWidgets.QWidget):
         has_errors = self.err_list.count() > 0
         self._set_error_panel_visible(has_errors)
 
+    def _on_validation_ready(self, editor: CodeEditor, issues: List[ValidationIssue]) -> None:
+        # 校验在后台完成，切走的标签页也会稍后送来结果：只有当前编辑器的结果才更新面板
+        if editor is self._current_editor():
+            self._update_errors(issues)
+            self._maybe_refresh_preview(issues)
+
+    def _on_lint_changed(self, editor: CodeEditor) -> None:
+        # 括号检查在校验结果之后才完成，到达时重建错误列表
+        if editor is self._current_editor():
+            self._update_errors(editor.validation_issues)
+
+    def _refresh_errors(self) -> None:
+        ed = self._current_editor()
+        if ed is not None:
+            self._update_errors(ed.validation_issues)
+
     def _set_error_panel_visible(self, show: bool) -> None:
         try:
             sizes = self._v_splitter.sizes()
@@ -531,203 +550,17 @@ class JsonCreatorTab(QtWidgets.QWidget):
         self._refresh_preview()
 
     def _refresh_preview(self) -> None:
-        ed = self._current_editor()
-        if not ed:
-            return
-        try:
-            obj = json.loads(ed.toPlainText())
-        except Exception:
-            return
-        self.tree_preview.clear()
-        root_zone = QtWidgets.QTreeWidgetItem(["Zone"])
-        root_sub = QtWidgets.QTreeWidgetItem(["SubCondition"])
-        root_cp = QtWidgets.QTreeWidgetItem(["Checkpoint"])
-        self.tree_preview.addTopLevelItem(root_zone)
-        self.tree_preview.addTopLevelItem(root_sub)
-        self.tree_preview.addTopLevelItem(root_cp)
-
-        def preview(s: str, n: int = 80) -> str:
-            s1 = s.replace("\n", " ")
-            return (s1[: n] + ("…" if len(s1) > n else ""))
-
-        # zones
-        zones = obj.get("zones") if isinstance(obj, dict) else None
-        if isinstance(zones, list):
-            for i, z in enumerate(zones):
-                if not isinstance(z, dict):
-                    continue
-                zid = z.get("id") or "zone"
-                text = json.dumps(z, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(zid), preview(text)])
-                anchor = f'"id": "{z.get("id")}"' if isinstance(z.get("id"), str) else None
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "zones")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_zone.addChild(it)
-
-        # subconditions
-        subs = obj.get("subconditions") if isinstance(obj, dict) else None
-        if isinstance(subs, list):
-            for i, s in enumerate(subs):
-                if not isinstance(s, dict):
-                    continue
-                sid = s.get("id") or "sub"
-                text = json.dumps(s, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(sid), preview(text)])
-                anchor = f'"id": "{s.get("id")}"' if isinstance(s.get("id"), str) else None
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "subconditions")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_sub.addChild(it)
-
-        # checkpoints 标题取 description
-        cps = obj.get("checkpoints") if isinstance(obj, dict) else None
-        if isinstance(cps, list):
-            for i, c in enumerate(cps):
-                if not isinstance(c, dict):
-                    continue
-                title = None
-                for key in ("condition", "travelcondition"):
-                    blk = c.get(key)
-                    if isinstance(blk, dict) and isinstance(blk.get("description"), str):
-                        title = blk.get("description")
-                        break
-                title = title or c.get("id") or "checkpoint"
-                text = json.dumps(c, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(title), preview(text)])
-                anchor = None
-                if isinstance(c.get("id"), str):
-                    anchor = f'"id": "{c.get("id")}"'
-                if anchor is None:
-                    for key in ("condition", "travelcondition"):
-                        blk = c.get(key)
-                        if isinstance(blk, dict) and isinstance(blk.get("description"), str):
-                            anchor = f'"description": "{blk.get("description")}"'
-                            break
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "checkpoints")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_cp.addChild(it)
-
-        self.tree_preview.expandAll()
-
-    def _estimate_line_by_patterns(self, big: str, patterns: List[Optional[str]]) -> int:
-        for p in patterns:
-            if not p:
-                continue
-            idx = big.find(p)
-            if idx >= 0:
-                return big[:idx].count('\n') + 1
-        return 1
-
-    def _goto_line(self, line: int) -> None:
-        ed = self._current_editor()
-        block = ed.document().findBlockByNumber(max(0, line - 1))
-        if block.isValid():
-            cur = ed.textCursor()
-            cur.setPosition(block.position())
-            ed.setTextCursor(cur)
-            try:
-                ed.centerCursor()
-            except Exception:
-                pass
-            ed.setFocus()
+        self.tree_preview.show_editor(self._current_editor())
 
-    def _on_preview_item_double_clicked(self, item: QtWidgets.QTreeWidgetItem) -> None:
-        ed = self._current_editor()
-        if not ed:
-            return
-        text = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 1)
-        line = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
-        if isinstance(line, int):
-            self._goto_line(line)
-        if isinstance(text, str) and text:
-            doc_text = ed.toPlainText()
-            start = doc_text.find(text)
-            if start < 0:
-                anchor = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 2)
-                if isinstance(anchor, str) and anchor:
-                    start = doc_text.find(anchor)
-                if start < 0:
-                    key = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 3)
-                    idx = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 4)
-                    if isinstance(key, str) and isinstance(idx, int):
-                        s2, e2 = self._locate_array_element(doc_text, key, idx)
-                        if s2 is not None and e2 is not None:
-                            start = s2
-                            text = doc_text[s2:e2]
-            if start >= 0:
-                # 选中可能的对象块范围
-                s, e = self._find_enclosing_braces(doc_text, start)
-                if s is None or e is None:
-                    s = start
-                    e = start + len(text)
-                cur = ed.textCursor()
-                cur.setPosition(s)
-                cur.setPosition(e, QtGui.QTextCursor.MoveMode.KeepAnchor)
-                ed.setTextCursor(cur)
-                try:
-                    # 确保光标与选区可见并滚动到中心
-                    ed.ensureCursorVisible()
-                except Exception:
-                    pass
-                try:
-                    ed.centerCursor()
-                except Exception:
-                    pass
-                try:
-                    ed.setFocus()
-                except Exception:
-                    pass
-
-    def _locate_array_element(self, text: str, key: str, index: int) -> tuple[Optional[int], Optional[int]]:
-        """在文本中根据属性名 key 找到数组的第 index 个对象的范围。"""
-        import re
-        m = re.search(rf'"{re.escape(key)}"\s*:\s*\[', text)
-        if not m:
-            return (None, None)
-        i = m.end()
-        depth_obj = 0
-        in_str = False
-        esc = False
-        count = -1
-        start = None
-        while i < len(text):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == '\\':
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == '{':
-                    depth_obj += 1
-                    if depth_obj == 1:
-                        count += 1
-                        if count == index:
-                            start = i
-                elif ch == '}':
-                    if depth_obj:
-                        depth_obj -= 1
-                        if depth_obj == 0 and count == index and start is not None:
-                            return (start, i + 1)
-                elif ch == ']':
-                    return (None, None)
-            i += 1
-        return (None, None)
+    def _on_preview_row_activated(self, row: PreviewRow) -> None:
+        ed = self.tree_preview.editor_for_rows(self._current_editor())
+        if ed:
+            ed.select_range(row.start, row.end)
+
+    def _on_preview_row_copy(self, row: PreviewRow) -> None:
+        ed = self.tree_preview.editor_for_rows(self._current_editor())
+        if ed:
+            QtWidgets.QApplication.clipboard().setText(ed.text_range(row.start, row.end))
 
     def _jump_to_error(self, item: QtWidgets.QListWidgetItem) -> None:
         line = item.data(QtCore.Qt.ItemDataRole.UserRole)
@@ -756,37 +589,10 @@ class JsonCreatorTab(QtWidgets.QWidget):
 
     def _check_brackets_and_quotes(self) -> None:
         ed = self._current_editor()
-        text = ed.toPlainText()
-        stack = []
-        pairs = {')': '(', ']': '[', '}': '{'}
-        openings = set(pairs.values())
-        closes = set(pairs.keys())
-        single_open = double_open = False
-        problems: list[tuple[int, str]] = []
-        line = 1
-        for ch in text:
-            if ch == '\n':
-                line += 1
-                continue
-            if ch == '"' and not single_open:
-                double_open = not double_open
-            elif ch == "'" and not double_open:
-                single_open = not single_open
-            if single_open or double_open:
-                continue
-            if ch in openings:
-                stack.append((ch, line))
-            elif ch in closes:
-                if not stack or stack[-1][0] != pairs[ch]:
-                    problems.append((line, f"括号不匹配: 意外的 {ch}"))
-                else:
-                    stack.pop()
-        for op, ln in stack:
-            problems.append((ln, f"括号未闭合: {op}"))
-        if single_open:
-            problems.append((line, "引号未闭合: '"))
-        if double_open:
-            problems.append((line, '引号未闭合: "'))
+        if not ed:
+            return
+        # 由编辑器的 BracketIndex 增量给出
+        problems = ed.lint_problems
         for ln, msg in problems:
             it = QtWidgets.QListWidgetItem(f"[lint] (行 {ln}) {msg}")
             it.setData(QtCore.Qt.ItemDataRole.UserRole, ln)
@@ -799,34 +605,3 @@ class JsonCreatorTab(QtWidgets.QWidget):
         dirty = bool(self._dirty_map.get(idx, False))
         self.lbl_saved.setText("未保存" if dirty else "已保存")
         self.act_save.setEnabled(dirty)
-
-    def _find_enclosing_braces(self, text: str, pos: int) -> tuple[Optional[int], Optional[int]]:
-        start = text.rfind('{', 0, pos)
-        if start < 0:
-            return (None, None)
-        depth = 0
-        end = None
-        i = start
-        in_str = False
-        esc = False
-        while i < len(text):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == '\\':
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == '{':
-                    depth += 1
-                elif ch == '}':
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            i += 1
-        return (start, end)
@@ -1,10 +1,16 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
 from pathlib import Path
 import json
-from typing import Optional, List, Dict
-
+from typing import Optional, List, Dict, Set
+
+from GUI.bracket_index import BracketIndex
+from GUI.document_loader import DocumentLoader, is_large_file
+from GUI.fold_index import FoldIndex
+from GUI.json_highlighter import TAB_WIDTH, BlockInfo, JsonHighlighter, indent_level
+from GUI.search_worker import SearchPipeline
+from GUI.validation_worker import PreviewRow, ValidationResult, ValidationWorker
 from src.config import CUSTOM_MISSIONS_DIR
-from src.mission_validator import validate_text, ValidationIssue
+from src.mission_validator import ValidationIssue
 
 
 class LineNumberArea(QtWidgets.QWidget):
@@ -18,24 +24,61 @@ class LineNumberArea(QtWidgets.QWidget):
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
         self.codeEditor.line_number_area_paint_event(event)
 
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        if event.button() == QtCore.Qt.MouseButton.LeftButton:
+            self.codeEditor.line_number_area_clicked(event.position().toPoint())
+        super().mousePressEvent(event)
+
 
 class CodeEditor(QtWidgets.QPlainTextEdit):
-    """简单的代码编辑器，支持行号、实时 JSON 校验、基础折叠、上下文菜单。"""
+    """简单的代码编辑器，支持行号、语法高亮、实时 JSON 校验、结构折叠、上下文菜单。"""
 
     cursorPositionChangedDetailed = QtCore.pyqtSignal(int, int)
     validationReady = QtCore.pyqtSignal(list)  # List[ValidationIssue]
+    lintChanged = QtCore.pyqtSignal()  # lint_problems 变化（括号检查与校验分开完成）
+    analysisStatusChanged = QtCore.pyqtSignal()  # analysis_status 变化
+    loadFailed = QtCore.pyqtSignal(str)
 
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        self.setTabStopDistance(4 * self.fontMetrics().horizontalAdvance(' '))
+        self.setTabStopDistance(TAB_WIDTH * self.fontMetrics().horizontalAdvance(' '))
         self.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
         self.blockCountChanged.connect(self.update_line_number_area_width)
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self._emit_cursor_pos)
+        self.cursorPositionChanged.connect(self._reveal_cursor)
+        self.cursorPositionChanged.connect(self._update_bracket_match)
         self._line_number_area = LineNumberArea(self)
-        self._folded_ranges: list[tuple[int, int]] = []
+        self._highlighter = JsonHighlighter(self.document(), self._is_dark())
+        self._brackets = BracketIndex(self.document())
+        self._bracket_match: Optional[tuple[int, int]] = None
+        self._brackets.updated.connect(self._update_bracket_match)
+        # 折叠标记依赖括号栈，累加完成后重绘行号区
+        self._brackets.updated.connect(self._line_number_area.update)
+        self._brackets.problemsReady.connect(self._on_lint_ready)
+        self._folds = FoldIndex(self.document(), self._brackets)
+        self._folds.changed.connect(self._on_folds_changed)
         self._show_indent_guides: bool = True
         self._lint_lines: set[int] = set()
+        # 最近一次校验的结果（解析出的对象、校验问题、括号/引号问题）
+        self.parsed_data: Optional[object] = None
+        self.validation_issues: list[ValidationIssue] = []
+        self.lint_problems: list[tuple[int, str]] = []
+        self.preview_rows: Optional[list[PreviewRow]] = None
+        # 文本版本：每次内容变化加一（重新着色不算）；preview_version 为 preview_rows 对应的版本
+        self.text_version = 0
+        self.preview_version = -1
+        self._submitted_version = 0
+        self.document().contentsChange.connect(self._bump_text_version)
+        self._validator = ValidationWorker(self)
+        self._validator.resultReady.connect(self._on_validation_result)
+        # 大文件模式：分块载入与后台分析的状态；(阶段, 百分比)，百分比为 -1 表示进度未知
+        self._loader: Optional[DocumentLoader] = None
+        self._validation_pending = False
+        self.analysis_status: Optional[tuple[str, int]] = None
+        self._analysis_timer = QtCore.QTimer(self)
+        self._analysis_timer.setInterval(100)
+        self._analysis_timer.timeout.connect(self._poll_analysis)
 
         self._validate_timer = QtCore.QTimer(self)
         self._validate_timer.setInterval(400)
@@ -50,11 +93,14 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         self._find_cb = None
         self._replace_cb = None
 
-    # 行号区宽度
+    # 行号区宽度（行号 + 右侧的折叠标记列）
     def line_number_area_width(self) -> int:
         digits = len(str(max(1, self.blockCount())))
         space = 10 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        return space + self._fold_marker_width()
+
+    def _fold_marker_width(self) -> int:
+        return self.fontMetrics().height()
 
     def update_line_number_area_width(self, _newBlockCount: int) -> None:
         self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
@@ -74,24 +120,55 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
 
     def line_number_area_paint_event(self, event: QtGui.QPaintEvent) -> None:
         painter = QtGui.QPainter(self._line_number_area)
-        painter.fillRect(event.rect(), self.palette().alternateBase())
+        rect = event.rect()
+        painter.fillRect(rect, self.palette().alternateBase())
+        painter.setPen(self.palette().mid().color())
+        # 字体度量与宽度对所有行相同，循环外取一次
+        text_h = self.fontMetrics().height()
+        marker_w = self._fold_marker_width()
+        text_w = self._line_number_area.width() - 6 - marker_w
+        marker_x = text_w + 6
+        align = QtCore.Qt.AlignmentFlag.AlignRight
+        folds = self._folds
+        markers: list[tuple[int, bool]] = []  # (top, 已折叠)
 
         block = self.firstVisibleBlock()
-        blockNumber = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(blockNumber + 1)
-                painter.setPen(self.palette().mid().color())
-                fm = self.fontMetrics()
-                painter.drawText(0, top, self._line_number_area.width()-6, fm.height(),
-                                 QtCore.Qt.AlignmentFlag.AlignRight, number)
-            block = block.next()
+        rect_top, rect_bottom = rect.top(), rect.bottom()
+
+        while block.isValid() and top <= rect_bottom:
+            if bottom >= rect_top and block.isVisible():
+                painter.drawText(0, top, text_w, text_h, align, str(block.blockNumber() + 1))
+                if folds.is_folded(block):
+                    markers.append((top, True))
+                elif folds.is_foldable(block):
+                    markers.append((top, False))
+            block = self._next_visible_block(block)
             top = bottom
             bottom = top + int(self.blockBoundingRect(block).height())
-            blockNumber += 1
+        if not markers:
+            return
+        # 折叠标记：已折叠 ▸，可折叠 ▾
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        painter.setBrush(self.palette().mid())
+        a = marker_w * 0.25
+        for top, folded in markers:
+            cx, cy = marker_x + marker_w / 2, top + text_h / 2
+            if folded:
+                points = [QtCore.QPointF(cx - a * 0.6, cy - a), QtCore.QPointF(cx + a * 0.8, cy), QtCore.QPointF(cx - a * 0.6, cy + a)]
+            else:
+                points = [QtCore.QPointF(cx - a, cy - a * 0.6), QtCore.QPointF(cx + a, cy - a * 0.6), QtCore.QPointF(cx, cy + a * 0.8)]
+            painter.drawPolygon(QtGui.QPolygonF(points))
+
+    def line_number_area_clicked(self, pos: QtCore.QPoint) -> None:
+        """点击行号区的折叠标记列时折叠/展开该行打开的区域。"""
+        if pos.x() < self._line_number_area.width() - self._fold_marker_width():
+            return
+        block = self.cursorForPosition(QtCore.QPoint(0, pos.y())).block()
+        if self._folds.is_folded(block) or self._folds.is_foldable(block):
+            self._folds.toggle(block)
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
         # 先让基础内容绘制
@@ -99,37 +176,91 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         # 绘制缩进引导线
         if not self._show_indent_guides:
             return
-        painter = QtGui.QPainter(self.viewport())
-        color = self.palette().mid().color()
-        color.setAlpha(110)
-        pen = QtGui.QPen(color, 1, QtCore.Qt.PenStyle.DotLine)
-        painter.setPen(pen)
-        # 每个可见行绘制引导线
+        # 缩进层级缓存在每块的 BlockInfo 里（块被编辑时由高亮器重算），
+        # 这里只收集可见行的线段，最后一次 drawLines
+        offset = self.contentOffset()
+        step = TAB_WIDTH * self.fontMetrics().horizontalAdvance(' ')
+        x0 = offset.x() + self.document().documentMargin()
+        lines: list[QtCore.QLineF] = []
         block = self.firstVisibleBlock()
-        top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
-        space_w = self.fontMetrics().horizontalAdvance(' ')
-        tab_w_spaces = max(1, int(self.tabStopDistance() / space_w))
+        top = self.blockBoundingGeometry(block).translated(offset).top()
         visible_rect = self.viewport().rect()
-        while block.isValid() and top <= visible_rect.bottom():
-            if block.isVisible() and bottom >= visible_rect.top():
-                text = block.text()
-                indent_cols = 0
-                for ch in text:
-                    if ch == ' ':
-                        indent_cols += 1
-                    elif ch == '\t':
-                        indent_cols += tab_w_spaces
-                    else:
-                        break
-                # 以4空格为一个缩进层级
-                level = indent_cols // 4
+        rect_top, rect_bottom = visible_rect.top(), visible_rect.bottom()
+        while block.isValid() and top <= rect_bottom:
+            bottom = top + self.blockBoundingRect(block).height()
+            if bottom >= rect_top and block.isVisible():
+                info = block.userData()
+                level = info.indent_level if isinstance(info, BlockInfo) else indent_level(block.text())
                 for i in range(1, level + 1):
-                    x = int(i * 4 * space_w)
-                    painter.drawLine(x, top, x, bottom)
-            block = block.next()
+                    x = int(x0 + i * step) + 0.5
+                    lines.append(QtCore.QLineF(x, top, x, bottom))
+            block = self._next_visible_block(block)
             top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
+        if not lines:
+            return
+        painter = QtGui.QPainter(self.viewport())
+        color = self.palette().mid().color()
+        color.setAlpha(110)
+        painter.setPen(QtGui.QPen(color, 1, QtCore.Qt.PenStyle.DotLine))
+        painter.drawLines(lines)
+
+    def _next_visible_block(self, block: QtGui.QTextBlock) -> QtGui.QTextBlock:
+        # 已折叠区域里是一串零高度的隐藏块，按可视行号直接跳过，不逐块遍历
+        nxt = block.next()
+        if nxt.isValid() and not nxt.isVisible():
+            jump = self.document().findBlockByLineNumber(block.firstLineNumber() + block.lineCount())
+            if jump.blockNumber() > block.blockNumber():
+                return jump
+        return nxt
+
+    def select_range(self, start: int, end: int) -> None:
+        """选中 [start, end) 并滚动到可见区域中央；偏移超出文档时截断。"""
+        last = max(0, self.document().characterCount() - 1)
+        cur = self.textCursor()
+        cur.setPosition(min(max(0, start), last))
+        cur.setPosition(min(max(0, end), last), QtGui.QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cur)
+        self.centerCursor()
+        self.setFocus()
+
+    def text_range(self, start: int, end: int) -> str:
+        cur = QtGui.QTextCursor(self.document())
+        last = max(0, self.document().characterCount() - 1)
+        cur.setPosition(min(max(0, start), last))
+        cur.setPosition(min(max(0, end), last), QtGui.QTextCursor.MoveMode.KeepAnchor)
+        return cur.selection().toPlainText()
+
+    def _is_dark(self) -> bool:
+        return self.palette().color(QtGui.QPalette.ColorRole.Base).lightness() < 128
+
+    def changeEvent(self, event: QtCore.QEvent) -> None:
+        super().changeEvent(event)
+        # 主题切换后高亮配色跟随底色
+        if event.type() == QtCore.QEvent.Type.PaletteChange:
+            dark = self._is_dark()
+            if dark != self._highlighter.dark:
+                self._highlighter.set_dark(dark)
+                self._brackets.invalidate()
+                self._folds.rekey()
+
+    def _on_folds_changed(self) -> None:
+        # 光标所在块被折叠进去时，把光标移到最近的可见行
+        block = self.textCursor().block()
+        if not block.isVisible():
+            while block.isValid() and not block.isVisible():
+                block = block.previous()
+            if block.isValid():
+                cur = self.textCursor()
+                cur.setPosition(block.position() + block.length() - 1)
+                self.setTextCursor(cur)
+        self.viewport().update()
+        self._line_number_area.update()
+
+    def _reveal_cursor(self) -> None:
+        # 跳转（查找、错误列表、预览）落进已折叠区域时自动展开
+        block = self.textCursor().block()
+        if not block.isVisible():
+            self._folds.reveal(block)
 
     def _emit_cursor_pos(self) -> None:
         cursor = self.textCursor()
@@ -140,6 +271,12 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         self._lint_lines = set(int(x) for x in lines if isinstance(x, int) and x > 0)
         self._update_extra_selections()
 
+    def _update_bracket_match(self) -> None:
+        match = self._brackets.match(self.textCursor().position())
+        if match != self._bracket_match:
+            self._bracket_match = match
+            self._update_extra_selections()
+
     def _update_extra_selections(self) -> None:
         selections: list[QtWidgets.QTextEdit.ExtraSelection] = []
         # 高亮 lint 行
@@ -154,57 +291,125 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
             fmt.setBackground(QtGui.QColor(255, 80, 80, 60))
             sel.format = fmt
             selections.append(sel)
+        # 配对括号
+        if self._bracket_match is not None:
+            fmt = QtGui.QTextCharFormat()
+            fmt.setBackground(QtGui.QColor(0, 160, 255, 70))
+            for pos in self._bracket_match:
+                sel = QtWidgets.QTextEdit.ExtraSelection()
+                cur = QtGui.QTextCursor(self.document())
+                cur.setPosition(pos)
+                cur.movePosition(QtGui.QTextCursor.MoveOperation.NextCharacter, QtGui.QTextCursor.MoveMode.KeepAnchor)
+                sel.cursor = cur
+                sel.format = fmt
+                selections.append(sel)
         self.setExtraSelections(selections)
 
-    # 校验
+    # 校验：GUI 线程只取文档快照，解析与检查在后台进行，过期结果会被丢弃
     def _run_validation(self) -> None:
-        issues = validate_text(self.toPlainText())
-        self.validationReady.emit(issues)
+        if self._loader is not None:
+            return  # 分块载入尚未完成，载入结束后统一校验
+        self._submitted_version = self.text_version
+        self._validator.submit(self.toPlainText())
+        # 括号/引号问题由逐块的 BracketIndex 在事件循环里分段得出，完成后经 lintChanged 通知
+        self._brackets.request_problems()
+
+    def _on_validation_result(self, result: ValidationResult) -> None:
+        self.parsed_data = result.data
+        self.validation_issues = result.issues
+        self.preview_rows = result.preview
+        self.preview_version = self._submitted_version  # 过期结果已被丢弃，这就是最近一次提交的快照
+        self.validationReady.emit(result.issues)
+        if self._validation_pending:
+            self._validation_pending = False
+            self._poll_analysis()
+
+    def _bump_text_version(self, _pos: int, _removed: int, _added: int) -> None:
+        self.text_version += 1
+
+    def _on_lint_ready(self, problems: list[tuple[int, str]]) -> None:
+        if problems != self.lint_problems:
+            self.lint_problems = problems
+            self.lintChanged.emit()
+
+    # 大文件模式：分块载入，载入和分析（括号/折叠索引、校验、预览）完成前只读浏览
+    def load_file(self, path: Path) -> None:
+        """按大文件模式打开 path；进度见 analysis_status，失败时发出 loadFailed。"""
+        self.cancel_loading()
+        self.setReadOnly(True)
+        self._loader = DocumentLoader(self.document(), path, self)
+        self._loader.progress.connect(self._on_load_progress)
+        self._loader.finished.connect(self._on_load_finished)
+        self._loader.failed.connect(self._on_load_failed)
+        self._set_analysis_status(("载入", 0))
+        self._loader.start()
+
+    def is_loading(self) -> bool:
+        """文档内容是否还在分块载入（此时文本不完整，不能保存）。"""
+        return self._loader is not None
+
+    def cancel_loading(self) -> None:
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader.deleteLater()
+            self._loader = None
+        self._analysis_timer.stop()
+        self._validation_pending = False
+        self._set_analysis_status(None)
+
+    def _set_analysis_status(self, status: Optional[tuple[str, int]]) -> None:
+        if status != self.analysis_status:
+            self.analysis_status = status
+            self.analysisStatusChanged.emit()
+
+    def _on_load_progress(self, done: int, total: int) -> None:
+        self._set_analysis_status(("载入", done * 100 // max(1, total)))
+
+    def _on_load_finished(self) -> None:
+        self._loader.deleteLater()
+        self._loader = None
+        # 括号索引已随载入分段累加；接着在后台校验、生成预览
+        self._validation_pending = True
+        self._run_validation()
+        self._analysis_timer.start()
+        self._poll_analysis()
+
+    def _on_load_failed(self, message: str) -> None:
+        self._loader.deleteLater()
+        self._loader = None
+        self._set_analysis_status(None)
+        self.loadFailed.emit(message)
+
+    def _poll_analysis(self) -> None:
+        if self._loader is not None:
+            return
+        progress = self._brackets.progress()
+        if progress < 1.0:
+            self._set_analysis_status(("索引括号与折叠", int(progress * 100)))
+        elif self._validation_pending:
+            self._set_analysis_status(("校验并生成预览", -1))
+        else:
+            self._analysis_timer.stop()
+            self.setReadOnly(False)
+            self._set_analysis_status(None)
 
-    # 折叠：基于简单花括号匹配
+    # 折叠：区域由 FoldIndex 按 JSON 结构给出
     def fold_at_cursor(self) -> None:
-        cursor = self.textCursor()
-        doc = self.document()
-        pos = cursor.position()
-        text = self.toPlainText()
-        start = text.rfind('{', 0, pos)
-        if start == -1:
-            return
-        depth = 0
-        end = -1
-        for i in range(start, len(text)):
-            ch = text[i]
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-                if depth == 0:
-                    end = i
-                    break
-        if end == -1:
-            return
-        start_block = doc.findBlock(start).blockNumber()
-        end_block = doc.findBlock(end).blockNumber()
-        if end_block - start_block <= 1:
-            return
-        block = doc.findBlockByNumber(start_block + 1)
-        while block.isValid() and block.blockNumber() < end_block:
-            block.setVisible(False)
-            block = block.next()
-        self._folded_ranges.append((start_block + 1, end_block - 1))
-        doc.markContentsDirty(0, doc.characterCount())
-        self.update()
+        """折叠光标所在的最内层对象/数组（光标行本身打开区域时折叠该区域）。"""
+        header = self._folds.enclosing(self.textCursor().block())
+        if header is not None:
+            self._folds.fold(header)
+
+    def fold_level(self, level: int) -> None:
+        """折叠第 level 层（1 为最外层）的所有对象/数组。"""
+        self._folds.fold_level(level)
+
+    def fold_key(self, key: str, children: bool = False) -> None:
+        """折叠键为 key 的值；children 为 True 时折叠其中的每个元素。"""
+        self._folds.fold_key(key, children)
 
     def unfold_all(self) -> None:
-        doc = self.document()
-        block = doc.begin()
-        while block.isValid():
-            if not block.isVisible():
-                block.setVisible(True)
-            block = block.next()
-        self._folded_ranges.clear()
-        doc.markContentsDirty(0, doc.characterCount())
-        self.update()
+        self._folds.unfold_all()
 
     def contextMenuEvent(self, e: QtGui.QContextMenuEvent) -> None:
         menu = self.createStandardContextMenu()
@@ -214,6 +419,10 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         act_save = menu.addAction("保存")
         menu.addSeparator()
         act_fold = menu.addAction("折叠当前块")
+        level_menu = menu.addMenu("折叠层级")
+        level_acts = {level_menu.addAction(f"第 {n} 层"): n for n in range(1, 6)}
+        each_menu = menu.addMenu("折叠每个元素")
+        each_acts = {each_menu.addAction(key): key for key in ("zones", "subconditions", "checkpoints")}
         act_unfold = menu.addAction("展开全部")
         action = menu.exec(e.globalPos())
         if action == act_find and callable(self._find_cb):
@@ -224,42 +433,129 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
             self._save_cb()
         elif action == act_fold:
             self.fold_at_cursor()
+        elif action in level_acts:
+            self.fold_level(level_acts[action])
+        elif action in each_acts:
+            self.fold_key(each_acts[action], children=True)
         elif action == act_unfold:
             self.unfold_all()
 
 
 class PreviewTree(QtWidgets.QTreeWidget):
-    """快速预览树：双击定位编辑器位置；右键复制片段文本。"""
-    navigateTo = QtCore.pyqtSignal(int)  # 行号(1-based)
+    """快速预览树：双击定位编辑器位置；右键复制片段文本。
+
+    set_rows 按分组与上一次的行对比，只修改、插入或删除变化的那一段条目；条目本身
+    不保存源码，定位与复制都按 PreviewRow 记录的偏移从编辑器取。show_editor 记下
+    当前的行来自哪个编辑器的哪个文本版本，editor_for_rows 据此拒绝已过期的偏移。
+    """
+    rowActivated = QtCore.pyqtSignal(object)  # PreviewRow
+    rowCopyRequested = QtCore.pyqtSignal(object)  # PreviewRow
+
+    _SECTIONS = (("zones", "Zone"), ("subconditions", "SubCondition"), ("checkpoints", "Checkpoint"))
 
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
         self.setHeaderLabels(["块", "预览"])
         self.setColumnWidth(0, 200)
         self.setAlternatingRowColors(True)
+        self.setUniformRowHeights(True)
         self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self._on_menu)
         self.itemDoubleClicked.connect(self._on_double)
+        self._roots: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._rows: Dict[str, List[PreviewRow]] = {}
+        self._source: Optional[tuple[CodeEditor, int]] = None  # (编辑器, 行对应的文本版本)
+
+    def set_rows(self, rows: List[PreviewRow]) -> None:
+        if not self._roots:
+            for key, title in self._SECTIONS:
+                self._roots[key] = QtWidgets.QTreeWidgetItem([title])
+                self._rows[key] = []
+                self.addTopLevelItem(self._roots[key])
+            self.expandAll()
+        grouped: Dict[str, List[PreviewRow]] = {key: [] for key in self._roots}
+        for row in rows:
+            grouped[row.section].append(row)
+        for key, new in grouped.items():
+            self._update_section(self._roots[key], self._rows[key], new)
+            self._rows[key] = new
+
+    def show_editor(self, editor: Optional[CodeEditor]) -> None:
+        """显示 editor 最近一次校验生成的预览。
+
+        editor 暂无可用预览（未校验完或有语法错误）时：同一文档保留上一次的行，
+        换成别的文档（或没有文档）则清空，不能留下原文档的行。
+        """
+        if editor is None or editor.preview_rows is None:
+            if self._source is not None and (editor is None or self._source[0] is not editor):
+                self.set_rows([])
+                self._source = None
+            return
+        self.set_rows(editor.preview_rows)
+        self._source = (editor, editor.preview_version)
+
+    def editor_for_rows(self, editor: Optional[CodeEditor]) -> Optional[CodeEditor]:
+        """行的偏移对 editor 的当前文本仍然有效时返回 editor；文本已改动或换了文档时提示并返回 None。"""
+        if editor is None or self._source != (editor, editor.text_version):
+            QtWidgets.QToolTip.showText(QtGui.QCursor.pos(), "预览已过期，等待重新校验后刷新", self)
+            return None
+        return editor
+
+    @staticmethod
+    def _update_section(root: QtWidgets.QTreeWidgetItem, old: List[PreviewRow], new: List[PreviewRow]) -> None:
+        def shown(r: PreviewRow) -> tuple[str, str]:
+            return (r.label, r.summary)
+
+        # 去掉相同的前缀与后缀，只处理中间变化的一段
+        n = min(len(old), len(new))
+        head = 0
+        while head < n and shown(old[head]) == shown(new[head]):
+            head += 1
+        tail = 0
+        while tail < n - head and shown(old[-1 - tail]) == shown(new[-1 - tail]):
+            tail += 1
+        old_mid = len(old) - head - tail
+        new_mid = len(new) - head - tail
+        for i in range(head, head + min(old_mid, new_mid)):
+            it = root.child(i)
+            it.setText(0, new[i].label)
+            it.setText(1, new[i].summary)
+        if new_mid > old_mid:
+            at = head + old_mid
+            root.insertChildren(at, [QtWidgets.QTreeWidgetItem([r.label, r.summary]) for r in new[at:at + new_mid - old_mid]])
+        elif old_mid > new_mid:
+            at = head + new_mid
+            for _ in range(old_mid - new_mid):
+                root.takeChild(at)
+
+    def row_of(self, item: QtWidgets.QTreeWidgetItem) -> Optional[PreviewRow]:
+        parent = item.parent()
+        if parent is None:
+            return None
+        for key, root in self._roots.items():
+            if root is parent:
+                i = parent.indexOfChild(item)
+                rows = self._rows[key]
+                return rows[i] if 0 <= i < len(rows) else None
+        return None
 
     def _on_double(self, item: QtWidgets.QTreeWidgetItem, _col: int) -> None:
-        # 若叶子节点携带了片段文本，交由外层处理高亮与跳转；否则仅按行号跳转
-        text = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 1)
-        if not isinstance(text, str) or not text:
-            line = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
-            if isinstance(line, int):
-                self.navigateTo.emit(line)
+        row = self.row_of(item)
+        if row is not None:
+            self.rowActivated.emit(row)
 
     def _on_menu(self, pos: QtCore.QPoint) -> None:
         item = self.itemAt(pos)
         if not item:
             return
+        row = self.row_of(item)
+        if row is None:
+            return
         menu = QtWidgets.QMenu(self)
         act_copy = menu.addAction("复制该块到剪贴板")
         action = menu.exec(self.viewport().mapToGlobal(pos))
         if action == act_copy:
-            text = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 1)
-            if isinstance(text, str):
-                QtWidgets.QApplication.clipboard().setText(text)
+            self.rowCopyRequested.emit(row)
 
 
 class JsonEditorTab(QtWidgets.QWidget):
@@ -311,8 +607,8 @@ class JsonEditorTab(QtWidgets.QWidget):
         preview_box = QtWidgets.QGroupBox("快速预览", self)
         sn_layout = QtWidgets.QVBoxLayout(preview_box)
         self.tree_preview = PreviewTree(preview_box)
-        self.tree_preview.navigateTo.connect(self._goto_line)
-        self.tree_preview.itemDoubleClicked.connect(self._on_preview_item_double_clicked)
+        self.tree_preview.rowActivated.connect(self._on_preview_row_activated)
+        self.tree_preview.rowCopyRequested.connect(self._on_preview_row_copy)
         sn_layout.addWidget(self.tree_preview)
         self._splitter.addWidget(preview_box)
 
@@ -356,7 +652,16 @@ class JsonEditorTab(QtWidgets.QWidget):
         self.tree.setRootIsDecorated(True)
         self.tree.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self._on_tree_menu)
+        self.tree.setUniformRowHeights(True)
         br_layout.addWidget(self.tree)
+        # 浏览器搜索：去抖 + 工作线程匹配，结果只对可见性变化的条目 setHidden
+        self._browser_search = SearchPipeline(self)
+        self._browser_search.resultsReady.connect(self._apply_browser_hits)
+        self._browser_items: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._browser_leaf_group: Dict[str, str] = {}
+        self._browser_groups: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._browser_visible: Dict[str, int] = {}  # 分组 → 可见子项数
+        self._browser_hits: Optional[Set[str]] = None
         self._populate_tree()
         self.browser_container.setVisible(False)
         right_v.addWidget(self.browser_container)
@@ -379,6 +684,11 @@ class JsonEditorTab(QtWidgets.QWidget):
         st_layout.addWidget(self.lbl_cursor)
         st_layout.addWidget(self.lbl_saved)
         st_layout.addStretch(1)
+        # 大文件模式的载入/分析进度
+        self.progress_analysis = QtWidgets.QProgressBar(status)
+        self.progress_analysis.setMaximumWidth(260)
+        self.progress_analysis.setVisible(False)
+        st_layout.addWidget(self.progress_analysis)
         st_layout.addWidget(self.lbl_encoding)
         center_v.addWidget(status)
 
@@ -406,7 +716,7 @@ class JsonEditorTab(QtWidgets.QWidget):
         self.tab_editors.currentChanged.connect(self._on_tab_changed)
         self.tab_editors.tabCloseRequested.connect(self._close_tab)
         self.tree.itemDoubleClicked.connect(self._open_from_item)
-        self.search_box.textChanged.connect(self._apply_browser_filter)
+        self.search_box.textChanged.connect(self._browser_search.set_query)
         self.act_open.triggered.connect(self._action_open_dialog)
         self.act_save.triggered.connect(self._action_save)
         self.act_save_as.triggered.connect(self._action_save_as)
@@ -427,8 +737,10 @@ class JsonEditorTab(QtWidgets.QWidget):
         editor = CodeEditor(page)
         editor.cursorPositionChangedDetailed.connect(self._on_cursor_changed)
         editor.textChanged.connect(lambda: self._on_editor_text_changed(editor))
-        editor.validationReady.connect(self._update_errors)
-        editor.validationReady.connect(self._maybe_refresh_preview)
+        editor.validationReady.connect(lambda issues: self._on_validation_ready(editor, issues))
+        editor.lintChanged.connect(lambda: self._on_lint_changed(editor))
+        editor.analysisStatusChanged.connect(lambda: self._show_analysis_status(editor))
+        editor.loadFailed.connect(lambda msg: self._on_load_failed(editor, msg))
         # 让 editor 的菜单可调用 Tab 的行为，及撤销/重做状态联动
         editor._save_cb = self._action_save
         editor._find_cb = self._find_text
@@ -449,6 +761,9 @@ class JsonEditorTab(QtWidgets.QWidget):
     def _on_tab_changed(self, _idx: int) -> None:
         idx = self.tab_editors.currentIndex()
         self._update_saved_label(idx)
+        self._show_analysis_status(self._current_editor())
+        self._refresh_errors()
+        self._refresh_preview()
         try:
             self._update_action_states()
         except Exception:
@@ -546,9 +861,13 @@ class JsonEditorTab(QtWidgets.QWidget):
         others_group = QtWidgets.QTreeWidgetItem(["其他", ""])
         others_group.setFlags(others_group.flags() & ~QtCore.Qt.ItemFlag.ItemIsSelectable)
 
+        leaves: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        leaf_group: Dict[str, str] = {}
+        entries = []
         for m in mods:
             if m.is_warp:
                 parent = warp_group
+                gkey = "__warp__"
             elif m.stage:
                 key = m.stage
                 if key not in stage_groups:
@@ -558,18 +877,34 @@ class JsonEditorTab(QtWidgets.QWidget):
                     stage_groups[key] = grp
                     self.tree.addTopLevelItem(grp)
                 parent = stage_groups[key]
+                gkey = key
             else:
                 parent = others_group
+                gkey = "__other__"
 
             leaf = QtWidgets.QTreeWidgetItem([m.path.name, m.name or ""])
             leaf.setData(0, QtCore.Qt.ItemDataRole.UserRole, str(m.path))
             leaf.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, m.name or "")
             parent.addChild(leaf)
+            k = str(m.path)
+            leaves[k] = leaf
+            leaf_group[k] = gkey
+            entries.append((k, f"{m.path.name}\n{m.name or ''}".lower()))
 
         if others_group.childCount() > 0:
             self.tree.addTopLevelItem(others_group)
         self.tree.expandAll()
 
+        # 新建的条目全部可见；按当前搜索词重新匹配
+        groups.update(stage_groups)
+        groups["__other__"] = others_group
+        self._browser_items = leaves
+        self._browser_leaf_group = leaf_group
+        self._browser_groups = groups
+        self._browser_visible = {k: g.childCount() for k, g in groups.items()}
+        self._browser_hits = None
+        self._browser_search.set_entries(entries)
+
     def _open_file(self, path: Path) -> None:
         # 若已打开相同文件，则切换到该标签
         for i, pth in list(self._path_map.items()):
@@ -578,20 +913,23 @@ class JsonEditorTab(QtWidgets.QWidget):
                 self._update_action_states()
                 return
         try:
-            text = Path(path).read_text(encoding="utf-8")
+            # 大文件分块载入，先给出只读的浏览视图，分析完成后才可编辑
+            large = is_large_file(path)
+            text = None if large else Path(path).read_text(encoding="utf-8")
         except OSError:
             return
         page = self._create_editor_tab()
         editor: CodeEditor = page.property("editor")
-        editor.setPlainText(text)
-        editor.validationReady.connect(self._update_errors)
-        editor.validationReady.connect(self._maybe_refresh_preview)
+        if text is not None:
+            editor.setPlainText(text)
         idx = self.tab_editors.addTab(page, path.name)
         self.tab_editors.setCurrentIndex(idx)
         self._path_map[idx] = path
         self._dirty_map[idx] = False
         self._update_saved_label(idx)
         self._update_action_states()
+        if text is None:
+            editor.load_file(path)
 
     def _action_save(self) -> None:
         idx = self.tab_editors.currentIndex()
@@ -618,6 +956,10 @@ class JsonEditorTab(QtWidgets.QWidget):
     def _save_to_path(self, idx: int, path: Path) -> None:
         page = self.tab_editors.widget(idx)
         editor: CodeEditor = page.property("editor")
+        if editor.is_loading():
+            # 文本尚不完整，保存会截断文件
+            self.lbl_saved.setText("载入中，暂不能保存")
+            return
         text = editor.toPlainText()
         try:
             json.loads(text)
@@ -654,6 +996,9 @@ class JsonEditorTab(QtWidgets.QWidget):
                     # 如果用户取消另存为，则不关闭
                     if before is after and before is None:
                         return
+        page = self.tab_editors.widget(idx)
+        if page is not None:
+            page.property("editor").cancel_loading()
         self.tab_editors.removeTab(idx)
         self._dirty_map.pop(idx, None)
         self._path_map.pop(idx, None)
@@ -704,6 +1049,8 @@ class JsonEditorTab(QtWidgets.QWidget):
                 pass
 
     def _on_editor_text_changed(self, editor: CodeEditor) -> None:
+        if editor.is_loading():
+            return  # 分块载入产生的变化不算修改
         # 根据触发的编辑器定位其所属标签索引，避免新建标签 setPlainText 期间把其他页标记为脏
         idx = -1
         for i in range(self.tab_editors.count()):
@@ -715,89 +1062,76 @@ class JsonEditorTab(QtWidgets.QWidget):
             self._dirty_map[idx] = True
             self._update_saved_label(idx)
 
-    def _on_preview_item_double_clicked(self, item: QtWidgets.QTreeWidgetItem) -> None:
-        # 双击预览块：跳转并高亮该块文本（优先括号范围，其次子串）
-        ed = self._current_editor()
-        if not ed:
+    def _show_analysis_status(self, editor: Optional[CodeEditor]) -> None:
+        if editor is not self._current_editor():
             return
-        text = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 1)
-        line = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
-        found = False
-        if isinstance(text, str) and text:
-            doc_text = ed.toPlainText()
-            start = doc_text.find(text)
-            if start < 0:
-                anchor = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 2)
-                if isinstance(anchor, str) and anchor:
-                    # 允许冒号两侧任意空白的锚点匹配（id/description）
-                    try:
-                        import re
-                        m = re.match(r'\s*"([^\"]+)"\s*:\s*"(.*)"\s*$', anchor)
-                        if m:
-                            k, v = m.group(1), m.group(2)
-                            pat = rf'"{re.escape(k)}"\s*:\s*"{re.escape(v)}"'
-                            rm = re.search(pat, doc_text)
-                            if rm:
-                                start = rm.start()
-                        if start < 0:
-                            # 后备：直接子串查找（万一完全一致）
-                            idx2 = doc_text.find(anchor)
-                            if idx2 >= 0:
-                                start = idx2
-                    except Exception:
-                        pass
-            if start < 0:
-                key = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 3)
-                idx = item.data(0, QtCore.Qt.ItemDataRole.UserRole + 4)
-                if isinstance(key, str) and isinstance(idx, int):
-                    s2, e2 = self._locate_array_element(doc_text, key, idx)
-                    if s2 is not None and e2 is not None:
-                        start = s2
-                        text = doc_text[s2:e2]
-            if start >= 0:
-                s, e = self._find_enclosing_braces(doc_text, start)
-                if s is None or e is None:
-                    s = start
-                    e = start + len(text)
-                cur = ed.textCursor()
-                cur.setPosition(s)
-                cur.setPosition(e, QtGui.QTextCursor.MoveMode.KeepAnchor)
-                ed.setTextCursor(cur)
-                try:
-                    ed.ensureCursorVisible()
-                except Exception:
-                    pass
-                try:
-                    ed.centerCursor()
-                except Exception:
-                    pass
-                try:
-                    ed.setFocus()
-                except Exception:
-                    pass
-                found = True
-        if not found and isinstance(line, int) and line > 0:
-            self._goto_line(line)
-
-    def _apply_browser_filter(self, _text: str) -> None:
-        q = (self.search_box.text() or "").lower().strip()
-        def filter_item(item: QtWidgets.QTreeWidgetItem) -> bool:
-            is_leaf = item.childCount() == 0 and item.data(0, QtCore.Qt.ItemDataRole.UserRole)
-            if is_leaf:
-                fname = item.text(0).lower()
-                title = str(item.data(0, QtCore.Qt.ItemDataRole.UserRole + 1) or "").lower()
-                visible = True if not q else (q in fname or q in title)
+        status = editor.analysis_status if editor is not None else None
+        if status is None:
+            self.progress_analysis.setVisible(False)
+            return
+        stage, percent = status
+        if percent < 0:
+            self.progress_analysis.setRange(0, 0)  # 进度未知，显示为忙碌状态
+            self.progress_analysis.setFormat(f"{stage}…（只读）")
+        else:
+            self.progress_analysis.setRange(0, 100)
+            self.progress_analysis.setValue(percent)
+            self.progress_analysis.setFormat(f"{stage} %p%（只读）")
+        self.progress_analysis.setVisible(True)
+
+    def _on_load_failed(self, editor: CodeEditor, message: str) -> None:
+        for i in range(self.tab_editors.count()):
+            page = self.tab_editors.widget(i)
+            if page and page.property("editor") is editor:
+                name = self.tab_editors.tabText(i)
+                # 内容不完整，直接关闭该页，不提示保存
+                self.tab_editors.removeTab(i)
+                self._dirty_map.pop(i, None)
+                self._path_map.pop(i, None)
+                QtWidgets.QMessageBox.warning(self, "打开失败", f"{name}: {message}")
+                break
+
+    def _on_preview_row_activated(self, row: PreviewRow) -> None:
+        # 双击预览块：按记录的源码偏移选中该块
+        ed = self.tree_preview.editor_for_rows(self._current_editor())
+        if ed:
+            ed.select_range(row.start, row.end)
+
+    def _on_preview_row_copy(self, row: PreviewRow) -> None:
+        ed = self.tree_preview.editor_for_rows(self._current_editor())
+        if ed:
+            QtWidgets.QApplication.clipboard().setText(ed.text_range(row.start, row.end))
+
+    def _apply_browser_hits(self, hits: Optional[Set[str]]) -> None:
+        """应用搜索结果（None 表示显示全部），只改动可见性发生变化的条目。"""
+        old = self._browser_hits
+        self._browser_hits = hits
+        if old is None and hits is None:
+            return
+        if old is None:
+            changed = self._browser_items.keys() - hits  # type: ignore[operator]
+        elif hits is None:
+            changed = self._browser_items.keys() - old
+        else:
+            changed = old ^ hits
+        if not changed:
+            return
+        touched: Set[str] = set()
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for key in changed:
+                item = self._browser_items.get(key)
+                if item is None:
+                    continue
+                visible = hits is None or key in hits
                 item.setHidden(not visible)
-                return visible
-            any_child_visible = False
-            for j in range(item.childCount()):
-                if filter_item(item.child(j)):
-                    any_child_visible = True
-            item.setHidden(not any_child_visible)
-            return any_child_visible
-        for i in range(self.tree.topLevelItemCount()):
-            filter_item(self.tree.topLevelItem(i))
-        self.tree.expandAll()
+                gkey = self._browser_leaf_group[key]
+                self._browser_visible[gkey] += 1 if visible else -1
+                touched.add(gkey)
+            for gkey in touched:
+                self._browser_groups[gkey].setHidden(self._browser_visible[gkey] == 0)
+        finally:
+            self.tree.setUpdatesEnabled(True)
 
     # 错误面板交互
     def _update_errors(self, issues: List[ValidationIssue]) -> None:
@@ -806,6 +1140,7 @@ class JsonEditorTab(QtWidgets.QWidget):
             line = f"(行 {it.line}) " if it.line else ""
             item = QtWidgets.QListWidgetItem(f"[{it.kind}] {line}{it.message}")
             item.setData(QtCore.Qt.ItemDataRole.UserRole, int(it.line) if it.line else None)
+            item.setData(QtCore.Qt.ItemDataRole.UserRole + 1, int(it.column) if it.column else None)
             self.err_list.addItem(item)
         # 同时执行括号/引号检查并把错误附加到列表
         self._check_brackets_and_quotes()
@@ -814,6 +1149,21 @@ class JsonEditorTab(QtWidgets.QWidget):
         self._set_error_panel_visible(has_errors)
         # 若有错误，记忆展开高度不在这里更新（由用户拖拽时改变）
 
+    def _on_validation_ready(self, editor: CodeEditor, issues: List[ValidationIssue]) -> None:
+        # 校验在后台完成，切走的标签页也会稍后送来结果：只有当前编辑器的结果才更新面板
+        if editor is self._current_editor():
+            self._update_errors(issues)
+            self._maybe_refresh_preview(issues)
+
+    def _on_lint_changed(self, editor: CodeEditor) -> None:
+        if editor is self._current_editor():
+            self._update_errors(editor.validation_issues)
+
+    def _refresh_errors(self) -> None:
+        ed = self._current_editor()
+        if ed is not None:
+            self._update_errors(ed.validation_issues)
+
     def _set_error_panel_visible(self, show: bool) -> None:
         # 使用垂直分割器的尺寸来控制错误面板高度
         try:
@@ -844,181 +1194,8 @@ class JsonEditorTab(QtWidgets.QWidget):
         self._refresh_preview()
 
     def _refresh_preview(self) -> None:
-        ed = self._current_editor()
-        try:
-            obj = json.loads(ed.toPlainText())
-        except Exception:
-            return
-        self.tree_preview.clear()
-        root_zone = QtWidgets.QTreeWidgetItem(["Zone"])
-        root_sub = QtWidgets.QTreeWidgetItem(["SubCondition"])
-        root_cp = QtWidgets.QTreeWidgetItem(["Checkpoint"])
-        self.tree_preview.addTopLevelItem(root_zone)
-        self.tree_preview.addTopLevelItem(root_sub)
-        self.tree_preview.addTopLevelItem(root_cp)
-
-        def preview(s: str, n: int = 80) -> str:
-            s1 = s.replace("\n", " ")
-            return (s1[: n] + ("…" if len(s1) > n else ""))
-
-        # zones
-        zones = obj.get("zones") if isinstance(obj, dict) else None
-        if isinstance(zones, list):
-            for i, z in enumerate(zones):
-                if not isinstance(z, dict):
-                    continue
-                zid = z.get("id") or "zone"
-                # 使用与编辑器相同缩进，便于子串定位，并记录锚点
-                text = json.dumps(z, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(zid), preview(text)])
-                anchor = f'"id": "{z.get("id")}"' if isinstance(z.get("id"), str) else None
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "zones")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_zone.addChild(it)
-
-        # subconditions
-        subs = obj.get("subconditions") if isinstance(obj, dict) else None
-        if isinstance(subs, list):
-            for i, s in enumerate(subs):
-                if not isinstance(s, dict):
-                    continue
-                sid = s.get("id") or "sub"
-                text = json.dumps(s, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(sid), preview(text)])
-                anchor = f'"id": "{s.get("id")}"' if isinstance(s.get("id"), str) else None
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "subconditions")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_sub.addChild(it)
-
-        # checkpoints 标题取 description
-        cps = obj.get("checkpoints") if isinstance(obj, dict) else None
-        if isinstance(cps, list):
-            for i, c in enumerate(cps):
-                if not isinstance(c, dict):
-                    continue
-                title = None
-                for key in ("condition", "travelcondition"):
-                    blk = c.get(key)
-                    if isinstance(blk, dict) and isinstance(blk.get("description"), str):
-                        title = blk.get("description")
-                        break
-                title = title or c.get("id") or "checkpoint"
-                text = json.dumps(c, ensure_ascii=False, indent=2)
-                it = QtWidgets.QTreeWidgetItem([str(title), preview(text)])
-                anchor = None
-                if isinstance(c.get("id"), str):
-                    anchor = f'"id": "{c.get("id")}"'
-                if anchor is None:
-                    for key in ("condition", "travelcondition"):
-                        blk = c.get(key)
-                        if isinstance(blk, dict) and isinstance(blk.get("description"), str):
-                            anchor = f'"description": "{blk.get("description")}"'
-                            break
-                ln = self._estimate_line_by_patterns(ed.toPlainText(), [anchor, text])
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole, ln)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, text)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, anchor)
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, "checkpoints")
-                it.setData(0, QtCore.Qt.ItemDataRole.UserRole + 4, i)
-                root_cp.addChild(it)
-
-        self.tree_preview.expandAll()
-
-    def _estimate_line_by_patterns(self, big: str, patterns: List[Optional[str]]) -> int:
-        """尝试用多个候选模式估算所在行：优先锚点，其次完整片段，最后返回 1。"""
-        for p in patterns:
-            if not p:
-                continue
-            idx = big.find(p)
-            if idx >= 0:
-                return big[:idx].count('\n') + 1
-        return 1
-
-    def _find_enclosing_braces(self, text: str, pos: int) -> tuple[Optional[int], Optional[int]]:
-        """从 pos 向左找到最近的 '{'，然后向右匹配 '}'，考虑字符串与转义。"""
-        start = text.rfind('{', 0, pos)
-        if start < 0:
-            return (None, None)
-        depth = 0
-        end = None
-        i = start
-        in_str = False
-        esc = False
-        while i < len(text):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == '\\':
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == '{':
-                    depth += 1
-                elif ch == '}':
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            i += 1
-        return (start, end)
-
-    def _locate_array_element(self, text: str, key: str, index: int) -> tuple[Optional[int], Optional[int]]:
-        """在文本中根据属性名 key 找到数组的第 index 个对象的范围。"""
-        import re
-        m = re.search(rf'"{re.escape(key)}"\s*:\s*\[', text)
-        if not m:
-            return (None, None)
-        i = m.end()
-        depth_obj = 0
-        in_str = False
-        esc = False
-        count = -1
-        start = None
-        while i < len(text):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == '\\':
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == '{':
-                    depth_obj += 1
-                    if depth_obj == 1:
-                        count += 1
-                        if count == index:
-                            start = i
-                elif ch == '}':
-                    if depth_obj:
-                        depth_obj -= 1
-                        if depth_obj == 0 and count == index and start is not None:
-                            return (start, i + 1)
-                elif ch == ']':
-                    return (None, None)
-            i += 1
-        return (None, None)
-
-    def _find_line_of_substring(self, big: str, small: str) -> int:
-        idx = big.find(small)
-        if idx < 0:
-            return 1
-        return big[:idx].count('\n') + 1
+        # 预览数据（摘要、源码偏移）已由后台校验生成，这里只按差异更新控件
+        self.tree_preview.show_editor(self._current_editor())
 
     def _goto_line(self, line: int) -> None:
         ed = self._current_editor()
@@ -1045,7 +1222,10 @@ class JsonEditorTab(QtWidgets.QWidget):
         cursor = ed.textCursor()
         block = ed.document().findBlockByNumber(max(0, int(line) - 1))
         if block.isValid():
-            cursor.setPosition(block.position())
+            # 结构问题带有精确列号（来自 span 表），定位到具体的值
+            col = item.data(QtCore.Qt.ItemDataRole.UserRole + 1)
+            offset = min(max(0, int(col) - 1), block.length() - 1) if col else 0
+            cursor.setPosition(block.position() + offset)
             ed.setTextCursor(cursor)
             try:
                 ed.ensureCursorVisible()
@@ -1065,38 +1245,8 @@ class JsonEditorTab(QtWidgets.QWidget):
         ed = self._current_editor()
         if not ed:
             return
-        text = ed.toPlainText()
-        stack = []
-        pairs = {')': '(', ']': '[', '}': '{'}
-        openings = set(pairs.values())
-        closes = set(pairs.keys())
-        # 简单引号匹配：不考虑转义的粗略检测
-        single_open = double_open = False
-        problems: list[tuple[int, str]] = []
-        line = 1
-        for ch in text:
-            if ch == '\n':
-                line += 1
-                continue
-            if ch == '"' and not single_open:
-                double_open = not double_open
-            elif ch == "'" and not double_open:
-                single_open = not single_open
-            if single_open or double_open:
-                continue
-            if ch in openings:
-                stack.append((ch, line))
-            elif ch in closes:
-                if not stack or stack[-1][0] != pairs[ch]:
-                    problems.append((line, f"括号不匹配: 意外的 {ch}"))
-                else:
-                    stack.pop()
-        for op, ln in stack:
-            problems.append((ln, f"括号未闭合: {op}"))
-        if single_open:
-            problems.append((line, "引号未闭合: '"))
-        if double_open:
-            problems.append((line, '引号未闭合: "'))
+        # 检查本身由编辑器的 BracketIndex 增量完成，这里只把结果加入列表
+        problems = ed.lint_problems
         for ln, msg in problems:
             it = QtWidgets.QListWidgetItem(f"[lint] (行 {ln}) {msg}")
             it.setData(QtCore.Qt.ItemDataRole.UserRole, ln)
@@ -1174,6 +1324,8 @@ class JsonEditorTab(QtWidgets.QWidget):
 
     def _replace_text(self) -> None:
         ed = self._current_editor()
+        if ed is None or ed.isReadOnly():
+            return
         find_text, ok = QtWidgets.QInputDialog.getText(self, "替换", "查找:")
         if not ok or not find_text:
             return
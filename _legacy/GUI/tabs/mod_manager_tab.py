@@ -1,9 +1,13 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, List
 
-from src.mod_manager import scan_mods, delete_mod
-from src.settings_manager import load_settings
-from src.game_sync import is_enabled_in_game, enable_mod, disable_mod
+from GUI.detail_view import MAX_ROWS, MissionDetailView, iter_detail_entries, plain_entries
+from GUI.mod_list_model import ModFilterProxy, ModListModel, ROLE_AUTHOR, ROLE_DESCRIPTIONS, ROLE_FILENAME, ROLE_VERSION
+from GUI.mod_loader import ModLoader
+from GUI.search_worker import SearchPipeline
+from src.mod_manager import delete_mod
+from src.settings_manager import settings_store
+from src.game_sync import enable_mod, disable_mod
 from src.config import CUSTOM_MISSIONS_DIR
 
 
@@ -14,6 +18,8 @@ class ModManagerTab(QtWidgets.QWidget):
     - 右侧任务流程描述汇总 checkpoints 内的 description
     - 移除启用/禁用按钮（仅保留列表勾选）
     - 刷新按钮位于任务列表区域右上方
+    - 列表为 model/view：ModListModel + ModFilterProxy，搜索与勾选只更新受影响的行
+    - 任务库在后台分批载入（ModLoader），页面立即显示，再次刷新会打断正在进行的载入
     """
 
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
@@ -42,15 +48,29 @@ class ModManagerTab(QtWidgets.QWidget):
         self.btn_refresh = QtWidgets.QPushButton("刷新", left_panel)
         left_toolbar.addWidget(self.btn_refresh)
         left_layout.addLayout(left_toolbar)
-        self.tree_mods = QtWidgets.QTreeWidget(left_panel)
-        # 仅一列展示任务名称；勾选状态仍使用第0列的复选框
-        self.tree_mods.setHeaderLabels(["任务"])
+        self.tree_mods = QtWidgets.QTreeView(left_panel)
+        # 仅一列展示任务名称；勾选状态使用第0列的复选框
+        self._model = ModListModel(self)
+        self._proxy = ModFilterProxy(self)
+        self._proxy.setSourceModel(self._model)
+        self.tree_mods.setModel(self._proxy)
         self.tree_mods.setRootIsDecorated(True)
         self.tree_mods.setAlternatingRowColors(True)
-        self.tree_mods.itemChanged.connect(self._on_tree_check_changed)
-        self.tree_mods.itemSelectionChanged.connect(self._on_tree_selection_changed)
-        self.tree_mods.itemDoubleClicked.connect(self._on_tree_double_clicked)
-        self._mods_cache = []  # type: List[Tuple[str, str, bool, Optional[str], Optional[str], list[str], Optional[str], bool]]
+        # 行高一致时视图无需逐行测量，数千行滚动也不卡
+        self.tree_mods.setUniformRowHeights(True)
+        self._model.checkRequested.connect(self._on_check_requested)
+        self._model.modelReset.connect(self.tree_mods.expandAll)
+        # 过滤后重新出现的分组默认是折叠的，插入时展开
+        self._proxy.rowsInserted.connect(self._expand_inserted_groups)
+        # 搜索：去抖后在工作线程匹配，结果只把可见性变化的行应用到代理上
+        self._search = SearchPipeline(self)
+        self._search.resultsReady.connect(self._proxy.apply_hits)
+        self._loader = ModLoader(self)
+        self._loader.batchReady.connect(self._on_mods_batch)
+        self._loader.progress.connect(self._on_load_progress)
+        self._loader.finished.connect(self._on_mods_loaded)
+        self.tree_mods.selectionModel().currentChanged.connect(self._on_tree_selection_changed)
+        self.tree_mods.doubleClicked.connect(self._on_tree_double_clicked)
         left_layout.addWidget(self.tree_mods)
         splitter.addWidget(left_panel)
 
@@ -60,9 +80,22 @@ class ModManagerTab(QtWidgets.QWidget):
         self.lbl_name = QtWidgets.QLabel("-", right_panel)
         self.lbl_version = QtWidgets.QLabel("-", right_panel)
         self.lbl_author = QtWidgets.QLabel("-", right_panel)
-        self.txt_description = QtWidgets.QTextEdit(right_panel)
-        self.txt_description.setPlaceholderText("任务流程描述…")
-        self.txt_description.setReadOnly(True)
+        # 任务流程描述：虚拟化列表，只绘制可见的检查点
+        desc_box = QtWidgets.QWidget(right_panel)
+        desc_layout = QtWidgets.QVBoxLayout(desc_box)
+        desc_layout.setContentsMargins(0, 0, 0, 0)
+        self.edit_goto_checkpoint = QtWidgets.QLineEdit(desc_box)
+        self.edit_goto_checkpoint.setPlaceholderText("跳转到检查点（序号或 id，回车）…")
+        desc_layout.addWidget(self.edit_goto_checkpoint)
+        self.detail_view = MissionDetailView(desc_box)
+        desc_layout.addWidget(self.detail_view, 1)
+        self.lbl_detail_truncated = QtWidgets.QLabel(desc_box)
+        self.lbl_detail_truncated.setVisible(False)
+        desc_layout.addWidget(self.lbl_detail_truncated)
+        # 描述行随滚动按需取出，取到上限时才知道是否被截断
+        detail_model = self.detail_view.detail_model
+        detail_model.modelReset.connect(self._update_detail_truncated)
+        detail_model.rowsInserted.connect(self._update_detail_truncated)
         # 开始条件
         self.txt_start_condition = QtWidgets.QPlainTextEdit(right_panel)
         self.txt_start_condition.setPlaceholderText("开始条件（subconditions[0].condition）…")
@@ -71,7 +104,7 @@ class ModManagerTab(QtWidgets.QWidget):
         form_layout.addRow("任务名称:", self.lbl_name)
         form_layout.addRow("版本:", self.lbl_version)
         form_layout.addRow("作者:", self.lbl_author)
-        form_layout.addRow("任务流程描述:", self.txt_description)
+        form_layout.addRow("任务流程描述:", desc_box)
         form_layout.addRow("开始条件:", self.txt_start_condition)
         splitter.addWidget(right_panel)
 
@@ -86,10 +119,16 @@ class ModManagerTab(QtWidgets.QWidget):
         self.lbl_status = QtWidgets.QLabel("Mod 总数: 0 | 启用: 0", status_frame)
         status_layout.addWidget(self.lbl_status)
         status_layout.addStretch(1)
+        self.progress_load = QtWidgets.QProgressBar(status_frame)
+        self.progress_load.setMaximumWidth(220)
+        self.progress_load.setFormat("载入中 %v/%m")
+        self.progress_load.setVisible(False)
+        status_layout.addWidget(self.progress_load)
         root.addWidget(status_frame)
 
         # 交互
-        self.search_edit.textChanged.connect(self._render_tree)
+        self.search_edit.textChanged.connect(self._search.set_query)
+        self.edit_goto_checkpoint.returnPressed.connect(self._goto_checkpoint)
         self.btn_refresh.clicked.connect(self._reload_mods)
         self.btn_select_all.clicked.connect(lambda: self._bulk_enable(True))
         self.btn_unselect_all.clicked.connect(lambda: self._bulk_enable(False))
@@ -98,290 +137,159 @@ class ModManagerTab(QtWidgets.QWidget):
 
         self._reload_mods()
 
-    def _on_tree_selection_changed(self) -> None:
-        items = self.tree_mods.selectedItems()
-        current = items[0] if items else None
-        if current is None or current.data(0, QtCore.Qt.ItemDataRole.UserRole) is None:
+    def _on_tree_selection_changed(self, current: QtCore.QModelIndex, _previous: QtCore.QModelIndex | None = None) -> None:
+        if not current.isValid() or current.data(ROLE_FILENAME) is None:
             self.lbl_name.setText("-")
             self.lbl_version.setText("-")
             self.lbl_author.setText("-")
-            self.txt_description.setPlainText("")
+            self._set_detail_entries(None)
             self.txt_start_condition.setPlainText("")
             return
-        title = current.text(0)
+        title = current.data(QtCore.Qt.ItemDataRole.DisplayRole)
         self.lbl_name.setText(title)
-        version = current.data(0, QtCore.Qt.ItemDataRole.UserRole + 1) or "-"
-        author = current.data(0, QtCore.Qt.ItemDataRole.UserRole + 2) or "-"
+        version = current.data(ROLE_VERSION) or "-"
+        author = current.data(ROLE_AUTHOR) or "-"
         self.lbl_version.setText(str(version))
         self.lbl_author.setText(str(author))
-        descs = current.data(0, QtCore.Qt.ItemDataRole.UserRole + 3) or []
-        self.txt_description.setPlainText("\n\n".join(descs) if isinstance(descs, list) else "")
+        fn = current.data(ROLE_FILENAME)
+        try:
+            from pathlib import Path
+            import json
+            obj = json.loads((Path(CUSTOM_MISSIONS_DIR) / fn).read_text(encoding="utf-8"))
+        except Exception:
+            # 文件读不到时退回扫描时收集的描述，开始条件留空
+            descs = current.data(ROLE_DESCRIPTIONS) or []
+            self._set_detail_entries(plain_entries(descs))
+            self.txt_start_condition.setPlainText("")
+            return
+        # 描述列表按需从检查点中取行，这里只创建生成器
+        self._set_detail_entries(iter_detail_entries(obj))
         # 开始条件
-        fn = current.data(0, QtCore.Qt.ItemDataRole.UserRole)
         try:
-            if fn:
-                from pathlib import Path
-                import json
-                p = Path(CUSTOM_MISSIONS_DIR) / fn
-                obj = json.loads(p.read_text(encoding="utf-8"))
-                start_text = ""
-                # 优先：subconditions[0].condition
-                scs = obj.get("subconditions")
-                if isinstance(scs, list) and scs:
-                    first = scs[0]
-                    if isinstance(first, dict):
-                        cond = first.get("condition")
-                        if isinstance(cond, dict):
-                            start_text = json.dumps(cond, ensure_ascii=False, indent=2)
-                # 回退：第一个 checkpoints[*].condition 或 travelcondition
-                if not start_text:
-                    cps = obj.get("checkpoints")
-                    if isinstance(cps, list):
-                        for c in cps:
-                            if not isinstance(c, dict):
-                                continue
-                            for key in ("condition", "travelcondition"):
-                                blk = c.get(key)
-                                if isinstance(blk, dict):
-                                    start_text = json.dumps(blk, ensure_ascii=False, indent=2)
-                                    break
-                            if start_text:
-                                break
-                # 仍无：尝试 checkpoints[*] 内 description 作为参考
-                if not start_text and isinstance(obj, dict):
-                    cps = obj.get("checkpoints")
-                    if isinstance(cps, list):
-                        for c in cps:
-                            if isinstance(c, dict):
-                                for key in ("condition", "travelcondition"):
-                                    blk = c.get(key)
-                                    if isinstance(blk, dict) and isinstance(blk.get("description"), str):
-                                        start_text = json.dumps({"description": blk.get("description")}, ensure_ascii=False, indent=2)
-                                        break
-                            if start_text:
-                                break
-                self.txt_start_condition.setPlainText(start_text)
+            self.txt_start_condition.setPlainText(self._start_condition_text(obj))
         except Exception:
             self.txt_start_condition.setPlainText("")
 
+    def _set_detail_entries(self, entries) -> None:
+        self.detail_view.set_entries(entries)
+
+    def _update_detail_truncated(self) -> None:
+        truncated = self.detail_view.detail_model.truncated
+        self.lbl_detail_truncated.setText(f"仅显示前 {MAX_ROWS} 条描述" if truncated else "")
+        self.lbl_detail_truncated.setVisible(truncated)
+
+    def _goto_checkpoint(self) -> None:
+        if not self.detail_view.scroll_to_checkpoint(self.edit_goto_checkpoint.text()):
+            QtWidgets.QToolTip.showText(
+                self.edit_goto_checkpoint.mapToGlobal(QtCore.QPoint(0, self.edit_goto_checkpoint.height())),
+                "未找到该检查点",
+                self.edit_goto_checkpoint,
+            )
+
+    @staticmethod
+    def _start_condition_text(obj) -> str:
+        import json
+        start_text = ""
+        # 优先：subconditions[0].condition
+        scs = obj.get("subconditions")
+        if isinstance(scs, list) and scs:
+            first = scs[0]
+            if isinstance(first, dict):
+                cond = first.get("condition")
+                if isinstance(cond, dict):
+                    start_text = json.dumps(cond, ensure_ascii=False, indent=2)
+        # 回退：第一个 checkpoints[*].condition 或 travelcondition
+        if not start_text:
+            cps = obj.get("checkpoints")
+            if isinstance(cps, list):
+                for c in cps:
+                    if not isinstance(c, dict):
+                        continue
+                    for key in ("condition", "travelcondition"):
+                        blk = c.get(key)
+                        if isinstance(blk, dict):
+                            start_text = json.dumps(blk, ensure_ascii=False, indent=2)
+                            break
+                    if start_text:
+                        break
+        # 仍无：尝试 checkpoints[*] 内 description 作为参考
+        if not start_text and isinstance(obj, dict):
+            cps = obj.get("checkpoints")
+            if isinstance(cps, list):
+                for c in cps:
+                    if isinstance(c, dict):
+                        for key in ("condition", "travelcondition"):
+                            blk = c.get(key)
+                            if isinstance(blk, dict) and isinstance(blk.get("description"), str):
+                                start_text = json.dumps({"description": blk.get("description")}, ensure_ascii=False, indent=2)
+                                break
+                    if start_text:
+                        break
+        return start_text
+
     def _reload_mods(self) -> None:
-        mods = scan_mods()
-        self._mods_cache = [(m.path.name, m.name, False, m.version, m.author, m.descriptions, m.stage, m.is_warp) for m in mods]
-        # 结合游戏目录状态
-        s = load_settings()
-        gdir = s.get("gameDir")
-        if gdir:
-            enabled_set = set()
-            try:
-                for i, (fn, *_rest) in enumerate(self._mods_cache):
-                    if is_enabled_in_game(fn, gdir):
-                        enabled_set.add(fn)
-                self._mods_cache = [
-                    (fn, name, fn in enabled_set, ver, au, descs, stage, is_warp)
-                    for (fn, name, _en, ver, au, descs, stage, is_warp) in self._mods_cache
-                ]
-            except Exception:
-                pass
-        self._render_tree()
-        total = len(mods)
-        enabled = sum(1 for _ in filter(lambda x: x[2], self._mods_cache))
-        self.lbl_status.setText(f"Mod 总数: {total} | 启用: {enabled}")
-
-    def _render_tree(self) -> None:
-        q = (self.search_edit.text() or "").lower().strip()
-        self.tree_mods.blockSignals(True)
-        self.tree_mods.clear()
-        # 分组：传送门、按 stage、其他
-        group_warp = QtWidgets.QTreeWidgetItem(["传送门"])
-        group_warp.setFlags(group_warp.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
-        group_warp.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-        group_map: Dict[str, QtWidgets.QTreeWidgetItem] = {}
-        group_other = QtWidgets.QTreeWidgetItem(["其他"])
-        group_other.setFlags(group_other.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
-        group_other.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-
-        def matches(text: str, filename: str) -> bool:
-            if not q:
-                return True
-            return q in (text or "").lower() or q in (filename or "").lower()
-
-        for filename, title, enabled, version, author, descs, stage, is_warp in self._mods_cache:
-            text = title or filename
-            if not matches(text, filename):
-                continue
-            node = QtWidgets.QTreeWidgetItem([text])
-            node.setData(0, QtCore.Qt.ItemDataRole.UserRole, filename)
-            node.setData(0, QtCore.Qt.ItemDataRole.UserRole + 1, version)
-            node.setData(0, QtCore.Qt.ItemDataRole.UserRole + 2, author)
-            node.setData(0, QtCore.Qt.ItemDataRole.UserRole + 3, descs)
-            node.setFlags(node.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable | QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            node.setCheckState(0, QtCore.Qt.CheckState.Checked if enabled else QtCore.Qt.CheckState.Unchecked)
-            if is_warp:
-                group_warp.addChild(node)
-            elif stage:
-                grp = group_map.get(stage)
-                if not grp:
-                    grp = QtWidgets.QTreeWidgetItem([self._display_group_name(stage)])
-                    grp.setData(0, QtCore.Qt.ItemDataRole.UserRole + 10, stage)  # 保存原始 stage
-                    grp.setFlags(grp.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
-                    grp.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-                    group_map[stage] = grp
-                grp.addChild(node)
-            else:
-                group_other.addChild(node)
-
-        # 添加到树
-        if group_warp.childCount() > 0:
-            self.tree_mods.addTopLevelItem(group_warp)
-        for stage, grp in sorted(group_map.items(), key=lambda x: x[0].lower()):
-            self.tree_mods.addTopLevelItem(grp)
-        if group_other.childCount() > 0:
-            self.tree_mods.addTopLevelItem(group_other)
-        self.tree_mods.expandAll()
-        # 渲染后根据子项勾选情况设置分组为三态（全选/部分选/不选）
-        self._update_group_states()
-        self.tree_mods.blockSignals(False)
-
-    def _display_group_name(self, stage: str) -> str:
-        mapping = {
-            "Alley": "小巷Alley",
-            "Apartment": "公寓Apartment",
-            "Convenience": "便利店Convenience",
-            "Downtown": "市中心Downtown",
-            "Mall": "商场Mall",
-            "Park": "公园Park",
-            "Residential": "住宅Residential",
-            "Shop": "商店Shop",
-            "Toilet": "厕所Toilet",
-        }
-        # 仅替换展示，不改动原值
-        return mapping.get(stage, stage)
-
-    def _on_tree_check_changed(self, item: QtWidgets.QTreeWidgetItem, _col: int) -> None:
-        filename = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
-        # 若为分组项（无文件名），级联到子节点
-        if not filename:
-            self._apply_group_check(item)
+        # 后台载入；列表保留现有内容，逐批合并，载入完成后再删去已不存在的任务
+        self._loader.start(settings_store().get("gameDir"))
+
+    def _on_mods_batch(self, batch) -> None:
+        rows = self._model.merge_mods(batch)
+        # 只把本批新增/搜索文本有变化的行交给搜索：有搜索词时它们经过匹配才会显示，
+        # 不必每批都重新匹配整个列表；载入完成后再以完整列表重置一次
+        self._search.add_entries([(r.filename, r.haystack) for r in rows])
+        self._update_status()
+
+    def _on_load_progress(self, done: int, total: int) -> None:
+        self.progress_load.setRange(0, total)  # total 为 0 时显示为忙碌状态
+        self.progress_load.setValue(done)
+        self.progress_load.setVisible(True)
+
+    def _on_mods_loaded(self, seen) -> None:
+        self._model.remove_missing(seen)
+        self._search.set_entries(self._model.search_entries())
+        self.progress_load.setVisible(False)
+        self._update_status()
+
+    def _update_status(self) -> None:
+        self.lbl_status.setText(f"Mod 总数: {self._model.total} | 启用: {self._model.enabled_count}")
+
+    def _expand_inserted_groups(self, parent: QtCore.QModelIndex, first: int, last: int) -> None:
+        if parent.isValid():
             return
-        want_enabled = item.checkState(0) == QtCore.Qt.CheckState.Checked
-        s = load_settings()
-        gdir = s.get("gameDir")
-        ok = True
-        if not gdir:
-            QtWidgets.QMessageBox.information(self, "缺少游戏目录", "请先在设置中选择游戏目录。")
-            ok = False
-        else:
-            if want_enabled:
-                ok = enable_mod(filename, gdir)
-                if not ok:
-                    QtWidgets.QMessageBox.warning(self, "启用失败", f"复制 {filename} 到游戏目录失败。")
-            else:
-                ok = disable_mod(filename, gdir)
-                if not ok:
-                    QtWidgets.QMessageBox.warning(self, "禁用失败", f"从游戏目录删除 {filename} 失败。")
-        if not ok:
-            # 还原勾选状态
-            item.setCheckState(0, QtCore.Qt.CheckState.Checked if not want_enabled else QtCore.Qt.CheckState.Unchecked)
-        # 更新状态计数
-        total_nodes = 0
-        enabled_count = 0
-        def walk(parent: QtWidgets.QTreeWidgetItem | None):
-            nonlocal total_nodes, enabled_count
-            n = self.tree_mods.topLevelItemCount() if parent is None else parent.childCount()
-            for i in range(n):
-                it = self.tree_mods.topLevelItem(i) if parent is None else parent.child(i)
-                fn = it.data(0, QtCore.Qt.ItemDataRole.UserRole)
-                if fn:
-                    total_nodes += 1
-                    if it.checkState(0) == QtCore.Qt.CheckState.Checked:
-                        enabled_count += 1
-                walk(it)
-        walk(None)
-        self.lbl_status.setText(f"Mod 总数: {total_nodes} | 启用: {enabled_count}")
-        # 同步分组三态
-        self._update_group_states()
-
-    def _apply_group_check(self, group_item: QtWidgets.QTreeWidgetItem) -> None:
-        # 分组项勾选/取消，批量应用到其子任务
-        want_enabled = group_item.checkState(0) == QtCore.Qt.CheckState.Checked
-        s = load_settings()
-        gdir = s.get("gameDir")
+        for row in range(first, last + 1):
+            self.tree_mods.expand(self._proxy.index(row, 0))
+
+    def _on_check_requested(self, source_index: QtCore.QModelIndex, want_enabled: bool) -> None:
+        group = self._model.group_at(source_index)
+        if group is not None:
+            # 分组项勾选/取消，批量应用到其当前可见的子任务
+            self._apply_enabled(self._proxy.visible_filenames(self._proxy.mapFromSource(source_index)), want_enabled)
+            return
+        filename = source_index.data(ROLE_FILENAME)
+        if filename:
+            self._apply_enabled([filename], want_enabled, report=True)
+
+    def _apply_enabled(self, filenames: List[str], want_enabled: bool, report: bool = False) -> None:
+        """在游戏目录中启用/禁用任务，并只把成功的那些同步到模型。"""
+        gdir = settings_store().get("gameDir")
         if not gdir:
             QtWidgets.QMessageBox.information(self, "缺少游戏目录", "请先在设置中选择游戏目录。")
-            # 还原复选
-            group_item.setCheckState(0, QtCore.Qt.CheckState.Unchecked if want_enabled else QtCore.Qt.CheckState.Checked)
             return
-        self.tree_mods.blockSignals(True)
-        try:
-            for i in range(group_item.childCount()):
-                it = group_item.child(i)
-                fn = it.data(0, QtCore.Qt.ItemDataRole.UserRole)
-                if not fn:
-                    continue
+        done: List[str] = []
+        # 已处于目标状态的任务不必再复制/删除文件
+        for fn in self._model.pending_changes(filenames, want_enabled):
+            ok = enable_mod(fn, gdir) if want_enabled else disable_mod(fn, gdir)
+            if ok:
+                done.append(fn)
+            elif report:
                 if want_enabled:
-                    enable_mod(fn, gdir)
-                    it.setCheckState(0, QtCore.Qt.CheckState.Checked)
+                    QtWidgets.QMessageBox.warning(self, "启用失败", f"复制 {fn} 到游戏目录失败。")
                 else:
-                    disable_mod(fn, gdir)
-                    it.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-        finally:
-            self.tree_mods.blockSignals(False)
-        # 更新分组三态与状态计数（不立即重载树，避免勾选被还原）
-        self._update_group_states()
-        # 计算状态显示
-        total_nodes = 0
-        enabled_count = 0
-        def walk(parent: QtWidgets.QTreeWidgetItem | None):
-            nonlocal total_nodes, enabled_count
-            n = self.tree_mods.topLevelItemCount() if parent is None else parent.childCount()
-            for i in range(n):
-                it = self.tree_mods.topLevelItem(i) if parent is None else parent.child(i)
-                fn = it.data(0, QtCore.Qt.ItemDataRole.UserRole)
-                if fn:
-                    total_nodes += 1
-                    if it.checkState(0) == QtCore.Qt.CheckState.Checked:
-                        enabled_count += 1
-                walk(it)
-        walk(None)
-        self.lbl_status.setText(f"Mod 总数: {total_nodes} | 启用: {enabled_count}")
-
-    def _update_group_states(self) -> None:
-        # 根据子项勾选情况，设置分组复选框为 Checked / PartiallyChecked / Unchecked
-        self.tree_mods.blockSignals(True)
-        try:
-            for i in range(self.tree_mods.topLevelItemCount()):
-                grp = self.tree_mods.topLevelItem(i)
-                # 跳过没有子节点的顶层
-                if grp.childCount() == 0:
-                    continue
-                # 分组没有文件名数据
-                all_checked = True
-                any_checked = False
-                has_child = False
-                for j in range(grp.childCount()):
-                    ch = grp.child(j)
-                    fn = ch.data(0, QtCore.Qt.ItemDataRole.UserRole)
-                    if not fn:
-                        continue
-                    has_child = True
-                    st = ch.checkState(0)
-                    if st == QtCore.Qt.CheckState.Checked:
-                        any_checked = True
-                    else:
-                        all_checked = False
-                if not has_child:
-                    grp.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-                elif all_checked:
-                    grp.setCheckState(0, QtCore.Qt.CheckState.Checked)
-                elif any_checked:
-                    grp.setCheckState(0, QtCore.Qt.CheckState.PartiallyChecked)
-                else:
-                    grp.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-        finally:
-            self.tree_mods.blockSignals(False)
+                    QtWidgets.QMessageBox.warning(self, "禁用失败", f"从游戏目录删除 {fn} 失败。")
+        self._model.set_enabled(done, want_enabled)
+        self._update_status()
 
-    def _on_tree_double_clicked(self, item: QtWidgets.QTreeWidgetItem, _col: int) -> None:
-        fn = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
+    def _on_tree_double_clicked(self, index: QtCore.QModelIndex) -> None:
+        fn = index.data(ROLE_FILENAME)
         if not fn:
             return
         from pathlib import Path
@@ -400,47 +308,20 @@ class ModManagerTab(QtWidgets.QWidget):
 
     def _bulk_enable(self, enable: bool) -> None:
         # 对可见的所有子项批量操作
-        s = load_settings()
-        gdir = s.get("gameDir")
-        if not gdir:
-            QtWidgets.QMessageBox.information(self, "缺少游戏目录", "请先在设置中选择游戏目录。")
-            return
-        # 遍历
-        def walk(parent: QtWidgets.QTreeWidgetItem | None):
-            n = self.tree_mods.topLevelItemCount() if parent is None else parent.childCount()
-            for i in range(n):
-                it = self.tree_mods.topLevelItem(i) if parent is None else parent.child(i)
-                fn = it.data(0, QtCore.Qt.ItemDataRole.UserRole)
-                if fn:
-                    if enable:
-                        enable_mod(fn, gdir)
-                        it.setCheckState(0, QtCore.Qt.CheckState.Checked)
-                    else:
-                        disable_mod(fn, gdir)
-                        it.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-                walk(it)
-        walk(None)
-        # 结束后刷新状态
-        self._reload_mods()
+        self._apply_enabled(self._proxy.visible_filenames(), enable)
 
     def _get_selected_filename(self) -> Optional[str]:
-        items = self.tree_mods.selectedItems()
-        if not items:
-            return None
-        return items[0].data(0, QtCore.Qt.ItemDataRole.UserRole)
+        return self.tree_mods.currentIndex().data(ROLE_FILENAME)
 
     # 勾选直接生效；此辅助方法已不需要
 
     def _delete_selected(self) -> None:
         # 删除当前选中子项对应的本地文件
-        items = self.tree_mods.selectedItems()
-        if not items:
-            return
-        cur = items[0]
-        filename = cur.data(0, QtCore.Qt.ItemDataRole.UserRole)
+        cur = self.tree_mods.currentIndex()
+        filename = cur.data(ROLE_FILENAME)
         if not filename:
             return
-        title = cur.text(0)
+        title = cur.data(QtCore.Qt.ItemDataRole.DisplayRole)
         ret = QtWidgets.QMessageBox.question(self, "删除确认", f"确认删除任务‘{title}’？")
         if ret != QtWidgets.QMessageBox.StandardButton.Yes:
             return
@@ -454,15 +335,15 @@ class ModManagerTab(QtWidgets.QWidget):
         self._reload_mods()
 
     def _show_tree_menu(self, pos: QtCore.QPoint) -> None:
-        item = self.tree_mods.itemAt(pos)
-        if item is None:
+        item = self.tree_mods.indexAt(pos)
+        if not item.isValid():
             return
         menu = QtWidgets.QMenu(self)
         act_open_loc = menu.addAction("打开任务文件位置")
         act_del = menu.addAction("删除")
         action = menu.exec(self.tree_mods.viewport().mapToGlobal(pos))
         if action == act_open_loc:
-            fn = item.data(0, QtCore.Qt.ItemDataRole.UserRole)
+            fn = item.data(ROLE_FILENAME)
             if fn:
                 from pathlib import Path
                 p = Path(CUSTOM_MISSIONS_DIR) / fn
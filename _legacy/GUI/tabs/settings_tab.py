@@ -1,9 +1,14 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
-from src.settings_manager import load_settings, save_settings
+from src.settings_manager import DEFAULT_SETTINGS, settings_store
 from src.game_sync import get_game_custom_dir, ensure_game_custom_dir, sync_game_to_workspace
 from src.config import CUSTOM_MISSIONS_DIR
 
 
+class _StoreSignals(QtCore.QObject):
+    # SettingsStore 在调用 get/update 的线程上通知；经由信号回到 GUI 线程再刷新控件
+    changed = QtCore.pyqtSignal(dict, bool)
+
+
 class SettingsTab(QtWidgets.QWidget):
     """设置标签页
     - 取消左侧菜单，直接展示分组
@@ -46,10 +51,14 @@ class SettingsTab(QtWidgets.QWidget):
         # 信号
         btn_restore.clicked.connect(self._restore_default)
 
-        # 加载设置
-        self._data = load_settings()
+        # 加载设置：读写都走进程内共享的 SettingsStore，写盘由它合并后延迟进行
+        self._store = settings_store()
+        self._data = self._store.snapshot()
         self._apply_to_ui()
         self._mark_saved()
+        self._store_signals = _StoreSignals(self)
+        self._store_signals.changed.connect(self._on_store_changed)
+        self._store.subscribe(self._store_signals.changed.emit)
 
     def _section_general(self) -> QtWidgets.QGroupBox:
         g = QtWidgets.QGroupBox("常规设置", self)
@@ -148,7 +157,7 @@ class SettingsTab(QtWidgets.QWidget):
             return
         self.txt_game_dir.setText(d)
         self._collect_from_ui()
-        save_settings(self._data)
+        self._store.update(self._data)
         # 检查/创建 CustomMissions
         gdir = get_game_custom_dir(d)
         if not gdir.exists():
@@ -201,13 +210,13 @@ class SettingsTab(QtWidgets.QWidget):
 
     def _save_current(self) -> None:
         self._collect_from_ui()
-        save_settings(self._data)
+        self._store.update(self._data)
         self._mark_saved()
 
     # 运行时应用主题
     def _on_theme_changed(self, theme: str) -> None:
         self._collect_from_ui()
-        save_settings(self._data)
+        self._store.update(self._data)
         # 通知主窗口应用
         w = self.parent()
         while w and not isinstance(w, QtWidgets.QMainWindow):
@@ -219,7 +228,7 @@ class SettingsTab(QtWidgets.QWidget):
     # 运行时应用语言
     def _on_language_changed(self, lang: str) -> None:
         self._collect_from_ui()
-        save_settings(self._data)
+        self._store.update(self._data)
         w = self.parent()
         while w and not isinstance(w, QtWidgets.QMainWindow):
             w = w.parent()
@@ -237,19 +246,39 @@ class SettingsTab(QtWidgets.QWidget):
             pass
 
     def _restore_default(self) -> None:
-        from src.settings_manager import DEFAULT_SETTINGS
         self._data = DEFAULT_SETTINGS.copy()
         self._apply_to_ui()
-        save_settings(self._data)
+        self._store.replace(self._data)
         self._mark_saved()
 
     def _on_game_dir_changed(self, _text: str) -> None:
-        # 文本变更自动保存
+        # 文本变更自动保存：只更新内存，连续输入由 SettingsStore 合并成一次写盘
         self._collect_from_ui()
-        save_settings(self._data)
+        self._store.update(self._data)
         self._mark_saved()
         self._validate_game_dir()
 
+    def _on_store_changed(self, changed: dict, external: bool) -> None:
+        # settings.json 被外部修改后重新加载：刷新界面。
+        # 刷新期间屏蔽控件信号，否则逐个控件触发的保存会把尚未刷新的旧值写回去
+        if not external:
+            return
+        self._data = self._store.snapshot()
+        widgets = (self.cmb_lang, self.cmb_theme, self.txt_game_dir)
+        for w in widgets:
+            w.blockSignals(True)
+        try:
+            self._apply_to_ui()
+        finally:
+            for w in widgets:
+                w.blockSignals(False)
+        win = self.window()
+        if "theme" in changed and hasattr(win, "apply_theme"):
+            win.apply_theme(self._data.get("theme", "light"))
+        if "language" in changed and hasattr(win, "apply_language"):
+            win.apply_language(self._data.get("language", "zh-CN"))
+        self._mark_saved()
+
     def _validate_game_dir(self) -> None:
         # 路径存在性校验，不存在时红色边框提示
         path = self.txt_game_dir.text().strip()
@@ -0,0 +1,162 @@
+"""编辑器校验的后台执行。
+
+CodeEditor 在去抖后把文档快照与递增的代号交给 ValidationWorker；校验在专用的单线程
+QThreadPool 中进行（解析、结构校验、预览行的生成都在这里），结果带着代号回到 GUI
+线程，GUI 线程只负责把现成的数据放进控件。已过期的代号在开始前直接跳过、完成后也
+不再发出，界面只会收到最新一次的结果。
+
+解析或校验本身抛出的异常（例如嵌套过深时 json.loads 的 RecursionError）变成一条
+syntax 问题照常送回，编辑器总能收到结果；只有编辑器已关闭、信号对象已删除时才不发出。
+
+线程池只有一个线程：校验是纯 Python 的 CPU 工作，多开线程在 GIL 下没有收益，
+而单线程也保证了词表、场景范围这些进程内缓存只在同一线程里构建。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from PyQt6 import QtCore, sip
+
+from src.condition_dsl import ConditionVocabulary, library_vocabulary
+from src.json_spans import SpanMap
+from src.mission_validator import ValidationIssue, validate_text_detailed
+from src.zone_geometry import StageBounds, library_stage_bounds
+
+
+def _condition_vocabulary() -> Optional[ConditionVocabulary]:
+    # 词表从本地任务库挖掘，仅首次校验时构建；失败时退化为不做词表检查
+    try:
+        return library_vocabulary()
+    except Exception:
+        return None
+
+
+def _stage_bounds() -> Optional[StageBounds]:
+    # 场景坐标范围同样从本地任务库统计，只构建一次
+    try:
+        return library_stage_bounds()
+    except Exception:
+        return None
+
+
+@dataclass(frozen=True)
+class PreviewRow:
+    """结构预览中的一项（zone / subcondition / checkpoint）。"""
+    section: str  # zones / subconditions / checkpoints
+    index: int
+    label: str
+    summary: str  # 源码片段压缩空白后的单行摘要
+    start: int  # 元素在校验快照中的源码偏移 [start, end)
+    end: int
+    line: int
+
+
+def _summary(text: str, start: int, end: int, n: int = 80) -> str:
+    # 只取片段开头一段压缩空白，不复制整个元素
+    s1 = " ".join(text[start:min(end, start + 4 * n)].split())
+    return s1[:n] + ("…" if len(s1) > n or end - start > 4 * n else "")
+
+
+def _row_label(section: str, item: dict) -> str:
+    if section == "checkpoints":
+        # checkpoint 标题取 description
+        for key in ("condition", "travelcondition"):
+            blk = item.get(key)
+            if isinstance(blk, dict) and isinstance(blk.get("description"), str):
+                return blk["description"]
+        return str(item.get("id") or "checkpoint")
+    return str(item.get("id") or ("zone" if section == "zones" else "sub"))
+
+
+def build_preview_rows(text: str, obj: Any, spans: SpanMap) -> List[PreviewRow]:
+    """生成结构预览的数据；位置直接取自 span 表，不在全文中查找。"""
+    rows: List[PreviewRow] = []
+    if not isinstance(obj, dict):
+        return rows
+    for section in ("zones", "subconditions", "checkpoints"):
+        items = obj.get(section)
+        if not isinstance(items, list):
+            continue
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            sp = spans.get(f"/{section}/{i}")
+            if sp is None:
+                continue
+            rows.append(PreviewRow(section, i, _row_label(section, item), _summary(text, sp.start, sp.end), sp.start, sp.end, sp.line))
+    return rows
+
+
+@dataclass
+class ValidationResult:
+    generation: int
+    issues: List[ValidationIssue]
+    data: Optional[Any]  # 解析成功时的 JSON 对象，供预览复用
+    spans: Optional[SpanMap]
+    preview: Optional[List[PreviewRow]]  # 有语法错误时为 None
+
+
+_POOL: Optional[QtCore.QThreadPool] = None
+
+
+def _pool() -> QtCore.QThreadPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = QtCore.QThreadPool()
+        _POOL.setMaxThreadCount(1)
+    return _POOL
+
+
+class _ValidateSignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(object)  # ValidationResult
+
+
+class _ValidateJob(QtCore.QRunnable):
+    def __init__(self, worker: "ValidationWorker", generation: int, text: str) -> None:
+        super().__init__()
+        self.worker = worker
+        self.generation = generation
+        self.text = text
+
+    def run(self) -> None:
+        if self._stale():
+            return  # 排队期间已有更新的快照，或编辑器已关闭
+        try:
+            issues, data, spans = validate_text_detailed(self.text, _condition_vocabulary(), _stage_bounds())
+            preview = build_preview_rows(self.text, data, spans) if data is not None and spans is not None else None
+        except RecursionError:
+            issues, data, spans, preview = [ValidationIssue("syntax", "嵌套层级过深，无法解析")], None, None, None
+        except Exception as e:
+            issues, data, spans, preview = [ValidationIssue("syntax", f"校验失败：{type(e).__name__}: {e}")], None, None, None
+        if self._stale():
+            return
+        try:
+            self.worker.signals.done.emit(ValidationResult(self.generation, issues, data, spans, preview))
+        except RuntimeError:
+            pass  # 检查之后编辑器恰好关闭，信号对象已删除
+
+    def _stale(self) -> bool:
+        worker = self.worker
+        return sip.isdeleted(worker) or sip.isdeleted(worker.signals) or worker.generation != self.generation
+
+
+class ValidationWorker(QtCore.QObject):
+    resultReady = QtCore.pyqtSignal(object)  # ValidationResult，只有最新代号
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.generation = 0
+        self.signals = _ValidateSignals(self)
+        self.signals.done.connect(self._on_done)
+
+    def submit(self, text: str) -> int:
+        """提交一份文档快照，返回其代号；之前提交但尚未完成的快照随之作废。"""
+        self.generation += 1
+        _pool().start(_ValidateJob(self, self.generation, text))
+        return self.generation
+
+    def _on_done(self, result: ValidationResult) -> None:
+        if result.generation != self.generation:
+            return
+        self.resultReady.emit(result)
@@ -5,7 +5,7 @@ from PyInstaller.utils.hooks import collect_submodules
 
 datas = [('F:\\programH\\Practice\\assets', 'assets'), ('F:\\programH\\Practice\\database', 'database'), ('F:\\programH\\Practice\\docs', 'docs'), ('F:\\programH\\Practice\\GUI', 'GUI')]
 binaries = []
-hiddenimports = ['PyQt6', 'PyQt6.QtCore', 'PyQt6.QtGui', 'PyQt6.QtWidgets', 'jsonschema', 'jsonschema.validators', 'jsonschema.exceptions']
+hiddenimports = ['PyQt6', 'PyQt6.QtCore', 'PyQt6.QtGui', 'PyQt6.QtWidgets']
 datas += collect_data_files('PyQt6')
 binaries += collect_dynamic_libs('PyQt6')
 hiddenimports += collect_submodules('PyQt6')
@@ -0,0 +1,144 @@
+"""JSON 编辑器（CodeEditor）基准测试，在 offscreen 平台上运行，不需要显示器。
+
+用合成任务生成约 --lines 行的文档，测量：
+- 载入：setPlainText 连同整篇着色的耗时；
+- 按键：在文档开头、中间、末尾分别输入字符、引号、括号与换行，报告 insertText 本身
+  （同步的重新着色）的耗时，以及之后括号累加、未闭合括号定位等分段任务里最长的一段，
+  也就是输入后界面可能卡住的最长时间；每次输入后撤销，文档保持不变；
+- 滚动重绘：按页滚动，逐帧同步重绘文本区与行号区，报告每帧耗时的中位数与 p95。
+
+用法（在 _legacy 目录下）：
+    python -m benchmarks.bench_editor [--lines N] [--repeat N] [--frames N] [--size 1000x1400]
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+# 必须在创建 QApplication 之前选定平台；APPDATA 指向临时目录，不读写用户设置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="practiceapp-bench-")
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from typing import Callable, List, Optional, Tuple  # noqa: E402
+
+from PyQt6 import QtGui, QtWidgets  # noqa: E402
+
+from benchmarks.bench_validator import synthetic_mission  # noqa: E402
+
+
+_KEYS = (("字符", "x"), ("引号", '"'), ("括号", "{"), ("换行", "\n"))
+
+
+def mission_text(lines: int) -> str:
+    """按 indent=2 序列化的合成任务，行数不少于 lines。"""
+    n = 100
+    while True:
+        text = json.dumps(synthetic_mission(n, fanout=4), indent=2)
+        have = text.count("\n") + 1
+        if have >= lines:
+            return text
+        # zones 的行数固定，按比例估算会偏少，补足后再试
+        n = max(n + 1, int(n * lines / have) + 1)
+
+
+def _drain(app: QtWidgets.QApplication, until: Optional[Callable[[], bool]] = None, idle_rounds: int = 5) -> float:
+    """处理事件直到 until() 成立且连续 idle_rounds 轮没有工作可做，返回其中最长一轮的耗时。"""
+    worst = 0.0
+    quiet = 0
+    while quiet < idle_rounds or (until is not None and not until()):
+        t0 = time.perf_counter()
+        app.processEvents()
+        dt = time.perf_counter() - t0
+        worst = max(worst, dt)
+        quiet = quiet + 1 if dt < 2e-4 else 0
+        time.sleep(0.001)
+    return worst
+
+
+def _keystrokes(app: QtWidgets.QApplication, editor, repeat: int) -> List[Tuple[str, str, float, float]]:
+    doc = editor.document()
+    end = doc.characterCount() - 1
+    rows = []
+    ready: list = []
+    editor.validationReady.connect(ready.append)
+    for where, pos in (("开头", 1), ("中间", doc.findBlockByNumber(doc.blockCount() // 2).position()), ("末尾", end - 1)):
+        for label, ch in _KEYS:
+            inserts, slices = [], []
+            for _ in range(repeat):
+                cur = QtGui.QTextCursor(doc)
+                cur.setPosition(pos)
+                editor.setTextCursor(cur)
+                t0 = time.perf_counter()
+                cur.insertText(ch)
+                inserts.append(time.perf_counter() - t0)
+                # 不等 400ms 的防抖，直接走一轮校验与括号检查，等校验结果回到 GUI 线程为止
+                editor._validate_timer.stop()
+                ready.clear()
+                editor._run_validation()
+                slices.append(_drain(app, until=lambda: bool(ready)))
+                doc.undo()
+                editor._validate_timer.stop()
+                _drain(app)
+            rows.append((where, label, statistics.median(inserts), max(slices)))
+    return rows
+
+
+def _scroll_frames(app: QtWidgets.QApplication, editor, frames: int) -> List[float]:
+    bar = editor.verticalScrollBar()
+    gutter = editor._line_number_area
+    step = max(1, bar.pageStep())
+    times = []
+    value = 0
+    for _ in range(frames):
+        value = value + step if value + step <= bar.maximum() else 0
+        bar.setValue(value)
+        t0 = time.perf_counter()
+        editor.viewport().repaint()
+        gutter.repaint()
+        times.append(time.perf_counter() - t0)
+        app.processEvents()
+    return times
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lines", type=int, default=50_000)
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--size", default="1000x1400")
+    args = ap.parse_args(argv)
+    width, height = (int(x) for x in args.size.split("x"))
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from GUI.tabs.json_editor_tab import CodeEditor
+
+    text = mission_text(args.lines)
+    editor = CodeEditor()
+    editor.resize(width, height)
+    editor.show()
+    _drain(app)
+    t0 = time.perf_counter()
+    editor.setPlainText(text)
+    load = time.perf_counter() - t0
+    _drain(app)
+    doc = editor.document()
+    print(f"  载入 {doc.blockCount()} 行 / {len(text.encode('utf-8')) / 1e6:.1f} MB（含整篇着色）: {load * 1e3:.0f} ms")
+
+    print(f"  按键（{args.repeat} 次的中位数 / 之后事件循环中最长的一段）")
+    for where, label, insert, worst in _keystrokes(app, editor, args.repeat):
+        print(f"    {where} {label:<4} insertText {insert * 1e3:7.2f} ms    最长一段 {worst * 1e3:7.2f} ms")
+
+    times = _scroll_frames(app, editor, args.frames)
+    times.sort()
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"  滚动重绘 {width}x{height}，{len(times)} 帧（文本区 + 行号区）: "
+          f"p50 {statistics.median(times) * 1e3:.2f} ms, p95 {p95 * 1e3:.2f} ms")
+    editor.close()
+
+
+if __name__ == "__main__":
+    main()
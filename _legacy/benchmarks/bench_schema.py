@@ -0,0 +1,74 @@
+"""任务 schema 校验基准测试。
+
+对比同一批输入上的几种实现：
+- baseline：重写前手写的结构检查（benchmarks.bench_validator 中保留的旧版）
+- compiled：schema_compiler 生成的专用校验函数
+- jsonschema：预先构建好的 Draft7Validator（iter_errors）
+- jsonschema.validate：每次调用都重新检查并解析 schema（settings_manager 以前的用法）
+
+同时报告 schema 的冷编译耗时与从磁盘缓存加载的耗时。
+
+jsonschema 只在这里用到，不在运行时依赖中，需先 pip install -r benchmarks/requirements.txt。
+
+用法（在 _legacy 目录下）：
+    python -m benchmarks.bench_schema [--repeat N] [--checkpoints N]
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import jsonschema
+
+from benchmarks.bench_validator import _best_of, baseline_validate_mission_structure, load_samples, synthetic_mission
+from src.mission_schema import MISSION_SCHEMA
+from src.schema_compiler import compile_schema
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--checkpoints", type=int, default=10_000)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = _timed(lambda: compile_schema(MISSION_SCHEMA, Path(tmp)))
+        warm = min(_timed(lambda: compile_schema(MISSION_SCHEMA, Path(tmp))) for _ in range(5))
+    print(f"  compile: cold {cold * 1e3:.2f} ms, from disk cache {warm * 1e3:.2f} ms")
+
+    compiled = compile_schema(MISSION_SCHEMA)
+    draft7 = jsonschema.Draft7Validator(MISSION_SCHEMA)
+    impls: Dict[str, Callable[[Any], Any]] = {
+        "baseline": baseline_validate_mission_structure,
+        "compiled": compiled,
+        "jsonschema": lambda obj: list(draft7.iter_errors(obj)),
+        "jsonschema.validate": lambda obj: jsonschema.validate(obj, MISSION_SCHEMA),
+    }
+
+    inputs = load_samples("*.json")
+    print(f"  {'input':<28}" + "".join(f"{k:>21}" for k in impls))
+
+    def row(name: str, objs: list, repeat: int) -> None:
+        cells = []
+        for fn in impls.values():
+            t = sum(_best_of(fn, obj, repeat) for obj in objs)
+            cells.append(f"{t * 1e3:18.3f} ms")
+        print(f"  {name:<28}" + "".join(cells))
+
+    row(f"library ({len(inputs)} files)", [obj for _name, obj in inputs], args.repeat)
+    big = [obj for name, obj in inputs if name.startswith("ExtremeItemSearch")]
+    row(f"ExtremeItemSearch ({len(big)})", big, args.repeat)
+    row(f"synthetic {args.checkpoints} cps", [synthetic_mission(args.checkpoints)], max(1, args.repeat // 4))
+
+
+if __name__ == "__main__":
+    main()
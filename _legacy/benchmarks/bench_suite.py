@@ -0,0 +1,315 @@
+"""任务库操作基准测试：扫描、解析、校验、哈希、同步与部署。
+
+在临时目录中用 synth_missions 生成不同规模的合成任务库（默认 100 与 1k），逐项测量：
+- scan_mods：扫描工作区并解析全部元数据
+- _parse_metadata：逐个文件解析元数据
+- validate_text：校验全部文件内容（文本预先读入，不含磁盘 IO）
+- compute_sha256：逐个文件计算哈希
+- sync_game_to_workspace：游戏目录 = 80% 相同 + 10% 同名不同内容 + 10% 新文件
+- enable_mod/disable_mod：把全部任务部署到游戏目录再撤下
+
+每项报告最快一次的耗时、中位数、吞吐量（文件/秒、MB/秒）以及 tracemalloc 统计的峰值内存。
+结果可以保存为基线 JSON；之后用 --compare 对比，超过阈值的退化项会被标出并以退出码 1 结束。
+全程离线，不会读写用户真实的 AppData 目录。
+
+用法（在 _legacy 目录下）：
+    python -m benchmarks.bench_suite [--sizes 100,1k,10k] [--repeat N] [--save base.json]
+    python -m benchmarks.bench_suite --compare base.json [--threshold 0.2] [--mem-threshold 0.25]
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# src.config 在导入时读取 APPDATA：必须在导入任何 src 模块之前把它指向临时目录，
+# 这样 scan_mods / sync 等函数操作的都是合成数据，而不是用户真实的任务库与设置
+_WORK = Path(tempfile.mkdtemp(prefix="practiceapp-bench-"))
+os.environ["APPDATA"] = str(_WORK / "appdata")
+
+import argparse  # noqa: E402
+import gc  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import statistics  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from dataclasses import asdict, dataclass  # noqa: E402
+from typing import Any, Callable, Dict, List, Optional  # noqa: E402
+
+from benchmarks.bench_validator import SAMPLES_DIR  # noqa: E402
+from benchmarks.synth_missions import _SIZES, LibraryProfile, MissionGenerator  # noqa: E402
+from src.config import CUSTOM_MISSIONS_DIR, MODS_STATE_FILE, ensure_directories  # noqa: E402
+from src.game_sync import compute_sha256, disable_mod, enable_mod, get_game_custom_dir, sync_game_to_workspace  # noqa: E402
+from src.mission_validator import validate_text  # noqa: E402
+from src.mod_manager import _parse_metadata, scan_mods  # noqa: E402
+
+
+BASELINE_FORMAT = 1
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], Any]
+    items: int  # 每次运行处理的文件/操作数
+    nbytes: int = 0  # 每次运行处理的字节数（0 表示不报告 MB/s）
+    setup: Optional[Callable[[], None]] = None  # 每次运行前恢复初始状态，不计时
+
+
+@dataclass
+class Result:
+    case: str
+    size: int
+    best: float
+    median: float
+    per_sec: float
+    mb_per_sec: float
+    peak_kb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.size}"
+
+
+# ---- 合成数据 ----
+class Library:
+    """工作区与游戏目录中的合成任务库；规模只增不减地复用已生成的文件。"""
+
+    def __init__(self, gen: MissionGenerator) -> None:
+        self.gen = gen
+        self.count = 0
+        self.paths: List[Path] = []
+        self.names: set[str] = set()
+        self.nbytes = 0
+        ensure_directories()
+
+    def resize(self, n: int) -> None:
+        if n < self.count:
+            for p in sorted(CUSTOM_MISSIONS_DIR.glob("synth_*.json"))[n:]:
+                p.unlink()
+        else:
+            for _ in self.gen.write_library(CUSTOM_MISSIONS_DIR, n - self.count, start=self.count):
+                pass
+        self.count = n
+        self.paths = sorted(CUSTOM_MISSIONS_DIR.glob("*.json"))
+        self.names = {p.name for p in self.paths}
+        self.nbytes = sum(p.stat().st_size for p in self.paths)
+        # 每 10 个任务禁用一个，让 scan_mods 的状态查找不全是默认值
+        state = {p.name: i % 10 != 0 for i, p in enumerate(self.paths)}
+        MODS_STATE_FILE.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def make_game_dir(self) -> Path:
+        """游戏目录：80% 与工作区相同，10% 同名但内容不同，10% 工作区中没有的新文件。"""
+        game = _WORK / f"game-{self.count}"
+        shutil.rmtree(game, ignore_errors=True)
+        gdir = get_game_custom_dir(game)
+        gdir.mkdir(parents=True)
+        for i, p in enumerate(self.paths):
+            if i % 10 == 1:
+                mission = self.gen.mission(1_000_000 + i)
+                (gdir / p.name).write_text(json.dumps(mission, ensure_ascii=False, indent="\t"), encoding="utf-8")
+            else:
+                shutil.copy2(p, gdir / p.name)
+            if i % 10 == 2:
+                (gdir / f"new_{p.name}").write_bytes(p.read_bytes())
+        return game
+
+    def restore_workspace(self) -> None:
+        """删除 sync 新增的文件，让下一次同步面对同样的初始状态。"""
+        with os.scandir(CUSTOM_MISSIONS_DIR) as it:
+            for entry in it:
+                if entry.name not in self.names:
+                    os.unlink(entry.path)
+
+
+def build_cases(lib: Library) -> List[Case]:
+    paths = lib.paths
+    texts = [p.read_text(encoding="utf-8") for p in paths]
+    game = lib.make_game_dir()
+    deploy = _WORK / f"deploy-{lib.count}"
+    names = [p.name for p in paths]
+    n = len(paths)
+
+    def parse_all() -> None:
+        for p in paths:
+            _parse_metadata(p)
+
+    def validate_all() -> None:
+        for t in texts:
+            validate_text(t)
+
+    def hash_all() -> None:
+        for p in paths:
+            compute_sha256(p)
+
+    def deploy_all() -> None:
+        for name in names:
+            enable_mod(name, deploy)
+        for name in names:
+            disable_mod(name, deploy)
+
+    return [
+        Case("scan_mods", scan_mods, n, lib.nbytes),
+        Case("_parse_metadata", parse_all, n, lib.nbytes),
+        Case("validate_text", validate_all, n, lib.nbytes),
+        Case("compute_sha256", hash_all, n, lib.nbytes),
+        Case("sync_game_to_workspace", lambda: sync_game_to_workspace(game), n, setup=lib.restore_workspace),
+        Case("enable_mod/disable_mod", deploy_all, 2 * n),
+    ]
+
+
+# ---- 测量 ----
+def _once(case: Case) -> float:
+    if case.setup is not None:
+        case.setup()
+    gc.collect()
+    t0 = time.perf_counter()
+    case.run()
+    return time.perf_counter() - t0
+
+
+def _peak_kb(case: Case) -> float:
+    if case.setup is not None:
+        case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(case: Case, size: int, repeat: int) -> Result:
+    _once(case)  # 预热：编译 schema、填充文件系统缓存
+    times = [_once(case) for _ in range(max(1, repeat))]
+    best = min(times)
+    return Result(
+        case=case.name,
+        size=size,
+        best=best,
+        median=statistics.median(times),
+        per_sec=case.items / best if best else float("inf"),
+        mb_per_sec=case.nbytes / 1e6 / best if case.nbytes and best else 0.0,
+        peak_kb=_peak_kb(case),
+    )
+
+
+def _print_result(r: Result) -> None:
+    mb = f"{r.mb_per_sec:8.1f} MB/s" if r.mb_per_sec else " " * 13
+    print(
+        f"  {r.case:<24} {r.size:>7} {r.best * 1e3:10.2f} ms {r.median * 1e3:10.2f} ms "
+        f"{r.per_sec:11.0f} /s {mb} {r.peak_kb:10.0f} KiB"
+    )
+
+
+# ---- 基线 ----
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save_baseline(path: Path, results: List[Result], seed: int) -> None:
+    data = {
+        "format": BASELINE_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "environment": _environment(),
+        "results": {r.key: asdict(r) for r in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def compare_baseline(path: Path, results: List[Result], threshold: float, mem_threshold: float) -> int:
+    """打印与基线的对比，返回退化项数量。
+
+    耗时比较最快一次（受噪声影响最小）；峰值内存只在增量超过 64 KiB 时才算退化，
+    避免小规模用例上的分配抖动被误报。
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("format") != BASELINE_FORMAT:
+        raise SystemExit(f"不支持的基线格式：{path}")
+    env = data.get("environment") or {}
+    if env != _environment():
+        print(f"  注意：基线环境不同（{env.get('python')} / {env.get('platform')}），对比仅供参考")
+    base: Dict[str, Dict[str, Any]] = data.get("results") or {}
+    regressions = 0
+    print(f"\n  {'case':<32} {'time':>18} {'peak memory':>20}  status")
+    for r in results:
+        old = base.get(r.key)
+        if old is None:
+            print(f"  {r.key:<32} {'':>18} {'':>20}  new")
+            continue
+        t_ratio = r.best / old["best"] if old["best"] else 1.0
+        m_delta = r.peak_kb - old["peak_kb"]
+        m_ratio = r.peak_kb / old["peak_kb"] if old["peak_kb"] else 1.0
+        slow = t_ratio > 1 + threshold
+        fat = m_ratio > 1 + mem_threshold and m_delta > 64
+        status = "REGRESSION" if slow or fat else ("faster" if t_ratio < 1 - threshold else "ok")
+        regressions += slow or fat
+        print(f"  {r.key:<32} {t_ratio:8.2f}x {(t_ratio - 1) * 100:+7.1f}% {m_ratio:9.2f}x {m_delta:+8.0f}K  {status}")
+    missing = sorted(set(base) - {r.key for r in results})
+    if missing:
+        print(f"  基线中有 {len(missing)} 项本次未运行：{', '.join(missing)}")
+    return regressions
+
+
+def _parse_sizes(text: str) -> List[int]:
+    return sorted({_SIZES.get(s.strip()) or int(s) for s in text.split(",") if s.strip()})
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="100,1k", help="任务库规模，逗号分隔：整数或 100/1k/10k/100k")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--only", default="", help="只运行名称包含这些子串的用例（逗号分隔）")
+    ap.add_argument("--samples", type=Path, default=SAMPLES_DIR, help="用于统计分布的样例目录")
+    ap.add_argument("--save", type=Path, help="把结果保存为基线 JSON")
+    ap.add_argument("--compare", type=Path, help="与已保存的基线对比")
+    ap.add_argument("--threshold", type=float, default=0.20, help="耗时退化阈值（0.2 = 慢 20%%）")
+    ap.add_argument("--mem-threshold", type=float, default=0.25, help="峰值内存退化阈值")
+    ap.add_argument("--keep", action="store_true", help="保留临时目录以便检查")
+    args = ap.parse_args(argv)
+
+    only = [s for s in args.only.split(",") if s]
+    try:
+        lib = Library(MissionGenerator(LibraryProfile.from_directory(args.samples), args.seed))
+        results: List[Result] = []
+        print(f"  {'case':<24} {'files':>7} {'best':>13} {'median':>13} {'throughput':>14} {'':>13} {'peak':>14}")
+        for size in _parse_sizes(args.sizes):
+            lib.resize(size)
+            for case in build_cases(lib):
+                if only and not any(s in case.name for s in only):
+                    continue
+                r = measure(case, size, args.repeat)
+                _print_result(r)
+                results.append(r)
+        if args.save:
+            save_baseline(args.save, results, args.seed)
+            print(f"\n  基线已保存：{args.save}")
+        if args.compare:
+            regressions = compare_baseline(args.compare, results, args.threshold, args.mem_threshold)
+            if regressions:
+                print(f"\n  {regressions} 项超过阈值")
+                return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"\n  临时目录：{_WORK}")
+        else:
+            shutil.rmtree(_WORK, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
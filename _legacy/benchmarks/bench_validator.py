@@ -0,0 +1,222 @@
+"""validate_mission_structure 基准测试。
+
+对比旧版多次扫描实现与当前覆盖同样检查的部分：旧版除 id 引用外还检查 title、zones、
+areas、stage 与 r，这些现在由 check_mission_schema 负责，所以对照的是
+check_mission_schema + build_mission_index + _check_references 三者之和。当前实现
+按 schema 逐项校验、报告更细，同样的输入上比旧版慢，speedup 小于 1 是预期结果。
+之后新增的各阶段（流程图、几何、条件表达式）旧版没有对应实现，单独各占一行只报告耗时，
+最后一行是完整的 validate_mission_structure：
+- database/CustomMissions 下的 ExtremeItemSearch 系列任务
+- 合成的 10k checkpoint 任务（每个 checkpoint 带 RandomId 扇出）
+
+最后报告全部样例的解析开销：校验热路径上的 json.loads，以及只在需要定位问题时
+才运行的 parse_with_spans。
+
+用法（在 _legacy 目录下）：
+    python -m benchmarks.bench_validator [--repeat N] [--checkpoints N] [--fanout N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from src.json_spans import parse_with_spans
+from src.mission_schema import check_mission_schema
+from src.mission_validator import (
+    ValidationIssue,
+    _check_conditions,
+    _check_flow,
+    _check_geometry,
+    _check_references,
+    build_mission_index,
+    validate_mission_structure,
+)
+
+
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / "database" / "CustomMissions"
+
+
+# ---- 旧版实现（仅作对照，保持与重写前逐行一致） ----
+def _collect_ids(items: Any, key: str) -> set[str]:
+    ids: set[str] = set()
+    if isinstance(items, list):
+        for it in items:
+            if isinstance(it, dict):
+                v = it.get(key)
+                if isinstance(v, str):
+                    ids.add(v)
+    return ids
+
+
+def baseline_validate_mission_structure(obj: Any) -> List[ValidationIssue]:
+    issues: List[ValidationIssue] = []
+    if not isinstance(obj, dict):
+        return [ValidationIssue("schema", "顶层必须是对象")]
+
+    title = obj.get("title")
+    if not isinstance(title, str) or not title.strip():
+        issues.append(ValidationIssue("schema", "缺少必填字段 title 或为空"))
+
+    zones = obj.get("zones")
+    if not isinstance(zones, list) or not zones:
+        issues.append(ValidationIssue("schema", "zones 至少包含 1 个元素"))
+    else:
+        zone_ids = _collect_ids(zones, "id")
+        if len(zone_ids) != sum(1 for z in zones if isinstance(z, dict) and isinstance(z.get("id"), str)):
+            issues.append(ValidationIssue("schema", "zones.id 必须全局唯一且为字符串"))
+        for z in zones:
+            if not isinstance(z, dict):
+                continue
+            areas = z.get("areas")
+            if not isinstance(areas, list) or not areas:
+                issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 缺少 areas 或为空"))
+            else:
+                for a in areas:
+                    if not isinstance(a, dict):
+                        continue
+                    if not isinstance(a.get("stage"), str):
+                        issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 的 area 缺少 stage"))
+                    r = a.get("r")
+                    if not isinstance(r, (int, float)) or r <= 0:
+                        issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 的 area.r 必须 > 0"))
+
+    subconditions = obj.get("subconditions")
+    if isinstance(subconditions, list):
+        sub_ids = _collect_ids(subconditions, "id")
+        if len(sub_ids) != sum(1 for s in subconditions if isinstance(s, dict) and isinstance(s.get("id"), str)):
+            issues.append(ValidationIssue("schema", "subconditions.id 必须全局唯一"))
+
+    checkpoints = obj.get("checkpoints")
+    if not isinstance(checkpoints, list) or not checkpoints:
+        issues.append(ValidationIssue("schema", "checkpoints 至少包含 1 个元素"))
+    else:
+        cp_ids = _collect_ids(checkpoints, "id")
+        if len(cp_ids) != sum(1 for c in checkpoints if isinstance(c, dict) and isinstance(c.get("id"), str)):
+            issues.append(ValidationIssue("schema", "checkpoints.id 若存在需唯一"))
+        zone_ids = _collect_ids(zones or [], "id")
+        for c in checkpoints:
+            if not isinstance(c, dict):
+                continue
+            z = c.get("zone")
+            if not isinstance(z, str) or z not in zone_ids:
+                issues.append(ValidationIssue("schema", f"checkpoint '{c.get('id','?')}' 的 zone 引用不存在"))
+            nxt = c.get("nextcheckpoint")
+            if isinstance(nxt, dict):
+                st = nxt.get("selectortype")
+                if st == "SpecificId":
+                    cid = nxt.get("id")
+                    if not isinstance(cid, str) or (cp_ids and cid not in cp_ids):
+                        issues.append(ValidationIssue("schema", f"nextcheckpoint.id '{cid}' 不存在于 checkpoints.id"))
+                elif st == "RandomId":
+                    ids = nxt.get("ids")
+                    if not isinstance(ids, list) or not ids or any(i not in cp_ids for i in ids if isinstance(i, str)):
+                        issues.append(ValidationIssue("schema", "nextcheckpoint.ids 非法或包含不存在的 id"))
+    return issues
+
+
+# ---- 输入 ----
+def load_samples(pattern: str = "ExtremeItemSearch*.json") -> list[tuple[str, Any]]:
+    out = []
+    for p in sorted(SAMPLES_DIR.glob(pattern)):
+        try:
+            out.append((p.name, json.loads(p.read_text(encoding="utf-8"))))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return out
+
+
+def synthetic_mission(n_checkpoints: int = 10_000, fanout: int = 216) -> dict:
+    """生成 n 个 checkpoint 的任务：每 10 个 checkpoint 出现一次 RandomId 扇出，其余为 SpecificId 链。"""
+    zones = [
+        {"id": f"z{i}", "areas": [{"type": "sphere", "stage": "Park", "x": i, "y": 0, "z": 0, "r": 1}]}
+        for i in range(32)
+    ]
+    cps = []
+    for i in range(n_checkpoints):
+        cp: dict = {"id": f"cp{i}", "zone": f"z{i % 32}", "condition": {"description": f"step {i}"}}
+        if i + 1 < n_checkpoints:
+            if i % 10 == 0:
+                hi = min(n_checkpoints, i + 1 + fanout)
+                cp["nextcheckpoint"] = {"selectortype": "RandomId", "ids": [f"cp{j}" for j in range(i + 1, hi)]}
+            else:
+                cp["nextcheckpoint"] = {"selectortype": "SpecificId", "id": f"cp{i + 1}"}
+        cps.append(cp)
+    return {"title": "synthetic", "zones": zones, "subconditions": [], "checkpoints": cps}
+
+
+# ---- 计时 ----
+def _best_of(fn: Callable[[Any], Any], obj: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(obj)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _schema_index_and_references(obj: Any) -> List[ValidationIssue]:
+    """当前实现中与旧版覆盖同样检查的部分。"""
+    issues = [ValidationIssue("schema", message, pointer=pointer) for pointer, message in check_mission_schema(obj)]
+    if isinstance(obj, dict):
+        _check_references(obj, build_mission_index(obj), issues)
+    return issues
+
+
+# 旧版没有对应实现的阶段：(名称, 函数)
+_PHASES: list[tuple[str, Callable[[Any], Any]]] = [
+    ("flow", lambda obj: _check_flow(obj, [])),
+    ("geometry", lambda obj: _check_geometry(obj, [], None)),
+    ("conditions", lambda obj: _check_conditions(obj, build_mission_index(obj), [], None, None)),
+    ("full validate_mission_structure", validate_mission_structure),
+]
+
+
+def _row(name: str, obj: Any, repeat: int) -> None:
+    old = baseline_validate_mission_structure(obj)
+    new = validate_mission_structure(obj)
+    # 旧实现不做条件表达式、流程图与几何检查，只比较结构类问题
+    if [(i.kind, i.message) for i in old] != [(i.kind, i.message) for i in new if i.kind in ("syntax", "schema")]:
+        print(f"  !! {name}: 结果与旧实现不一致")
+    t_old = _best_of(baseline_validate_mission_structure, obj, repeat)
+    t_new = _best_of(_schema_index_and_references, obj, repeat)
+    speedup = t_old / t_new if t_new else float("inf")
+    print(f"  {name:<48} {t_old * 1e3:9.3f} ms {t_new * 1e3:13.3f} ms {speedup:7.2f}x")
+    for phase, fn in _PHASES:
+        t = _best_of(fn, obj, repeat)
+        print(f"    + {phase:<44} {'-':>12} {t * 1e3:13.3f} ms")
+
+
+def _parse_rows(repeat: int) -> None:
+    texts = []
+    for p in sorted(SAMPLES_DIR.glob("*.json")):
+        try:
+            texts.append(p.read_text(encoding="utf-8"))
+        except OSError:
+            continue
+    t_loads = _best_of(lambda ts: [json.loads(t) for t in ts], texts, repeat)
+    t_spans = _best_of(lambda ts: [parse_with_spans(t) for t in ts], texts, repeat)
+    print(f"  parse ({len(texts)} samples)")
+    print(f"    + {'json.loads':<44} {'-':>12} {t_loads * 1e3:13.3f} ms")
+    print(f"    + {'parse_with_spans (only to locate issues)':<44} {'-':>12} {t_spans * 1e3:13.3f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--checkpoints", type=int, default=10_000)
+    ap.add_argument("--fanout", type=int, default=216)
+    args = ap.parse_args(argv)
+
+    print(f"  {'input':<48} {'baseline':>12} {'schema+idx+refs':>16} {'speedup':>8}")
+    for name, obj in load_samples():
+        _row(name, obj, args.repeat)
+    syn = synthetic_mission(args.checkpoints, args.fanout)
+    _row(f"synthetic {args.checkpoints} cps / fanout {args.fanout}", syn, max(1, args.repeat // 4))
+    _parse_rows(max(1, args.repeat // 4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""可复现的合成任务/任务库生成器，用于基准测试。
+
+分布从 database/CustomMissions 的样例中统计（LibraryProfile）：zone 数、每个 zone 的
+area 数、场景与坐标范围、半径、checkpoint 数、nextcheckpoint 类型与 RandomId 扇出、
+各动作列表的长度与动作类型、条件串以及描述文本（中日韩与英文混合，按分句重组）。
+
+同一 (seed, 序号) 总是生成同一个任务，与生成顺序、并发方式无关。
+任务逐个写盘；超大单任务（--checkpoints）按 checkpoint 流式写出，内存占用与规模无关。
+
+用法（在 _legacy 目录下）：
+    python -m benchmarks.synth_missions OUT_DIR --count 1000 [--seed 1]
+    python -m benchmarks.synth_missions OUT_DIR --checkpoints 20000 [--fanout 216]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from benchmarks.bench_validator import SAMPLES_DIR
+
+
+_SUBREF = re.compile(r"SubCondition_\w+")
+_CLAUSE = re.compile(r"[^，。！？；,.!?;]+[，。！？；,.!?;]?")
+_JUMP_LISTS = ("oncomplete", "onviolatecondition", "onmetcondition")
+_SIZES = {"100": 100, "1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+
+@dataclass
+class LibraryProfile:
+    """从样例任务库统计得到的经验分布；各列表直接作为抽样总体。"""
+    zone_counts: List[int] = field(default_factory=list)
+    areas_per_zone: List[int] = field(default_factory=list)
+    stages: List[str] = field(default_factory=list)  # 每个 area 的场景，按出现频率
+    stage_box: Dict[str, Tuple[List[float], List[float]]] = field(default_factory=dict)
+    radii: List[float] = field(default_factory=list)
+    checkpoint_counts: List[int] = field(default_factory=list)
+    sub_counts: List[int] = field(default_factory=list)
+    p_travel: float = 0.0
+    p_next: float = 0.0  # 带 nextcheckpoint 的比例
+    p_random: float = 0.0  # nextcheckpoint 中 RandomId 的比例
+    fanouts: List[int] = field(default_factory=list)
+    list_lengths: Dict[str, List[int]] = field(default_factory=dict)  # 动作列表名 -> 长度（含 0）
+    actions: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # 类型 -> 样例动作
+    action_types: List[str] = field(default_factory=list)
+    conditions: List[str] = field(default_factory=list)
+    clauses: List[str] = field(default_factory=list)
+    titles: List[str] = field(default_factory=list)
+    block_extras: List[Dict[str, Any]] = field(default_factory=list)  # duration/rp/hideprogress 等
+
+    @classmethod
+    def from_directory(cls, directory: Path = SAMPLES_DIR) -> "LibraryProfile":
+        prof = cls()
+        lists: Dict[str, List[int]] = {k: [] for k in _JUMP_LISTS}
+        n_cp = n_travel = n_next = n_random = 0
+        coords: Dict[str, List[Tuple[float, float, float]]] = {}
+        for p in sorted(Path(directory).glob("*.json")):
+            try:
+                obj = json.loads(p.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if not isinstance(obj, dict):
+                continue
+            if isinstance(obj.get("title"), str):
+                prof.titles.append(obj["title"])
+            zones = obj.get("zones")
+            zones = [z for z in zones if isinstance(z, dict)] if isinstance(zones, list) else []
+            prof.zone_counts.append(len(zones))
+            for z in zones:
+                areas = z.get("areas")
+                areas = [a for a in areas if isinstance(a, dict)] if isinstance(areas, list) else []
+                prof.areas_per_zone.append(len(areas))
+                for a in areas:
+                    stage, r = a.get("stage"), a.get("r")
+                    if not isinstance(stage, str) or not _is_number(r):
+                        continue
+                    prof.stages.append(stage)
+                    prof.radii.append(r)
+                    pt = _point_of(a)
+                    if r < 1000 and pt is not None:
+                        coords.setdefault(stage, []).append(pt)
+            subs = obj.get("subconditions")
+            subs = [s for s in subs if isinstance(s, dict)] if isinstance(subs, list) else []
+            prof.sub_counts.append(len(subs))
+            prof.conditions.extend(s["condition"] for s in subs if isinstance(s.get("condition"), str))
+            cps = obj.get("checkpoints")
+            cps = [c for c in cps if isinstance(c, dict)] if isinstance(cps, list) else []
+            prof.checkpoint_counts.append(len(cps))
+            for c in cps:
+                n_cp += 1
+                n_travel += "travelcondition" in c
+                nxt = c.get("nextcheckpoint")
+                if isinstance(nxt, dict):
+                    n_next += 1
+                    if nxt.get("selectortype") == "RandomId" and isinstance(nxt.get("ids"), list):
+                        n_random += 1
+                        prof.fanouts.append(len(nxt["ids"]))
+                for key in ("condition", "travelcondition"):
+                    blk = c.get(key)
+                    if not isinstance(blk, dict):
+                        continue
+                    if isinstance(blk.get("condition"), str):
+                        prof.conditions.append(blk["condition"])
+                    if isinstance(blk.get("description"), str):
+                        prof.clauses.extend(m.group(0).strip() for m in _CLAUSE.finditer(blk["description"]) if m.group(0).strip())
+                    prof.block_extras.append({k: blk[k] for k in ("duration", "rp", "hideprogress", "hidepanel", "reset") if k in blk})
+                    for lk in _JUMP_LISTS:
+                        acts = blk.get(lk)
+                        acts = [a for a in acts if isinstance(a, dict)] if isinstance(acts, list) else []
+                        lists[lk].append(len(acts))
+                        for a in acts:
+                            kind = a.get("type")
+                            if not isinstance(kind, str):
+                                continue
+                            prof.actions.setdefault(kind, []).append(a)
+                            prof.action_types.append(kind)
+                            pt = _point_of(a)
+                            if kind == "dropItem" and isinstance(a.get("stage"), str) and pt is not None:
+                                coords.setdefault(a["stage"], []).append(pt)
+        prof.list_lengths = lists
+        prof.p_travel = n_travel / max(1, n_cp)
+        prof.p_next = n_next / max(1, n_cp)
+        prof.p_random = n_random / max(1, n_next)
+        for stage, pts in coords.items():
+            lo = [min(p[i] for p in pts) for i in range(3)]
+            hi = [max(p[i] for p in pts) for i in range(3)]
+            prof.stage_box[stage] = (lo, hi)
+        return prof
+
+    def summary(self) -> Dict[str, Any]:
+        """关键分布的摘要，便于与生成结果对比。"""
+        def mean(xs: List[float]) -> float:
+            return round(sum(xs) / len(xs), 3) if xs else 0.0
+        return {
+            "zones/mission": mean(self.zone_counts),
+            "areas/zone": mean(self.areas_per_zone),
+            "checkpoints/mission": mean(self.checkpoint_counts),
+            "p_random": round(self.p_random, 3),
+            "fanout": mean(self.fanouts),
+            "oncomplete/block": mean(self.list_lengths.get("oncomplete", [])),
+            "top_actions": Counter(self.action_types).most_common(5),
+            "cjk_ratio": round(_cjk_ratio(self.clauses), 3),
+        }
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _point_of(obj: Dict[str, Any]) -> Optional[Tuple[float, float, float]]:
+    """area / dropItem 的坐标；缺少或不是数值时返回 None。"""
+    pt = (obj.get("x"), obj.get("y"), obj.get("z"))
+    return pt if all(_is_number(v) for v in pt) else None  # type: ignore[return-value]
+
+
+def _nested(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """两个球是否一个完全包含另一个。"""
+    d = math.dist((a["x"], a["y"], a["z"]), (b["x"], b["y"], b["z"]))
+    return d + min(a["r"], b["r"]) <= max(a["r"], b["r"])
+
+
+def _cjk_ratio(texts: List[str]) -> float:
+    total = cjk = 0
+    for t in texts:
+        total += len(t)
+        cjk += sum(1 for ch in t if "\u3040" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af")
+    return cjk / total if total else 0.0
+
+
+class MissionGenerator:
+    """按 LibraryProfile 生成任务。mission(i) 只依赖 (seed, i)。"""
+
+    def __init__(self, profile: LibraryProfile, seed: int = 0) -> None:
+        self.profile = profile
+        self.seed = seed
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{index}")
+
+    # ---- 片段 ----
+    def _description(self, rng: random.Random) -> str:
+        return "".join(rng.choice(self.profile.clauses) for _ in range(rng.randint(1, 3)))
+
+    def _point(self, rng: random.Random, stage: str) -> Tuple[float, float, float]:
+        lo, hi = self.profile.stage_box.get(stage, ([-50.0] * 3, [50.0] * 3))
+        return tuple(round(rng.uniform(lo[i], hi[i]), 2) for i in range(3))  # type: ignore[return-value]
+
+    def _condition(self, rng: random.Random, sub_ids: List[str]) -> Optional[str]:
+        for _ in range(8):
+            text = rng.choice(self.profile.conditions)
+            if "SubCondition_" not in text:
+                return text
+            if sub_ids:
+                return _SUBREF.sub(lambda _m: f"SubCondition_{rng.choice(sub_ids)}", text)
+        return None
+
+    def _action(self, rng: random.Random, i: int, cp_ids: List[str], stage: str) -> Dict[str, Any]:
+        kind = rng.choice(self.profile.action_types)
+        while kind == "setCheckpoint" and i + 1 >= len(cp_ids):
+            kind = rng.choice(self.profile.action_types)
+        act = dict(rng.choice(self.profile.actions[kind]))
+        if kind == "setCheckpoint":
+            # 只向后跳，避免生成没有出口的环
+            act = {"type": "setCheckpoint", "selectortype": "SpecificId", "id": cp_ids[rng.randrange(i + 1, len(cp_ids))]}
+        elif kind == "dropItem":
+            act["stage"] = stage
+            act["x"], act["y"], act["z"] = self._point(rng, stage)
+        return act
+
+    def _selector(self, rng: random.Random, i: int, cp_ids: List[str], fanout: Optional[int]) -> Dict[str, Any]:
+        n = len(cp_ids)
+        if rng.random() < self.profile.p_random and n > 1:
+            k = fanout if fanout is not None else rng.choice(self.profile.fanouts)
+            # 目标从整个 checkpoint 列表中抽取（不含自身），扇出不会因靠近列表末尾而被截短；
+            # 下一个 checkpoint 总在其中，任何 checkpoint 都有通往终点的路径，不会出现无出口的环
+            picks = {j if j < i else j + 1 for j in rng.sample(range(n - 1), min(max(1, k), n - 1))}
+            if i + 1 not in picks:
+                picks.discard(max(picks))
+                picks.add(i + 1)
+            return {"selectortype": "RandomId", "ids": [cp_ids[j] for j in sorted(picks)]}
+        return {"selectortype": "SpecificId", "id": cp_ids[i + 1]}
+
+    def _block(self, rng: random.Random, i: int, cp_ids: List[str], sub_ids: List[str], stage: str) -> Dict[str, Any]:
+        blk: Dict[str, Any] = {"description": self._description(rng)}
+        cond = self._condition(rng, sub_ids)
+        if cond is not None:
+            blk["condition"] = cond
+        blk.update(rng.choice(self.profile.block_extras))
+        for lk in _JUMP_LISTS:
+            n = rng.choice(self.profile.list_lengths[lk])
+            if n:
+                blk[lk] = [self._action(rng, i, cp_ids, stage) for _ in range(n)]
+        return blk
+
+    def _checkpoint(
+        self, rng: random.Random, i: int, cp_ids: List[str], zone_ids: List[str], sub_ids: List[str], stage: str,
+        fanout: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        cp: Dict[str, Any] = {"id": cp_ids[i], "zone": rng.choice(zone_ids)}
+        cp["condition"] = self._block(rng, i, cp_ids, sub_ids, stage)
+        if rng.random() < self.profile.p_travel:
+            cp["travelcondition"] = self._block(rng, i, cp_ids, sub_ids, stage)
+        # 最后一个 checkpoint 不跳转，保证任务可以结束
+        if i + 1 < len(cp_ids) and rng.random() < self.profile.p_next:
+            cp["nextcheckpoint"] = self._selector(rng, i, cp_ids, fanout)
+        return cp
+
+    def _header(self, rng: random.Random, index: int) -> Tuple[Dict[str, Any], List[str], List[str], str]:
+        prof = self.profile
+        stage = rng.choice(prof.stages)
+        zones = []
+        for z in range(max(1, rng.choice(prof.zone_counts))):
+            areas: List[Dict[str, Any]] = []
+            for _ in range(max(1, rng.choice(prof.areas_per_zone))):
+                # 同一 zone 内的区域互不包含，否则校验器会报告多余区域；重试几次仍不行就放弃这个区域
+                for _try in range(8):
+                    x, y, zz = self._point(rng, stage)
+                    area = {"type": "sphere", "stage": stage, "x": x, "y": y, "z": zz, "r": rng.choice(prof.radii)}
+                    if not any(_nested(area, other) for other in areas):
+                        areas.append(area)
+                        break
+            zones.append({"id": f"zone{z}", "areas": areas})
+        sub_ids = [f"c{k}" for k in range(rng.choice(prof.sub_counts))]
+        subs = []
+        for sid in sub_ids:
+            cond = self._condition(rng, [])
+            subs.append({"id": sid, "condition": cond or "Naked"})
+        head = {
+            "title": f"{rng.choice(prof.titles)} #{index}",
+            "listmission": True,
+            "addtitleinlist": rng.random() < 0.5,
+            "addtitleinpanel": rng.random() < 0.5,
+            "zones": zones,
+            "subconditions": subs,
+        }
+        return head, [z["id"] for z in zones], sub_ids, stage
+
+    # ---- 对外接口 ----
+    def mission(self, index: int, n_checkpoints: Optional[int] = None) -> Dict[str, Any]:
+        rng = self._rng(index)
+        head, zone_ids, sub_ids, stage = self._header(rng, index)
+        n = n_checkpoints or max(1, rng.choice(self.profile.checkpoint_counts))
+        cp_ids = [f"cp{i}" for i in range(n)]
+        head["checkpoints"] = [self._checkpoint(rng, i, cp_ids, zone_ids, sub_ids, stage) for i in range(n)]
+        return head
+
+    def write_mission_stream(
+        self, fp: TextIO, index: int, n_checkpoints: int, fanout: Optional[int] = None
+    ) -> None:
+        """把单个任务流式写到 fp：checkpoint 逐个生成、逐个写出，不在内存中保留整个任务。"""
+        rng = self._rng(index)
+        head, zone_ids, sub_ids, stage = self._header(rng, index)
+        cp_ids = [f"cp{i}" for i in range(n_checkpoints)]
+        body = json.dumps(head, ensure_ascii=False, indent="\t")
+        fp.write(body[:-2])  # 去掉结尾的 "\n}"
+        fp.write(',\n\t"checkpoints": [')
+        for i in range(n_checkpoints):
+            cp = self._checkpoint(rng, i, cp_ids, zone_ids, sub_ids, stage, fanout)
+            text = json.dumps(cp, ensure_ascii=False, indent="\t").replace("\n", "\n\t\t")
+            fp.write(("\n\t\t" if i == 0 else ",\n\t\t") + text)
+        fp.write("\n\t]\n}\n")
+
+    def write_library(self, out_dir: Path, count: int, start: int = 0) -> Iterator[Path]:
+        """逐个生成并写出 count 个任务文件，边写边产出路径。"""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(start, start + count):
+            path = out_dir / f"synth_{index:06d}.json"
+            path.write_text(json.dumps(self.mission(index), ensure_ascii=False, indent="\t"), encoding="utf-8")
+            yield path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("out", type=Path, help="输出目录")
+    ap.add_argument("--count", default="100", help="任务数量：整数或 100/1k/10k/100k")
+    ap.add_argument("--checkpoints", type=int, default=0, help="改为生成单个含 N 个 checkpoint 的任务")
+    ap.add_argument("--fanout", type=int, default=None, help="单任务模式下 RandomId 的固定扇出（默认按样例分布）")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--samples", type=Path, default=SAMPLES_DIR, help="用于统计分布的样例目录")
+    ap.add_argument("--compare", action="store_true", help="生成后重新统计输出目录，与样例分布对比")
+    args = ap.parse_args(argv)
+
+    profile = LibraryProfile.from_directory(args.samples)
+    gen = MissionGenerator(profile, args.seed)
+    t0 = time.perf_counter()
+    if args.checkpoints:
+        args.out.mkdir(parents=True, exist_ok=True)
+        path = args.out / f"synth_{args.checkpoints}cps.json"
+        with path.open("w", encoding="utf-8") as fp:
+            gen.write_mission_stream(fp, 0, args.checkpoints, args.fanout)
+        print(f"{path}  {path.stat().st_size / 1e6:.1f} MB  {time.perf_counter() - t0:.2f}s")
+        return
+    count = _SIZES.get(args.count) or int(args.count)
+    total = 0
+    for path in gen.write_library(args.out, count):
+        total += path.stat().st_size
+    print(f"{count} missions -> {args.out}  {total / 1e6:.1f} MB  {time.perf_counter() - t0:.2f}s")
+    if args.compare:
+        print("samples  ", json.dumps(profile.summary(), ensure_ascii=False))
+        print("generated", json.dumps(LibraryProfile.from_directory(args.out).summary(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
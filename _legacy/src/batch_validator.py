@@ -0,0 +1,371 @@
+"""任务库批量校验（无界面）。
+
+- 在进程池中对目录树下的全部 *.json 运行 validate_text
+- 结果按文件内容的 SHA-256 缓存；路径索引另存 (size, mtime_ns, sha)，
+  文件未改动时连读取都可以省掉，重复运行只剩 stat 开销；内容相同的文件只校验一次
+- 缓存带校验器指纹（相关源码的哈希 + 词表），校验逻辑或词表变化后自动失效
+- 输出 JSON 与 JUnit-XML 报告，包含每个文件的耗时
+
+本模块不依赖 PyQt。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from .condition_dsl import ConditionVocabulary
+from .mission_validator import ValidationIssue, validate_text
+from .zone_geometry import StageBounds
+
+
+CACHE_FORMAT = 1
+# 未命中缓存的文件少于该数量时直接在本进程校验，省去进程池启动开销
+POOL_MIN_FILES = 32
+_VALIDATOR_SOURCES = (
+    "mission_validator.py", "mission_schema.py", "schema_compiler.py", "condition_dsl.py",
+    "checkpoint_graph.py", "json_spans.py", "zone_geometry.py", "batch_validator.py",
+)
+
+
+@dataclass
+class FileResult:
+    path: str  # 相对扫描根目录，使用 / 分隔
+    sha256: str
+    seconds: float  # 实际校验耗时（命中缓存时为当初校验的耗时）
+    issues: List[ValidationIssue] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+@dataclass
+class BatchReport:
+    root: str
+    results: List[FileResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    workers: int = 0
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [r for r in self.results if r.issues]
+
+    @property
+    def cached_count(self) -> int:
+        return sum(1 for r in self.results if r.cached)
+
+
+def validator_fingerprint(
+    vocabulary: Optional[ConditionVocabulary] = None, bounds: Optional[StageBounds] = None
+) -> str:
+    """校验器源码、词表与场景范围的哈希，作为缓存的版本号。"""
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    src_dir = Path(__file__).resolve().parent
+    for name in _VALIDATOR_SOURCES:
+        try:
+            h.update(name.encode())
+            h.update((src_dir / name).read_bytes())
+        except OSError:
+            continue
+    if vocabulary is not None:
+        h.update(b"vocab")
+        h.update("\n".join(sorted(vocabulary.known)).encode("utf-8"))
+    if bounds is not None:
+        h.update(b"bounds")
+        h.update(bounds.fingerprint().encode("utf-8"))
+    return h.hexdigest()
+
+
+def scan_mission_files(root: Path) -> List[Tuple[str, str, Optional[os.stat_result]]]:
+    """目录树下的全部 .json 文件，返回按相对路径排序的 (相对路径, 绝对路径, stat)。
+
+    直接用 os.scandir 遍历：DirEntry 自带类型信息（Windows 上连 stat 也是缓存的），
+    比 Path.rglob + Path.stat 少一大截对象开销，上万文件时差别明显。
+    """
+    out: List[Tuple[str, str, Optional[os.stat_result]]] = []
+    stack: List[Tuple[str, str]] = [(str(root), "")]
+    while stack:
+        base, prefix = stack.pop()
+        try:
+            it = os.scandir(base)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir():
+                        stack.append((e.path, f"{prefix}{e.name}/"))
+                    elif e.name.endswith(".json") and e.is_file():
+                        try:
+                            st: Optional[os.stat_result] = e.stat()
+                        except OSError:
+                            st = None
+                        out.append((f"{prefix}{e.name}", e.path, st))
+                except OSError:
+                    continue
+    out.sort()
+    return out
+
+
+def _issue_from_dict(d: Dict[str, Any]) -> ValidationIssue:
+    return ValidationIssue(d["kind"], d["message"], d.get("line"), d.get("column"), d.get("pointer"))
+
+
+def validate_bytes(
+    data: bytes, vocabulary: Optional[ConditionVocabulary] = None, bounds: Optional[StageBounds] = None
+) -> List[ValidationIssue]:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return [ValidationIssue("syntax", f"文件不是有效的 UTF-8 编码：{e.reason}（字节偏移 {e.start}）")]
+    return validate_text(text, vocabulary, bounds)
+
+
+# ---- 进程池 worker ----
+
+_worker_vocabulary: Optional[ConditionVocabulary] = None
+_worker_bounds: Optional[StageBounds] = None
+
+
+def _init_worker(vocabulary: Optional[ConditionVocabulary], bounds: Optional[StageBounds]) -> None:
+    global _worker_vocabulary, _worker_bounds
+    _worker_vocabulary = vocabulary
+    _worker_bounds = bounds
+
+
+def _validate_blob(data: bytes) -> Tuple[float, List[Dict[str, Any]]]:
+    """校验一份文件内容，返回 (耗时, issues)。结果需可 pickle。"""
+    t0 = time.perf_counter()
+    issues = validate_bytes(data, _worker_vocabulary, _worker_bounds)
+    return time.perf_counter() - t0, [asdict(i) for i in issues]
+
+
+# ---- 缓存 ----
+
+class ResultCache:
+    """内容哈希 -> 校验结果 的缓存，附带 路径 -> (size, mtime_ns, sha) 的快速索引。"""
+
+    def __init__(self, path: Optional[Path], fingerprint: str) -> None:
+        self.path = Path(path) if path is not None else None
+        self.fingerprint = fingerprint
+        self.by_sha: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, List[Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict) or raw.get("fingerprint") != self.fingerprint:
+            # 校验器或词表已变化，旧结果全部作废
+            self._dirty = True
+            return
+        self.by_sha = raw.get("results") or {}
+        self.stats = raw.get("files") or {}
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entry = self.stats.get(path)
+        if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+            return None
+        res = self.by_sha.get(entry[2])
+        return (entry[2], res) if res is not None else None
+
+    def lookup_sha(self, sha: str) -> Optional[Dict[str, Any]]:
+        return self.by_sha.get(sha)
+
+    def store(self, path: str, st: Optional[os.stat_result], sha: str, seconds: float, issues: List[Dict[str, Any]]) -> None:
+        if not sha:
+            return
+        self.by_sha[sha] = {"seconds": seconds, "issues": issues}
+        if st is not None:
+            self.stats[path] = [st.st_size, st.st_mtime_ns, sha]
+        self._dirty = True
+
+    def prune(self, root: Path, live_paths: Iterable[str]) -> None:
+        """丢弃 root 下已不存在的路径以及不再被任何路径引用的结果，避免缓存无限增长。
+
+        其他目录的条目保持不动，多个任务库可以共用一个缓存文件。
+        """
+        live = set(live_paths)
+        prefix = os.path.join(str(root), "")
+        stale = [p for p in self.stats if p.startswith(prefix) and p not in live]
+        for p in stale:
+            del self.stats[p]
+        used = {e[2] for e in self.stats.values()}
+        orphan = [s for s in self.by_sha if s not in used]
+        for s in orphan:
+            del self.by_sha[s]
+        if stale or orphan:
+            self._dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        payload = {"fingerprint": self.fingerprint, "results": self.by_sha, "files": self.stats}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+# ---- 批量校验 ----
+
+def validate_directory(
+    root: Path,
+    cache_path: Optional[Path] = None,
+    vocabulary: Optional[ConditionVocabulary] = None,
+    bounds: Optional[StageBounds] = None,
+    workers: Optional[int] = None,
+) -> BatchReport:
+    """校验 root 下全部任务文件。cache_path 为 None 时不使用缓存；workers 为 0 时不启用进程池。"""
+    t0 = time.perf_counter()
+    root = Path(root).resolve()
+    cache = ResultCache(cache_path, validator_fingerprint(vocabulary, bounds))
+    files = scan_mission_files(root)
+    report = BatchReport(root=str(root))
+
+    rel_of: Dict[str, str] = {}
+    stat_of: Dict[str, Optional[os.stat_result]] = {}
+    by_path: Dict[str, FileResult] = {}
+    misses: List[str] = []
+    for rel, path, st in files:
+        rel_of[path] = rel
+        stat_of[path] = st
+        hit = cache.lookup(path, st) if st is not None else None
+        if hit is not None:
+            sha, res = hit
+            by_path[path] = FileResult(rel, sha, res["seconds"], [_issue_from_dict(d) for d in res["issues"]], cached=True)
+        else:
+            misses.append(path)
+
+    def accept(path: str, sha: str, seconds: float, issues: List[Dict[str, Any]], cached: bool = False) -> None:
+        cache.store(path, stat_of.get(path), sha, seconds, issues)
+        by_path[path] = FileResult(rel_of[path], sha, seconds, [_issue_from_dict(d) for d in issues], cached=cached)
+
+    # 未命中 stat 索引的文件先在本进程读取并求哈希：内容未变（touch、复制、移动）的
+    # 仍按哈希命中；内容相同的多个文件只校验一次
+    pending: Dict[str, Tuple[bytes, List[str]]] = {}
+    for path in misses:
+        try:
+            data = Path(path).read_bytes()
+        except OSError as e:
+            by_path[path] = FileResult(rel_of[path], "", 0.0, [ValidationIssue("syntax", f"无法读取文件：{e}")])
+            continue
+        sha = hashlib.sha256(data).hexdigest()
+        res = cache.lookup_sha(sha)
+        if res is not None:
+            accept(path, sha, res["seconds"], res["issues"], cached=True)
+        elif sha in pending:
+            pending[sha][1].append(path)
+        else:
+            pending[sha] = (data, [path])
+
+    def fan_out(sha: str, seconds: float, issues: List[Dict[str, Any]]) -> None:
+        for path in pending[sha][1]:
+            accept(path, sha, seconds, issues)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(pending) >= POOL_MIN_FILES:
+        report.workers = min(workers, len(pending))
+        shas = list(pending)
+        chunk = max(1, len(shas) // (report.workers * 8))
+        with ProcessPoolExecutor(report.workers, initializer=_init_worker, initargs=(vocabulary, bounds)) as pool:
+            for sha, (seconds, issues) in zip(shas, pool.map(_validate_blob, (pending[k][0] for k in shas), chunksize=chunk)):
+                fan_out(sha, seconds, issues)
+    else:
+        _init_worker(vocabulary, bounds)
+        for sha, (data, _paths) in pending.items():
+            fan_out(sha, *_validate_blob(data))
+
+    report.results = [by_path[path] for _rel, path, _st in files]
+    cache.prune(root, stat_of.keys())
+    cache.save()
+    report.elapsed = time.perf_counter() - t0
+    return report
+
+
+# ---- 报告 ----
+
+def report_to_json(report: BatchReport) -> Dict[str, Any]:
+    return {
+        "root": report.root,
+        "summary": {
+            "files": len(report.results),
+            "failed": len(report.failed),
+            "issues": sum(len(r.issues) for r in report.results),
+            "cached": report.cached_count,
+            "workers": report.workers,
+            "elapsed": round(report.elapsed, 6),
+        },
+        "files": [
+            {
+                "path": r.path,
+                "sha256": r.sha256,
+                "seconds": round(r.seconds, 6),
+                "cached": r.cached,
+                "issues": [asdict(i) for i in r.issues],
+            }
+            for r in report.results
+        ],
+    }
+
+
+def _format_issue(i: ValidationIssue) -> str:
+    loc = f"{i.line}:{i.column}" if i.line is not None else "-"
+    ptr = f" {i.pointer}" if i.pointer else ""
+    return f"[{i.kind}] {loc}{ptr} {i.message}"
+
+
+def report_to_junit(report: BatchReport) -> ET.ElementTree:
+    """每个文件一个 testcase；有问题的文件记为 failure，问题逐行列在正文中。"""
+    suites = ET.Element("testsuites")
+    suite = ET.SubElement(
+        suites,
+        "testsuite",
+        name="missions",
+        tests=str(len(report.results)),
+        failures=str(len(report.failed)),
+        errors="0",
+        time=f"{report.elapsed:.6f}",
+    )
+    for r in report.results:
+        parent, _, name = r.path.rpartition("/")
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            classname=parent.replace("/", ".") or "missions",
+            name=name,
+            time=f"{r.seconds:.6f}",
+        )
+        if r.issues:
+            fail = ET.SubElement(case, "failure", message=f"{len(r.issues)} 个问题：{r.issues[0].message}", type=r.issues[0].kind)
+            fail.text = "\n".join(_format_issue(i) for i in r.issues)
+    suites.set("tests", suite.get("tests"))
+    suites.set("failures", suite.get("failures"))
+    suites.set("time", suite.get("time"))
+    return ET.ElementTree(suites)
+
+
+def write_reports(report: BatchReport, json_path: Optional[Path] = None, junit_path: Optional[Path] = None) -> None:
+    if json_path is not None:
+        Path(json_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(json_path).write_text(json.dumps(report_to_json(report), ensure_ascii=False, indent=2), encoding="utf-8")
+    if junit_path is not None:
+        Path(junit_path).parent.mkdir(parents=True, exist_ok=True)
+        tree = report_to_junit(report)
+        ET.indent(tree)
+        tree.write(str(junit_path), encoding="utf-8", xml_declaration=True)
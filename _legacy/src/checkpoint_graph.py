@@ -0,0 +1,249 @@
+"""checkpoint 流程图分析。
+
+节点为 checkpoints 数组下标，边来自：
+- nextcheckpoint SpecificId / RandomId
+- 省略 nextcheckpoint 时默认进入数组中的下一个 checkpoint（最后一个则任务结束）
+- condition / travelcondition 的 oncomplete、onviolatecondition、onmetcondition 中的 setCheckpoint
+
+存储采用紧凑表示：普通边放在 CSR 数组里；目标数不少于 FANOUT_HUB_MIN 的
+RandomId 扇出被折叠成共享的“枢纽”节点，其目标是排好序的下标元组，相同的 id 列表
+只保存一份。每个枢纽的目标在每次遍历中只走一遍，因此所有分析（可达性、无法结束的死路、
+环、最长路径）都是 O(V+E)。分析开始时把各节点的后继一次性取成列表，遍历中不再
+逐个切片或查表。
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+FANOUT_HUB_MIN = 8
+_JUMP_LISTS = ("oncomplete", "onviolatecondition", "onmetcondition")
+
+
+@dataclass
+class CheckpointGraph:
+    """checkpoint 图：节点 0..n-1 为 checkpoint，n..n+len(hubs)-1 为扇出枢纽。"""
+    n: int
+    offsets: array  # CSR：节点 u 的后继为 targets[offsets[u]:offsets[u+1]]
+    targets: array
+    hubs: List[Tuple[int, ...]] = field(default_factory=list)  # 每个枢纽的目标（升序）
+    labels: List[str] = field(default_factory=list)  # 用于报告的 checkpoint 名称
+
+    @property
+    def node_count(self) -> int:
+        return self.n + len(self.hubs)
+
+    def successors(self, u: int) -> Sequence[int]:
+        if u < self.n:
+            return self.targets[self.offsets[u]:self.offsets[u + 1]]
+        return self.hubs[u - self.n]
+
+    def successor_lists(self) -> List[Sequence[int]]:
+        """全部节点的后继，按节点编号排列；一次分析里多次遍历时先取出来复用。"""
+        n, offsets, targets = self.n, self.offsets, self.targets
+        return [targets[offsets[u]:offsets[u + 1]] for u in range(n)] + list(self.hubs)
+
+
+@dataclass
+class FlowReport:
+    checkpoint_count: int
+    unreachable: List[int] = field(default_factory=list)  # 从起点无法到达
+    dead_ends: List[int] = field(default_factory=list)  # 可达但无论如何都无法走到任务结束
+    cycles: List[List[int]] = field(default_factory=list)  # 可达的环（强连通分量）
+    closed_cycles: List[List[int]] = field(default_factory=list)  # 没有出口的环
+    longest_path: List[int] = field(default_factory=list)  # 起点出发的最长无环路径（环按一步计）
+
+
+def _selector_targets(sel: Any, id_to_index: Dict[str, int]) -> Tuple[List[int], Optional[Tuple[int, ...]]]:
+    """解析选择器，返回 (普通目标, RandomId 目标元组或 None)。未知 id 忽略（由结构校验报告）。"""
+    if not isinstance(sel, dict):
+        return [], None
+    st = sel.get("selectortype")
+    if st == "SpecificId":
+        t = id_to_index.get(sel.get("id")) if isinstance(sel.get("id"), str) else None
+        return ([t] if t is not None else []), None
+    if st == "RandomId":
+        ids = sel.get("ids")
+        if not isinstance(ids, list):
+            return [], None
+        try:
+            hit = set(map(id_to_index.get, ids))  # 逐个查表在 C 层完成；未知 id 得到 None
+        except TypeError:  # 列表里有不可哈希的元素
+            hit = {id_to_index.get(i) for i in ids if isinstance(i, str)}
+        hit.discard(None)
+        found = sorted(hit)
+        if len(found) >= FANOUT_HUB_MIN:
+            return [], tuple(found)
+        return found, None
+    return [], None
+
+
+def build_checkpoint_graph(obj: Any) -> CheckpointGraph:
+    cps = obj.get("checkpoints") if isinstance(obj, dict) else None
+    if not isinstance(cps, list):
+        cps = []
+    n = len(cps)
+    id_to_index: Dict[str, int] = {}
+    labels: List[str] = []
+    for i, c in enumerate(cps):
+        cid = c.get("id") if isinstance(c, dict) else None
+        if isinstance(cid, str):
+            id_to_index.setdefault(cid, i)
+            labels.append(cid)
+        else:
+            labels.append(f"#{i}")
+
+    hub_index: Dict[Tuple[int, ...], int] = {}
+    hubs: List[Tuple[int, ...]] = []
+    offsets = array("l", [0])
+    targets = array("l")
+
+    def add_selector(sel: Any, out: List[int]) -> None:
+        plain, fan = _selector_targets(sel, id_to_index)
+        out.extend(plain)
+        if fan is not None:
+            h = hub_index.get(fan)
+            if h is None:
+                h = hub_index[fan] = n + len(hubs)
+                hubs.append(fan)
+            out.append(h)
+
+    for i, c in enumerate(cps):
+        out: List[int] = []
+        if isinstance(c, dict):
+            if "nextcheckpoint" in c:
+                add_selector(c.get("nextcheckpoint"), out)
+            elif i + 1 < n:
+                out.append(i + 1)
+            for key in ("condition", "travelcondition"):
+                blk = c.get(key)
+                if not isinstance(blk, dict):
+                    continue
+                for lk in _JUMP_LISTS:
+                    acts = blk.get(lk)
+                    if not isinstance(acts, list):
+                        continue
+                    for a in acts:
+                        if isinstance(a, dict) and a.get("type") == "setCheckpoint":
+                            add_selector(a, out)
+        elif i + 1 < n:
+            out.append(i + 1)
+        # 去重但保持顺序，使报告稳定
+        targets.extend(dict.fromkeys(out))
+        offsets.append(len(targets))
+    return CheckpointGraph(n, offsets, targets, hubs, labels)
+
+
+def _tarjan(succ: List[Sequence[int]], roots: Sequence[int]) -> Tuple[List[int], List[List[int]]]:
+    """迭代式 Tarjan，succ 为各节点的后继。返回 (节点 -> 分量编号, 分量列表)。
+
+    分量按逆拓扑序编号；从 roots 不可达的节点分量编号为 -1。
+    """
+    total = len(succ)
+    index = [-1] * total
+    low = [0] * total
+    on_stack = [False] * total
+    comp_of = [-1] * total
+    comps: List[List[int]] = []
+    stack: List[int] = []
+    counter = 0
+    for root in roots:
+        if index[root] != -1:
+            continue
+        work: List[Tuple[int, Iterator[int]]] = [(root, iter(succ[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            u, it = work[-1]
+            advanced = False
+            for v in it:
+                if index[v] == -1:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                    work.append((v, iter(succ[v])))
+                    advanced = True
+                    break
+                if on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                p = work[-1][0]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+            if low[u] == index[u]:
+                comp: List[int] = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    comp_of[w] = len(comps)
+                    comp.append(w)
+                    if w == u:
+                        break
+                comps.append(comp)
+    return comp_of, comps
+
+
+def analyze_flow(obj: Any, graph: Optional[CheckpointGraph] = None) -> FlowReport:
+    g = graph if graph is not None else build_checkpoint_graph(obj)
+    n = g.n
+    report = FlowReport(checkpoint_count=n)
+    if n == 0:
+        return report
+
+    # Tarjan 从起点出发只会访问可达节点，分量编号同时给出可达性
+    succ = g.successor_lists()
+    comp_of, comps = _tarjan(succ, [0])
+    report.unreachable = [i for i in range(n) if comp_of[i] == -1]
+    # 分量按逆拓扑序产生：后继分量的编号总是更小，按编号递增处理即可自底向上 DP
+    can_finish = [False] * len(comps)
+    best_len = [0] * len(comps)
+    best_next = [-1] * len(comps)
+    for ci, comp in enumerate(comps):
+        members = [u for u in comp if u < n]
+        is_cycle = len(comp) > 1 or comp[0] in succ[comp[0]]
+        any_succ = has_exit = False
+        cand_len, cand = 0, -1
+        for u in comp:
+            for v in succ[u]:
+                any_succ = True
+                cv = comp_of[v]
+                if cv == ci:
+                    continue
+                has_exit = True
+                if can_finish[cv]:
+                    can_finish[ci] = True
+                if best_len[cv] > cand_len:
+                    cand_len, cand = best_len[cv], cv
+        # 没有任何后继的 checkpoint 即任务终点
+        if not any_succ:
+            can_finish[ci] = True
+        best_len[ci] = cand_len + (1 if members else 0)
+        best_next[ci] = cand
+        if is_cycle and members:
+            cyc = sorted(members)
+            report.cycles.append(cyc)
+            if not has_exit:
+                report.closed_cycles.append(cyc)
+
+    report.dead_ends = sorted(u for u in range(n) if comp_of[u] != -1 and not can_finish[comp_of[u]])
+    report.cycles.sort()
+    report.closed_cycles.sort()
+
+    # 沿 best_next 还原最长路径；每个分量取其中编号最小的 checkpoint 作代表
+    path: List[int] = []
+    ci = comp_of[0]
+    while ci != -1:
+        members = [u for u in comps[ci] if u < n]
+        if members:
+            path.append(min(members))
+        ci = best_next[ci]
+    report.longest_path = path
+    return report
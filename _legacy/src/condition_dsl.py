@@ -0,0 +1,355 @@
+"""任务条件表达式（condition DSL）解析。
+
+语法（与游戏内一致）：
+- [a, b, ...]   全部满足（AND）
+- (a, b, ...)   任一满足（OR）
+- !x            取反，x 可以是标识符或括号表达式
+- Name          原子条件，如 Naked、Action_SitDildo、SubCondition_c
+- Name<op>Num   数值比较，如 Ecstasy>0.1、Ecstasy==0
+- 顶层允许不带括号的逗号列表（视为 AND），空串表示无条件
+
+同一条件串在整个任务库中会重复成千上万次，parse_condition 对解析结果做
+记忆化缓存；AST 为不可变结构，可在多个调用方之间安全共享。
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .config import CUSTOM_MISSIONS_DIR
+
+
+SUBCONDITION_PREFIX = "SubCondition_"
+
+
+class ConditionSyntaxError(ValueError):
+    def __init__(self, message: str, pos: int) -> None:
+        super().__init__(message)
+        self.message = message
+        self.pos = pos  # 条件串内的偏移（0-based）
+
+
+@dataclass(frozen=True)
+class AtomNode:
+    name: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class CompareNode:
+    name: str
+    op: str
+    value: float
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class NotNode:
+    operand: "ConditionNode"
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class AndNode:
+    items: Tuple["ConditionNode", ...]
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class OrNode:
+    items: Tuple["ConditionNode", ...]
+    start: int
+    end: int
+
+
+ConditionNode = Union[AtomNode, CompareNode, NotNode, AndNode, OrNode]
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<cmp>==|!=|>=|<=|>|<)"
+    r"|(?P<punct>[\[\](),!])"
+    r"|(?P<num>-?\d+(?:\.\d+)?)"
+    r"|(?P<ident>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+_CLOSERS = {"[": "]", "(": ")"}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    """返回 (类别, 文本, 起始偏移) 列表。"""
+    tokens: List[Tuple[str, str, int]] = []
+    pos = 0
+    n = len(text)
+    while pos < n:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            if not text[pos:].strip():
+                break
+            bad = pos + len(text[pos:]) - len(text[pos:].lstrip())
+            raise ConditionSyntaxError(f"无法识别的字符 '{text[bad]}'", bad)
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind), m.start(kind)))
+        pos = m.end()
+    return tokens
+
+
+def scan_tokens(text: str) -> Iterator[Tuple[str, int, int]]:
+    """宽松地切分条件串，产出 (类别, 起始, 结束)，供语法高亮使用。
+
+    与 _tokenize 共用词法规则，但从不抛异常：无法识别的字符产出 ('error', pos, pos+1)
+    后继续向后扫描。
+    """
+    pos = 0
+    n = len(text)
+    while pos < n:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.lastgroup is None:
+            bad = pos + len(text[pos:]) - len(text[pos:].lstrip())
+            if bad >= n:
+                return
+            yield "error", bad, bad + 1
+            pos = bad + 1
+            continue
+        kind = m.lastgroup
+        yield kind, m.start(kind), m.end(kind)
+        pos = m.end()
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def _peek(self) -> Optional[Tuple[str, str, int]]:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def _end_pos(self) -> int:
+        return len(self.text.rstrip())
+
+    def parse(self) -> Optional[ConditionNode]:
+        if not self.tokens:
+            return None
+        items = self._list(None)
+        if self.i < len(self.tokens):
+            _kind, tok, pos = self.tokens[self.i]
+            raise ConditionSyntaxError(f"多余的 '{tok}'", pos)
+        if len(items) == 1:
+            return items[0]
+        return AndNode(tuple(items), items[0].start, items[-1].end)
+
+    def _list(self, closer: Optional[str]) -> List[ConditionNode]:
+        items: List[ConditionNode] = []
+        tok = self._peek()
+        if closer is not None and tok is not None and tok[1] == closer:
+            return items
+        while True:
+            items.append(self._expr())
+            tok = self._peek()
+            if tok is None or tok[1] != ",":
+                return items
+            self.i += 1
+
+    def _expr(self) -> ConditionNode:
+        tok = self._peek()
+        if tok is None:
+            raise ConditionSyntaxError("条件表达式不完整", self._end_pos())
+        kind, val, pos = tok
+        if val == "!" and kind == "punct":
+            self.i += 1
+            operand = self._expr()
+            return NotNode(operand, pos, operand.end)
+        if val in _CLOSERS:
+            self.i += 1
+            closer = _CLOSERS[val]
+            items = self._list(closer)
+            end_tok = self._peek()
+            if end_tok is None or end_tok[1] != closer:
+                at = end_tok[2] if end_tok else self._end_pos()
+                raise ConditionSyntaxError(f"缺少 '{closer}'（与位置 {pos} 的 '{val}' 配对）", at)
+            self.i += 1
+            node_cls = AndNode if val == "[" else OrNode
+            return node_cls(tuple(items), pos, end_tok[2] + 1)
+        if kind == "ident":
+            self.i += 1
+            nxt = self._peek()
+            if nxt is not None and nxt[0] == "cmp":
+                self.i += 1
+                num = self._peek()
+                if num is None or num[0] != "num":
+                    at = num[2] if num else self._end_pos()
+                    raise ConditionSyntaxError(f"比较运算 '{nxt[1]}' 后需要数值", at)
+                self.i += 1
+                return CompareNode(val, nxt[1], float(num[1]), pos, num[2] + len(num[1]))
+            return AtomNode(val, pos, pos + len(val))
+        raise ConditionSyntaxError(f"意外的 '{val}'", pos)
+
+
+@lru_cache(maxsize=8192)
+def _parse_cached(text: str) -> Tuple[Optional[ConditionNode], Optional[ConditionSyntaxError]]:
+    try:
+        return _Parser(text).parse(), None
+    except ConditionSyntaxError as e:
+        return None, e
+
+
+def parse_condition(text: str) -> Optional[ConditionNode]:
+    """解析条件串；空串返回 None，语法错误抛出 ConditionSyntaxError。结果带缓存。"""
+    node, err = _parse_cached(text)
+    if err is not None:
+        # 缓存的是错误本身，每次抛出新实例，避免共享 traceback
+        raise ConditionSyntaxError(err.message, err.pos)
+    return node
+
+
+def parse_cache_info():
+    return _parse_cached.cache_info()
+
+
+@lru_cache(maxsize=8192)
+def condition_atoms(text: str) -> Tuple[Union[AtomNode, CompareNode], ...]:
+    """条件串中的全部原子（按出现顺序，带缓存）。语法错误抛出 ConditionSyntaxError。"""
+    return tuple(iter_atoms(parse_condition(text)))
+
+
+def iter_atoms(node: Optional[ConditionNode]) -> Iterator[Union[AtomNode, CompareNode]]:
+    """深度优先遍历，按出现顺序产出原子条件与比较条件。"""
+    if node is None:
+        return
+    stack: List[ConditionNode] = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (AtomNode, CompareNode)):
+            yield n
+        elif isinstance(n, NotNode):
+            stack.append(n.operand)
+        else:
+            stack.extend(reversed(n.items))
+
+
+def subcondition_ref(name: str) -> Optional[str]:
+    """'SubCondition_c' -> 'c'；非引用返回 None。"""
+    if name.startswith(SUBCONDITION_PREFIX):
+        return name[len(SUBCONDITION_PREFIX):]
+    return None
+
+
+def iter_condition_strings(obj: Any) -> Iterator[Tuple[str, str]]:
+    """按文档顺序产出任务中的 (JSON Pointer, 条件串)。"""
+    if not isinstance(obj, dict):
+        return
+    subs = obj.get("subconditions")
+    if isinstance(subs, list):
+        for i, s in enumerate(subs):
+            if isinstance(s, dict) and isinstance(s.get("condition"), str):
+                yield f"/subconditions/{i}/condition", s["condition"]
+    cps = obj.get("checkpoints")
+    if isinstance(cps, list):
+        for i, c in enumerate(cps):
+            if not isinstance(c, dict):
+                continue
+            for key in ("condition", "travelcondition"):
+                blk = c.get(key)
+                if isinstance(blk, dict) and isinstance(blk.get("condition"), str):
+                    yield f"/checkpoints/{i}/{key}/condition", blk["condition"]
+
+
+class ConditionVocabulary:
+    """从任务库挖掘出的条件词表。
+
+    counts 记录每个标识符出现在多少个任务中。出现次数不少于 min_missions 的
+    视为已知；未知标识符若与已知词足够相近（大小写不同或拼写接近），
+    suggest 给出候选，用于提示拼写错误。
+    """
+
+    def __init__(self, counts: Dict[str, int], min_missions: int = 2) -> None:
+        self.counts = dict(counts)
+        self.known = {t for t, n in counts.items() if n >= min_missions}
+        self._lower = {t.lower(): t for t in self.known}
+        # 按前缀（Action_/Cosplay_ 等）分桶，缩小近似匹配的候选范围
+        self._by_prefix: Dict[str, List[str]] = {}
+        for t in sorted(self.known):
+            self._by_prefix.setdefault(_prefix(t), []).append(t)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.known
+
+    def __len__(self) -> int:
+        return len(self.known)
+
+    def suggest(self, token: str) -> Optional[str]:
+        if token in self.known:
+            return None
+        exact = self._lower.get(token.lower())
+        if exact is not None:
+            return exact
+        if len(token) < 5:
+            return None
+        # 仅把 1~2 处字符差异视为拼写错误；物品名等共享长前缀的合法新词不会被误报
+        best: Optional[str] = None
+        best_d = 3
+        for cand in self._by_prefix.get(_prefix(token), []):
+            if abs(len(cand) - len(token)) >= best_d:
+                continue
+            d = _edit_distance(token, cand, best_d)
+            if d < best_d:
+                best, best_d = cand, d
+        return best
+
+    @classmethod
+    def from_missions(cls, missions: Iterable[Any], min_missions: int = 2) -> "ConditionVocabulary":
+        counts: Counter[str] = Counter()
+        for obj in missions:
+            names: set[str] = set()
+            for _ptr, text in iter_condition_strings(obj):
+                node, err = _parse_cached(text)
+                if err is not None:
+                    continue
+                for atom in iter_atoms(node):
+                    if subcondition_ref(atom.name) is None:
+                        names.add(atom.name)
+            counts.update(names)
+        return cls(counts, min_missions)
+
+    @classmethod
+    def from_directory(cls, directory: Path = CUSTOM_MISSIONS_DIR, min_missions: int = 2) -> "ConditionVocabulary":
+        def load() -> Iterator[Any]:
+            for p in sorted(Path(directory).glob("*.json")):
+                try:
+                    yield json.loads(p.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+        return cls.from_missions(load(), min_missions)
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein 距离；一旦整行都不小于 limit 即提前返回 limit。"""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) >= limit:
+            return limit
+        prev = cur
+    return min(prev[-1], limit)
+
+
+def _prefix(token: str) -> str:
+    head, sep, _rest = token.partition("_")
+    return head if sep else ""
+
+
+@lru_cache(maxsize=1)
+def library_vocabulary() -> ConditionVocabulary:
+    """当前任务库的词表（进程内只挖掘一次）。"""
+    return ConditionVocabulary.from_directory()
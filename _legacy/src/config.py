@@ -10,6 +10,7 @@ APP_DIR = Path(_appdata) / "PracticeApp"
 DATABASE_DIR = APP_DIR / "database"
 CUSTOM_MISSIONS_DIR = DATABASE_DIR / "CustomMissions"
 SETTINGS_DIR = DATABASE_DIR / "Settings"
+CACHE_DIR = APP_DIR / "cache"  # 可随时删除的派生数据（校验结果、编译后的 schema 等）
 
 # 设置文件
 SETTINGS_FILE = SETTINGS_DIR / "settings.json"
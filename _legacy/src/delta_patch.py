@@ -0,0 +1,378 @@
+"""Binary delta patches between two release artifacts.
+
+Patch format (little-endian)::
+
+    magic      8 bytes  b"PADELTA1"
+    old_size   u64      size of the artifact the patch applies to
+    old_sha256 32 bytes
+    new_size   u64      size of the reconstructed artifact
+    new_sha256 32 bytes
+    body       lzma (xz) stream of operations:
+                   0x01 COPY  u64 old_offset, u64 length   -- bytes taken from the old artifact
+                   0x02 ADD   u64 length, <length bytes>   -- literal bytes
+                   0x00 END
+
+make_patch finds blocks of the old artifact inside the new one at any offset
+(rsync-style weak rolling checksum, confirmed by a strong hash and then extended
+byte-wise in both directions). The rolling checksums for every offset are computed
+with numpy in fixed-size windows, so only candidate offsets are visited in Python.
+
+apply_patch only needs the standard library. It refuses a patch whose old hash does
+not match the installed artifact and verifies the new hash before the atomic rename.
+fetch_update tries the patch first and falls back to the full download on any failure.
+The update flow does not call it yet (AboutTab only opens the release page); it ships as
+a library for an installer or release tooling to use.
+
+Usage (in the _legacy directory)::
+
+    python -m src.delta_patch make OLD NEW PATCH
+    python -m src.delta_patch apply OLD PATCH OUT
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import lzma
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b"PADELTA1"
+_HEADER = struct.Struct("<8sQ32sQ32s")
+_U64 = struct.Struct("<Q")
+_COPY2 = struct.Struct("<QQ")
+OP_END, OP_COPY, OP_ADD = 0, 1, 2
+
+DEFAULT_BLOCK = 256
+_CHUNK = 1024 * 1024
+
+
+class PatchError(Exception):
+    pass
+
+
+@dataclass
+class PatchHeader:
+    old_size: int
+    old_sha256: str
+    new_size: int
+    new_sha256: str
+
+
+def _sha256_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for b in iter(lambda: f.read(_CHUNK), b""):
+            h.update(b)
+    return h.hexdigest()
+
+
+# ---- generation ----
+_WINDOW = 1 << 22  # offsets per numpy pass; bounds the generator's temporary memory
+
+
+def _pack(a, b):
+    import numpy as np
+
+    return ((a & np.uint64(0xFFFF)) | ((b & np.uint64(0xFFFF)) << np.uint64(16))).astype(np.uint32)
+
+
+def _block_sums(data: bytes, block: int):
+    """Weak checksum of every aligned block data[k*block:(k+1)*block]."""
+    import numpy as np  # only the release-side generator needs numpy
+
+    n = len(data) // block
+    weights = np.arange(block, 0, -1, dtype=np.uint64)
+    rows = max(1, _WINDOW // block)
+    out = []
+    for k in range(0, n, rows):
+        m = min(rows, n - k)
+        x = np.frombuffer(data, dtype=np.uint8, count=m * block, offset=k * block).reshape(m, block).astype(np.uint64)
+        out.append(_pack(x.sum(axis=1), x @ weights))
+    return np.concatenate(out) if out else np.zeros(0, dtype=np.uint32)
+
+
+def _rolling_candidates(data: bytes, block: int, keys):
+    """Offsets i whose rolling weak checksum of data[i:i+block] is in keys, with those checksums.
+
+    Same checksum as _block_sums, from prefix sums: with S/T the prefix sums of x[m] and
+    m*x[m], sum_j (block - j) * x[i + j] = (i + block) * (S[i+block] - S[i]) - (T[i+block] - T[i]).
+    uint64 arithmetic may wrap, which is harmless since only the low 16 bits are kept.
+    """
+    import numpy as np
+
+    pos_out, weak_out = [], []
+    total = len(data) - block + 1
+    for w in range(0, total, _WINDOW):
+        cnt = min(_WINDOW, total - w)
+        x = np.frombuffer(data, dtype=np.uint8, count=cnt + block - 1, offset=w).astype(np.uint64)
+        s = np.zeros(len(x) + 1, dtype=np.uint64)
+        np.cumsum(x, out=s[1:])
+        t = np.zeros(len(x) + 1, dtype=np.uint64)
+        np.cumsum(x * np.arange(len(x), dtype=np.uint64), out=t[1:])
+        i = np.arange(cnt, dtype=np.uint64)
+        a = s[block:] - s[:-block]
+        b = (i + np.uint64(block)) * a - (t[block:] - t[:-block])
+        weak = _pack(a, b)
+        hit = np.flatnonzero(np.isin(weak, keys))
+        pos_out.append(hit + w)
+        weak_out.append(weak[hit])
+    if not pos_out:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint32)
+    return np.concatenate(pos_out), np.concatenate(weak_out)
+
+
+def _strong(block: bytes) -> bytes:
+    return hashlib.blake2b(block, digest_size=8).digest()
+
+
+def _common_prefix(a: bytes, ai: int, b: bytes, bi: int, limit: int) -> int:
+    n = 0
+    step = 4096
+    while n < limit:
+        k = min(step, limit - n)
+        if a[ai + n : ai + n + k] == b[bi + n : bi + n + k]:
+            n += k
+            continue
+        while n < limit and a[ai + n] == b[bi + n]:
+            n += 1
+        break
+    return n
+
+
+def diff_ops(old: bytes, new: bytes, block: int = DEFAULT_BLOCK) -> List[Tuple[int, int, int]]:
+    """Return ops as (OP_COPY, old_offset, length) / (OP_ADD, new_offset, length)."""
+    import numpy as np
+
+    ops: List[Tuple[int, int, int]] = []
+    if len(old) < block or len(new) < block:
+        return [(OP_ADD, 0, len(new))] if new else []
+
+    old_weak = _block_sums(old, block)
+    index: Dict[int, List[int]] = {}
+    for k, w in enumerate(old_weak.tolist()):
+        index.setdefault(w, []).append(k)
+
+    cand, cand_weak = _rolling_candidates(new, block, np.unique(old_weak))
+    strong_cache: Dict[int, bytes] = {}
+
+    pos = 0  # everything before pos has been emitted
+    ci = 0
+    while ci < len(cand):
+        c = int(cand[ci])
+        if c < pos:
+            ci = int(np.searchsorted(cand, pos))
+            continue
+        ci += 1
+        blocks = index.get(int(cand_weak[ci - 1]))
+        if not blocks:
+            continue
+        digest = _strong(new[c : c + block])
+        hit = -1
+        for k in blocks:
+            sk = strong_cache.get(k)
+            if sk is None:
+                sk = strong_cache[k] = _strong(old[k * block : (k + 1) * block])
+            if sk == digest:
+                hit = k
+                break
+        if hit < 0:
+            continue
+        o = hit * block
+        # extend backwards into the pending literal, then forwards past the block
+        back = 0
+        while back < c - pos and back < o and new[c - back - 1] == old[o - back - 1]:
+            back += 1
+        fwd = block + _common_prefix(new, c + block, old, o + block, min(len(new) - c, len(old) - o) - block)
+        start, o_start, length = c - back, o - back, back + fwd
+        if start > pos:
+            ops.append((OP_ADD, pos, start - pos))
+        if ops and ops[-1][0] == OP_COPY and ops[-1][1] + ops[-1][2] == o_start:
+            ops[-1] = (OP_COPY, ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append((OP_COPY, o_start, length))
+        pos = start + length
+    if pos < len(new):
+        ops.append((OP_ADD, pos, len(new) - pos))
+    return ops
+
+
+def make_patch(old_path: Path, new_path: Path, patch_path: Path, block: int = DEFAULT_BLOCK) -> PatchHeader:
+    old = Path(old_path).read_bytes()
+    new = Path(new_path).read_bytes()
+    header = PatchHeader(
+        len(old), hashlib.sha256(old).hexdigest(), len(new), hashlib.sha256(new).hexdigest()
+    )
+    body = io.BytesIO()
+    for op, off, length in diff_ops(old, new, block):
+        if op == OP_COPY:
+            body.write(bytes([OP_COPY]) + _COPY2.pack(off, length))
+        else:
+            body.write(bytes([OP_ADD]) + _U64.pack(length))
+            body.write(new[off : off + length])
+    body.write(bytes([OP_END]))
+    patch_path = Path(patch_path)
+    patch_path.parent.mkdir(parents=True, exist_ok=True)
+    with patch_path.open("wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC,
+            header.old_size, bytes.fromhex(header.old_sha256),
+            header.new_size, bytes.fromhex(header.new_sha256),
+        ))
+        f.write(lzma.compress(body.getvalue(), preset=9 | lzma.PRESET_EXTREME))
+    return header
+
+
+# ---- application ----
+def read_header(fp: BinaryIO) -> PatchHeader:
+    raw = fp.read(_HEADER.size)
+    if len(raw) != _HEADER.size:
+        raise PatchError("patch is truncated")
+    magic, old_size, old_sha, new_size, new_sha = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise PatchError("not a delta patch")
+    return PatchHeader(old_size, old_sha.hex(), new_size, new_sha.hex())
+
+
+def _read_exact(fp: BinaryIO, n: int) -> bytes:
+    b = fp.read(n)
+    if len(b) != n:
+        raise PatchError("patch is truncated")
+    return b
+
+
+def apply_patch(old_path: Path, patch_path: Path, out_path: Path) -> Path:
+    """Rebuild the new artifact at out_path; raises PatchError if anything does not match."""
+    old_path, out_path = Path(old_path), Path(out_path)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    try:
+        with Path(patch_path).open("rb") as pf:
+            header = read_header(pf)
+            if old_path.stat().st_size != header.old_size or _sha256_file(old_path) != header.old_sha256:
+                raise PatchError("installed artifact does not match the patch base")
+            h = hashlib.sha256()
+            written = 0
+            with lzma.open(pf) as body, old_path.open("rb") as old, tmp.open("wb") as out:
+                while True:
+                    op = _read_exact(body, 1)[0]
+                    if op == OP_END:
+                        # read to the end of the xz stream so its footer and check are verified too
+                        if body.read(1):
+                            raise PatchError("trailing data after the end of the patch")
+                        break
+                    if op == OP_COPY:
+                        off, length = _COPY2.unpack(_read_exact(body, _COPY2.size))
+                        if off + length > header.old_size:
+                            raise PatchError("copy outside the old artifact")
+                        old.seek(off)
+                        while length:
+                            b = old.read(min(_CHUNK, length))
+                            out.write(b)
+                            h.update(b)
+                            written += len(b)
+                            length -= len(b)
+                    elif op == OP_ADD:
+                        (length,) = _U64.unpack(_read_exact(body, _U64.size))
+                        while length:
+                            b = _read_exact(body, min(_CHUNK, length))
+                            out.write(b)
+                            h.update(b)
+                            written += len(b)
+                            length -= len(b)
+                    else:
+                        raise PatchError(f"unknown op {op}")
+                    if written > header.new_size:
+                        raise PatchError("patch produces more data than announced")
+        if written != header.new_size or h.hexdigest() != header.new_sha256:
+            raise PatchError("patched artifact failed hash verification")
+        os.replace(tmp, out_path)
+        return out_path
+    except (OSError, EOFError, lzma.LZMAError, struct.error) as e:  # EOFError: truncated xz stream
+        tmp.unlink(missing_ok=True)
+        raise PatchError(str(e)) from e
+    except PatchError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+# ---- release integration ----
+def patch_asset_name(artifact_name: str, from_version: str) -> str:
+    """Name under which a release publishes the patch from ``from_version``."""
+    return f"{artifact_name}.from-{from_version.lstrip('vV')}.patch"
+
+
+def find_patch_asset(assets: Sequence, artifact_name: str, from_version: str):
+    want = patch_asset_name(artifact_name, from_version)
+    return next((a for a in assets if a.name == want), None)
+
+
+def fetch_update(
+    installed: Path,
+    dest: Path,
+    full_asset,
+    patch_asset=None,
+    progress=None,
+    downloader=None,
+) -> Tuple[Path, bool]:
+    """Produce the new artifact at ``dest``; returns (path, used_patch).
+
+    ``full_asset`` / ``patch_asset`` are update_checker.ReleaseAsset. The patch is
+    downloaded and applied first; any download or patch failure (including a hash
+    mismatch of the result) falls back to the full asset, verified by its sha256.
+    """
+    from .downloader import DownloadError, Downloader
+
+    dl = downloader or Downloader()
+    try:
+        if patch_asset is not None:
+            patch_file = Path(dest).with_name(patch_asset.name)
+            try:
+                dl.download(patch_asset.url, patch_file, sha256=patch_asset.sha256, progress=progress)
+                return apply_patch(Path(installed), patch_file, Path(dest)), True
+            except (DownloadError, PatchError, OSError):
+                pass
+            finally:
+                patch_file.unlink(missing_ok=True)
+        return dl.download(full_asset.url, Path(dest), sha256=full_asset.sha256, progress=progress), False
+    finally:
+        if downloader is None:
+            dl.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="create or apply a binary delta patch")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mk = sub.add_parser("make")
+    mk.add_argument("old", type=Path)
+    mk.add_argument("new", type=Path)
+    mk.add_argument("patch", type=Path)
+    mk.add_argument("--block", type=int, default=DEFAULT_BLOCK)
+    ap_ = sub.add_parser("apply")
+    ap_.add_argument("old", type=Path)
+    ap_.add_argument("patch", type=Path)
+    ap_.add_argument("out", type=Path)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == "make":
+        hdr = make_patch(args.old, args.new, args.patch, args.block)
+        size = args.patch.stat().st_size
+        print(f"{args.patch}: {size} bytes ({size / max(1, hdr.new_size):.1%} of new), {time.perf_counter() - t0:.2f}s")
+        return 0
+    try:
+        apply_patch(args.old, args.patch, args.out)
+    except PatchError as e:
+        print(f"patch failed: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.out}: ok, {time.perf_counter() - t0:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+"""Resumable, verified HTTP downloads.
+
+- Partial downloads live in ``<dest>.tmp`` next to a ``<dest>.tmp.json`` sidecar that
+  records the remote size, its validator (ETag / Last-Modified) and how far each byte
+  range has got. A later call resumes every unfinished range with ``Range`` +
+  ``If-Range``; if the remote file changed meanwhile the server answers 200 and the
+  download starts over from scratch (once).
+- Files of at least ``parallel_threshold`` bytes are split into ranges fetched by
+  ``workers`` threads, each reusing keep-alive connections from a small pool.
+- The finished file is checked against the expected size and, when given, its SHA-256
+  before it is atomically renamed into place. A mismatch discards the partial data.
+
+Only the standard library is used (http.client for connection reuse).
+"""
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "PracticeApp-Downloader/1.0"
+
+# progress(done_bytes, total_bytes or None); called from worker threads
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+class DownloadError(Exception):
+    pass
+
+
+class HashMismatch(DownloadError):
+    pass
+
+
+class RemoteChanged(DownloadError):
+    """The remote file no longer matches the partial download (If-Range failed)."""
+
+
+@dataclass
+class Segment:
+    start: int
+    end: int  # exclusive
+    pos: int  # next byte to fetch
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= self.end
+
+
+@dataclass
+class _State:
+    url: str
+    size: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    segments: List[Segment]
+
+    @property
+    def validator(self) -> Optional[str]:
+        # If-Range only accepts strong ETags; fall back to Last-Modified
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    @property
+    def received(self) -> int:
+        return sum(s.pos - s.start for s in self.segments)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections keyed by (scheme, host, port)."""
+
+    def __init__(self, timeout: float = 30) -> None:
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, host: str, port: int) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused)."""
+        with self._lock:
+            idle = self._idle.get((scheme, host, port))
+            if idle:
+                return idle.pop(), True
+        return self.connect(scheme, host, port), False
+
+    def connect(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout)
+
+    def release(self, scheme: str, host: str, port: int, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault((scheme, host, port), []).append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for lst in self._idle.values() for c in lst]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+
+class _Response:
+    """An open response plus the pooled connection it must go back to."""
+
+    def __init__(self, pool: ConnectionPool, key: Tuple[str, str, int], conn: http.client.HTTPConnection,
+                 resp: http.client.HTTPResponse, url: str) -> None:
+        self.pool, self.key, self.conn, self.resp, self.url = pool, key, conn, resp, url
+
+    @property
+    def status(self) -> int:
+        return self.resp.status
+
+    def header(self, name: str) -> Optional[str]:
+        return self.resp.getheader(name)
+
+    def close(self, reuse: bool = True) -> None:
+        # a connection can only be reused once its response has been read to the end
+        if reuse and self.resp.isclosed() and not self.resp.will_close:
+            self.pool.release(*self.key, self.conn)
+        else:
+            self.conn.close()
+
+
+class Downloader:
+    def __init__(
+        self,
+        workers: int = 4,
+        parallel_threshold: int = 8 * 1024 * 1024,
+        chunk_size: int = 256 * 1024,
+        retries: int = 3,
+        timeout: float = 30,
+        checkpoint_bytes: int = 4 * 1024 * 1024,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.checkpoint_bytes = checkpoint_bytes  # how often the sidecar is rewritten per range
+        self.pool = ConnectionPool(timeout)
+
+    # ---- HTTP ----
+    def _request(self, method: str, url: str, headers: Dict[str, str], redirects: int = 5) -> _Response:
+        for _ in range(redirects + 1):
+            parts = urlsplit(url)
+            scheme = parts.scheme or "http"
+            port = parts.port or (443 if scheme == "https" else 80)
+            key = (scheme, parts.hostname or "", port)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            conn, reused = self.pool.acquire(*key)
+            try:
+                conn.request(method, path, headers={"User-Agent": USER_AGENT, **headers})
+                resp = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if not reused:
+                    raise
+                # the server may have closed an idle keep-alive connection: retry once on a fresh one
+                conn = self.pool.connect(*key)
+                conn.request(method, path, headers={"User-Agent": USER_AGENT, **headers})
+                resp = conn.getresponse()
+            r = _Response(self.pool, key, conn, resp, url)
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                resp.read()
+                r.close()
+                url = urljoin(url, resp.getheader("Location"))
+                continue
+            return r
+        raise DownloadError(f"too many redirects: {url}")
+
+    def _probe(self, url: str) -> Tuple[str, Optional[int], bool, Optional[str], Optional[str]]:
+        """Return (final url, size, accepts ranges, etag, last-modified).
+
+        Servers that reject HEAD (e.g. 405, or 403 from URLs signed for GET only) are
+        asked again with a one-byte ranged GET, whose Content-Range carries the size.
+        """
+        r = self._request("HEAD", url, {})
+        r.resp.read()
+        r.close()
+        if r.status < 400:
+            length = r.header("Content-Length")
+            size = int(length) if length and length.isdigit() else None
+            ranges = (r.header("Accept-Ranges") or "").lower() == "bytes"
+            return r.url, size, ranges, r.header("ETag"), r.header("Last-Modified")
+
+        r = self._request("GET", url, {"Range": "bytes=0-0"})
+        try:
+            if r.status == 206:
+                # Content-Range: bytes 0-0/<size>  ("*" when the size is unknown)
+                total = (r.header("Content-Range") or "").rpartition("/")[2]
+                size = int(total) if total.isdigit() else None
+                ranges = True
+                r.resp.read()
+            elif r.status == 200:
+                # Range ignored: the headers describe the whole file; do not read the body
+                length = r.header("Content-Length")
+                size = int(length) if length and length.isdigit() else None
+                ranges = False
+            else:
+                raise DownloadError(f"HTTP {r.status} for {url}")
+        finally:
+            r.close()
+        return r.url, size, ranges, r.header("ETag"), r.header("Last-Modified")
+
+    # ---- sidecar ----
+    @staticmethod
+    def _load_state(meta: Path) -> Optional[_State]:
+        try:
+            raw = json.loads(meta.read_text(encoding="utf-8"))
+            raw["segments"] = [Segment(**s) for s in raw["segments"]]
+            return _State(**raw)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def _save_state(meta: Path, state: _State) -> None:
+        tmp = meta.with_name(meta.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        os.replace(tmp, meta)
+
+    def _plan(self, url: str, size: int, etag: Optional[str], last_modified: Optional[str], ranges: bool) -> _State:
+        n = self.workers if ranges and size >= self.parallel_threshold else 1
+        step = -(-size // n) if size else 0
+        segs = [Segment(i, min(size, i + step), i) for i in range(0, size, step)] if size else [Segment(0, 0, 0)]
+        return _State(url, size, etag, last_modified, segs)
+
+    # ---- download ----
+    def download(
+        self, url: str, dest: Path, sha256: Optional[str] = None, progress: Optional[ProgressCallback] = None
+    ) -> Path:
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_suffix(dest.suffix + ".tmp")
+        meta = tmp.with_name(tmp.name + ".json")
+
+        for attempt in range(2):
+            final_url, size, ranges, etag, last_modified = self._probe(url)
+            if size is None or not ranges:
+                # no length or no Range support: nothing can be resumed, stream in one go
+                self._stream_whole(final_url, tmp, size, progress)
+                break
+            state = self._load_state(meta)
+            usable = (
+                state is not None
+                and state.url == url
+                and state.size == size
+                and (state.etag, state.last_modified) == (etag, last_modified)
+                and tmp.exists()
+                and tmp.stat().st_size == size
+            )
+            if not usable:
+                state = self._plan(url, size, etag, last_modified, ranges)
+                with tmp.open("wb") as f:
+                    f.truncate(size)
+                self._save_state(meta, state)
+            try:
+                self._fetch_segments(final_url, tmp, meta, state, progress)  # type: ignore[arg-type]
+                break
+            except RemoteChanged:
+                # the remote file was replaced between attempts: start over once
+                tmp.unlink(missing_ok=True)
+                meta.unlink(missing_ok=True)
+                if attempt:
+                    raise
+
+        try:
+            self._verify(tmp, size, sha256)
+        except DownloadError:
+            tmp.unlink(missing_ok=True)
+            meta.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, dest)
+        meta.unlink(missing_ok=True)
+        return dest
+
+    def _stream_whole(self, url: str, tmp: Path, size: Optional[int], progress: Optional[ProgressCallback]) -> None:
+        r = self._request("GET", url, {})
+        if r.status != 200:
+            r.close(reuse=False)
+            raise DownloadError(f"HTTP {r.status} for {url}")
+        done = 0
+        try:
+            with tmp.open("wb") as f:
+                while True:
+                    b = r.resp.read(self.chunk_size)
+                    if not b:
+                        break
+                    f.write(b)
+                    done += len(b)
+                    if progress:
+                        progress(done, size)
+        finally:
+            r.close()
+
+    def _fetch_segments(
+        self, url: str, tmp: Path, meta: Path, state: _State, progress: Optional[ProgressCallback]
+    ) -> None:
+        lock = threading.Lock()
+        done = [state.received]
+        errors: List[BaseException] = []
+        pending = [s for s in state.segments if not s.done]
+        if progress:
+            progress(done[0], state.size)
+
+        def advance(n: int) -> None:
+            with lock:
+                done[0] += n
+                total = done[0]
+            if progress:
+                progress(total, state.size)
+
+        def checkpoint() -> None:
+            with lock:
+                self._save_state(meta, state)
+
+        def worker(seg: Segment) -> None:
+            try:
+                self._fetch_segment(url, tmp, state, seg, advance, checkpoint)
+            except BaseException as e:  # noqa: BLE001 - re-raised on the calling thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(s,), daemon=True) for s in pending[1:]]
+        for t in threads:
+            t.start()
+        if pending:
+            worker(pending[0])
+        for t in threads:
+            t.join()
+        checkpoint()
+        if errors:
+            raise errors[0]
+
+    def _fetch_segment(
+        self, url: str, tmp: Path, state: _State, seg: Segment,
+        advance: Callable[[int], None], checkpoint: Callable[[], None],
+    ) -> None:
+        attempts = 0
+        while not seg.done:
+            headers = {"Range": f"bytes={seg.pos}-{seg.end - 1}"}
+            if seg.pos > seg.start and state.validator:
+                headers["If-Range"] = state.validator
+            try:
+                r = self._request("GET", url, headers)
+                reuse = False
+                try:
+                    if r.status == 200:
+                        # If-Range failed (remote changed) or the server ignored Range; a full body
+                        # is only usable when this range is the whole file and starts from scratch
+                        if not (seg.start == 0 and seg.pos == 0 and seg.end == state.size):
+                            raise RemoteChanged(f"{url} changed or ignored the Range header")
+                    elif r.status != 206:
+                        raise DownloadError(f"HTTP {r.status} for {url}")
+                    since = 0
+                    with tmp.open("r+b") as f:
+                        f.seek(seg.pos)
+                        try:
+                            while seg.pos < seg.end:
+                                b = r.resp.read(min(self.chunk_size, seg.end - seg.pos))
+                                if not b:
+                                    raise DownloadError("connection closed early")
+                                f.write(b)
+                                seg.pos += len(b)
+                                since += len(b)
+                                advance(len(b))
+                                if since >= self.checkpoint_bytes:
+                                    f.flush()
+                                    checkpoint()
+                                    since = 0
+                        finally:
+                            f.flush()
+                    # drain anything beyond the range so the connection can be reused
+                    r.resp.read()
+                    reuse = True
+                finally:
+                    # a failed range leaves the response unread: its connection cannot go back to the pool
+                    r.close(reuse=reuse)
+            except RemoteChanged:
+                raise
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise DownloadError(f"range {seg.start}-{seg.end - 1} failed: {e}") from e
+                time.sleep(min(2.0, 0.2 * attempts))
+
+    @staticmethod
+    def _verify(tmp: Path, size: Optional[int], sha256: Optional[str]) -> None:
+        if size is not None and tmp.stat().st_size != size:
+            raise DownloadError(f"size mismatch: expected {size}, got {tmp.stat().st_size}")
+        if sha256:
+            h = hashlib.sha256()
+            with tmp.open("rb") as f:
+                for b in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(b)
+            if h.hexdigest().lower() != sha256.lower():
+                raise HashMismatch(f"sha256 mismatch: expected {sha256}, got {h.hexdigest()}")
+
+    def close(self) -> None:
+        self.pool.close()
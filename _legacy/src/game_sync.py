@@ -3,7 +3,7 @@ from __future__ import annotations
 import hashlib
 import shutil
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Set, Tuple
 
 from .config import CUSTOM_MISSIONS_DIR
 
@@ -83,6 +83,11 @@ def is_enabled_in_game(filename: str, game_dir: str | Path) -> bool:
     return (get_game_custom_dir(game_dir) / filename).exists()
 
 
+def enabled_in_game(game_dir: str | Path) -> Set[str]:
+    """游戏目录中已启用的任务文件名；一次列目录，代替逐个 is_enabled_in_game。"""
+    return {p.name for p in iter_game_jsons(game_dir)}
+
+
 def enable_mod(filename: str, game_dir: str | Path) -> bool:
     src = CUSTOM_MISSIONS_DIR / filename
     if not src.exists():
@@ -0,0 +1,192 @@
+"""带源码位置的 JSON 解析。
+
+parse_with_spans(text) 在一次解析中同时得到：
+- 与 json.loads 相同的 Python 值
+- span 表：JSON Pointer（RFC 6901）-> Span(start, end, line, column)
+
+字符串解码沿用标准库的 scanstring（C 实现），数字复用 json.scanner.NUMBER_RE，
+因此只有结构本身在 Python 层遍历。语法错误抛出 json.JSONDecodeError，
+消息与行列号与 json.loads 保持一致，调用方可以直接替换。
+
+即便如此，它仍比 json.loads 慢约 20 倍。校验的热路径只用 json.loads，span 表通过
+LazySpanMap 在第一次查询时才构建：没有需要定位的问题时根本不会解析第二遍。
+"""
+from __future__ import annotations
+
+import json
+import re
+from bisect import bisect_right
+from json.decoder import scanstring
+from json.scanner import NUMBER_RE
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+
+class Span(NamedTuple):
+    start: int  # 值起始偏移（含）
+    end: int  # 值结束偏移（不含）
+    line: int  # 1-based
+    column: int  # 1-based
+
+
+SpanMap = Mapping[str, Span]
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NL = re.compile(r"\n")
+_CONSTANTS = {
+    "null": None,
+    "true": True,
+    "false": False,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+    "-Infinity": float("-inf"),
+}
+
+
+def escape_pointer_token(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def join_pointer(base: str, token: str | int) -> str:
+    if isinstance(token, int):
+        return f"{base}/{token}"
+    return f"{base}/{escape_pointer_token(token)}"
+
+
+def _parse(text: str) -> Tuple[Any, Dict[str, Span]]:
+    """闭包实现的递归下降解析器；热点路径全部使用局部变量以减少属性查找。"""
+    spans: Dict[str, Span] = {}
+    newlines: List[int] = [m.start() for m in _NL.finditer(text)]
+    ws = _WS.match
+    number = NUMBER_RE.match
+    new_span = tuple.__new__  # 绕过 NamedTuple 生成的 Python 级 __new__
+
+    def error(msg: str, pos: int) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, text, pos)
+
+    def record(pointer: str, start: int, end: int) -> None:
+        # 行列号：对换行偏移表二分，O(log n)
+        i = bisect_right(newlines, start - 1)
+        col = start + 1 if i == 0 else start - newlines[i - 1]
+        spans[pointer] = new_span(Span, (start, end, i + 1, col))
+
+    def scalar(pos: int) -> Tuple[Any, int]:
+        m = number(text, pos)
+        if m is not None:
+            integer, frac, exp = m.groups()
+            if frac or exp:
+                return float(integer + (frac or "") + (exp or "")), m.end()
+            return int(integer), m.end()
+        for lit, const in _CONSTANTS.items():
+            if text.startswith(lit, pos):
+                return const, pos + len(lit)
+        raise error("Expecting value", pos)
+
+    def value(pos: int, pointer: str) -> Tuple[Any, int]:
+        ch = text[pos:pos + 1]
+        if ch == '"':
+            v, end = scanstring(text, pos + 1)
+        elif ch == "{":
+            v, end = obj(pos, pointer)
+        elif ch == "[":
+            v, end = arr(pos, pointer)
+        else:
+            v, end = scalar(pos)
+        record(pointer, pos, end)
+        return v, end
+
+    def obj(pos: int, pointer: str) -> Tuple[Dict[str, Any], int]:
+        result: Dict[str, Any] = {}
+        pos = ws(text, pos + 1).end()
+        if text[pos:pos + 1] == "}":
+            return result, pos + 1
+        while True:
+            if text[pos:pos + 1] != '"':
+                raise error("Expecting property name enclosed in double quotes", pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = ws(text, pos).end()
+            if text[pos:pos + 1] != ":":
+                raise error("Expecting ':' delimiter", pos)
+            pos = ws(text, pos + 1).end()
+            token = escape_pointer_token(key) if ("~" in key or "/" in key) else key
+            result[key], pos = value(pos, f"{pointer}/{token}")
+            pos = ws(text, pos).end()
+            ch = text[pos:pos + 1]
+            if ch == "}":
+                return result, pos + 1
+            if ch != ",":
+                raise error("Expecting ',' delimiter", pos)
+            pos = ws(text, pos + 1).end()
+
+    def arr(pos: int, pointer: str) -> Tuple[List[Any], int]:
+        result: List[Any] = []
+        append = result.append
+        pos = ws(text, pos + 1).end()
+        if text[pos:pos + 1] == "]":
+            return result, pos + 1
+        i = 0
+        while True:
+            v, pos = value(pos, f"{pointer}/{i}")
+            append(v)
+            i += 1
+            pos = ws(text, pos).end()
+            ch = text[pos:pos + 1]
+            if ch == "]":
+                return result, pos + 1
+            if ch != ",":
+                raise error("Expecting ',' delimiter", pos)
+            pos = ws(text, pos + 1).end()
+
+    if text.startswith("\ufeff"):
+        raise error("Unexpected UTF-8 BOM (decode using utf-8-sig)", 0)
+    pos = ws(text, 0).end()
+    result, end = value(pos, "")
+    pos = ws(text, end).end()
+    if pos != len(text):
+        raise error("Extra data", pos)
+    return result, spans
+
+
+def parse_with_spans(text: str) -> Tuple[Any, Dict[str, Span]]:
+    """解析 JSON 文本，返回 (值, span 表)。语法错误抛出 json.JSONDecodeError。"""
+    return _parse(text)
+
+
+class LazySpanMap(Mapping[str, Span]):
+    """text 的 span 表，第一次查询时才解析。text 必须是 json.loads 能解析的文本。"""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._spans: Optional[Dict[str, Span]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._spans is not None
+
+    def _load(self) -> Dict[str, Span]:
+        if self._spans is None:
+            self._spans = _parse(self._text)[1]
+            self._text = ""  # 解析后不再需要，不必继续持有整篇文本
+        return self._spans
+
+    def __getitem__(self, pointer: str) -> Span:
+        return self._load()[pointer]
+
+    def get(self, pointer: str, default: Optional[Span] = None) -> Optional[Span]:  # type: ignore[override]
+        return self._load().get(pointer, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+def find_span(spans: SpanMap, pointer: str) -> Optional[Span]:
+    """查找 pointer 的 span；不存在时回退到最近的存在的祖先节点。"""
+    while True:
+        sp = spans.get(pointer)
+        if sp is not None:
+            return sp
+        if not pointer:
+            return None
+        pointer = pointer.rsplit("/", 1)[0]
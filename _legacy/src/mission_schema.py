@@ -0,0 +1,198 @@
+"""任务 JSON 的声明式 schema（JSON Schema draft-07）。
+
+字段与取值范围来自 database/CustomMissions 中全部样例的统计。schema 本身可以直接
+交给 jsonschema 使用；运行时通过 schema_compiler 编译为专用校验函数，并缓存在
+CACHE_DIR 中。id 唯一性、zone/checkpoint 引用等跨节点约束无法用 schema 表达，
+仍由 mission_validator 基于 id 索引检查。
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from .config import CACHE_DIR
+from .schema_compiler import SchemaError, Validator, compile_schema
+
+
+ACTION_TYPES = (
+    "collectItem",
+    "dropItem",
+    "equipAdultToy",
+    "equipCosplay",
+    "lockHandcuffs",
+    "setAction",
+    "setCheckpoint",
+    "setPiston",
+    "setPlayerPosition",
+    "setStage",
+    "setVibrator",
+    "unequipAdultToy",
+    "unequipAllCosplay",
+    "unequipCosplay",
+    "unlockHandcuffs",
+)
+
+_NUM: Dict[str, Any] = {"type": "number"}
+_STR: Dict[str, Any] = {"type": "string"}
+_BOOL: Dict[str, Any] = {"type": "boolean"}
+_PARTS: Dict[str, Any] = {"required": ["parts"], "properties": {"parts": {"type": "array", "items": _STR}}}
+
+
+def _action(type_name: str, then: Dict[str, Any]) -> Dict[str, Any]:
+    return {"if": {"properties": {"type": {"const": type_name}}}, "then": then}
+
+
+MISSION_SCHEMA: Dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "x-message": "顶层必须是对象",
+    "required": ["title", "zones", "checkpoints"],
+    "properties": {
+        "title": {"type": "string", "pattern": r"\S", "x-message": "缺少必填字段 title 或为空"},
+        "listmission": _BOOL,
+        "addtitleinlist": _BOOL,
+        "addtitleinpanel": _BOOL,
+        "zones": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"$ref": "#/definitions/zone"},
+            "x-message": "zones 至少包含 1 个元素",
+        },
+        "subconditions": {"type": "array", "items": {"$ref": "#/definitions/subcondition"}},
+        "checkpoints": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"$ref": "#/definitions/checkpoint"},
+            "x-message": "checkpoints 至少包含 1 个元素",
+        },
+    },
+    "definitions": {
+        "zone": {
+            "type": "object",
+            "required": ["id", "areas"],
+            "properties": {
+                "id": _STR,
+                "areas": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {"$ref": "#/definitions/area"},
+                    "x-message": "zone 缺少 areas 或为空",
+                },
+            },
+        },
+        "area": {
+            "type": "object",
+            "required": ["type", "stage", "x", "y", "z", "r"],
+            "properties": {
+                "type": {"enum": ["sphere"]},
+                "stage": {"type": "string", "x-message": "area 缺少 stage"},
+                "x": _NUM,
+                "y": _NUM,
+                "z": _NUM,
+                "r": {"type": "number", "exclusiveMinimum": 0, "x-message": "area.r 必须 > 0"},
+                "outlinehidden": _BOOL,
+                "compasshidden": _BOOL,
+            },
+        },
+        "subcondition": {
+            "type": "object",
+            "required": ["id", "condition"],
+            "properties": {"id": _STR, "condition": _STR},
+        },
+        "checkpoint": {
+            "type": "object",
+            "required": ["zone"],
+            "properties": {
+                "id": _STR,
+                "zone": _STR,
+                "condition": {"$ref": "#/definitions/block"},
+                "travelcondition": {"$ref": "#/definitions/block"},
+                "nextcheckpoint": {"$ref": "#/definitions/selector"},
+            },
+        },
+        "selector": {
+            "type": "object",
+            "required": ["selectortype"],
+            "properties": {"selectortype": {"enum": ["SpecificId", "RandomId"]}},
+            "allOf": [
+                {
+                    "if": {"properties": {"selectortype": {"const": "SpecificId"}}},
+                    "then": {"required": ["id"], "properties": {"id": _STR}},
+                },
+                {
+                    "if": {"properties": {"selectortype": {"const": "RandomId"}}},
+                    "then": {"required": ["ids"], "properties": {"ids": {"type": "array", "minItems": 1, "items": _STR}}},
+                },
+            ],
+        },
+        "block": {
+            "type": "object",
+            "properties": {
+                "description": _STR,
+                "faildescription": _STR,
+                "condition": _STR,
+                "duration": {"type": "number", "minimum": 0},
+                # 样例中 hidepanel 既有布尔值也有 "true"/"false" 字符串，游戏两者都接受
+                "hidepanel": {"type": ["boolean", "string"]},
+                "hideprogress": _BOOL,
+                "reset": _BOOL,
+                "rp": {"type": "integer"},
+                "rppersec": _NUM,
+                "itemconditions": {"type": "array", "items": {"$ref": "#/definitions/itemcondition"}},
+                "oncomplete": {"type": "array", "items": {"$ref": "#/definitions/action"}},
+                "onviolatecondition": {"type": "array", "items": {"$ref": "#/definitions/action"}},
+                "onmetcondition": {"type": "array", "items": {"$ref": "#/definitions/action"}},
+            },
+        },
+        "itemcondition": {
+            "type": "object",
+            "required": ["type", "zone"],
+            "properties": {"type": _STR, "zone": _STR},
+        },
+        "action": {
+            "type": "object",
+            "required": ["type"],
+            "properties": {"type": {"enum": list(ACTION_TYPES)}},
+            "allOf": [
+                _action("collectItem", {"required": ["itemtype"], "properties": {"itemtype": _STR, "stage": _STR, "x": _NUM, "y": _NUM, "z": _NUM}}),
+                _action(
+                    "dropItem",
+                    {
+                        "required": ["itemtype", "stage", "x", "y", "z"],
+                        "properties": {"itemtype": _STR, "stage": _STR, "x": _NUM, "y": _NUM, "z": _NUM, "compasshidden": _BOOL},
+                    },
+                ),
+                _action("equipAdultToy", _PARTS),
+                _action("equipCosplay", _PARTS),
+                _action("unequipAdultToy", _PARTS),
+                _action("unequipCosplay", _PARTS),
+                _action(
+                    "lockHandcuffs",
+                    {"required": ["handcuffstype"], "properties": {"handcuffstype": _STR, "attachtoobject": _BOOL, "duration": _NUM}},
+                ),
+                _action("setAction", {"required": ["action"], "properties": {"action": _STR}}),
+                _action("setCheckpoint", {"$ref": "#/definitions/selector"}),
+                _action("setPiston", {"required": ["level"], "properties": {"level": _STR}}),
+                _action("setVibrator", {"required": ["level"], "properties": {"level": _STR}}),
+                _action(
+                    "setPlayerPosition",
+                    {
+                        "required": ["x", "y", "z"],
+                        "properties": {"x": _NUM, "y": _NUM, "z": _NUM, "rx": _NUM, "ry": _NUM, "rz": _NUM, "rw": _NUM},
+                    },
+                ),
+                _action("setStage", {"properties": {"stage": _STR, "daytime": _BOOL}}),
+            ],
+        },
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def mission_validator() -> Validator:
+    """编译后的任务 schema 校验函数（进程内编译/加载一次，跨进程走磁盘缓存）。"""
+    return compile_schema(MISSION_SCHEMA, CACHE_DIR)
+
+
+def check_mission_schema(obj: Any) -> List[SchemaError]:
+    return mission_validator()(obj)
@@ -1,112 +1,236 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from pathlib import Path
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
+from .checkpoint_graph import analyze_flow, build_checkpoint_graph
+from .condition_dsl import ConditionSyntaxError, ConditionVocabulary, condition_atoms, iter_condition_strings, subcondition_ref
+from .json_spans import LazySpanMap, SpanMap, find_span
+from .mission_schema import check_mission_schema
+from .zone_geometry import StageBounds, analyze_geometry
+
 
 @dataclass
 class ValidationIssue:
-    kind: str  # "syntax" | "schema"
+    kind: str  # "syntax" | "schema" | "condition" | "flow" | "geometry"
     message: str
     line: Optional[int] = None
     column: Optional[int] = None
+    pointer: Optional[str] = None  # JSON Pointer，指向问题所在的值
+
+
+@dataclass
+class MissionIndex:
+    """一次遍历得到的 id 索引。
+
+    zone/subcondition/checkpoint 的 id 集合与首个重复项下标在同一次扫描中构建，
+    之后所有引用检查都只做 O(1) 的集合查询。
+    """
+    zone_ids: set[str] = field(default_factory=set)
+    sub_ids: set[str] = field(default_factory=set)
+    cp_ids: set[str] = field(default_factory=set)
+    zone_dup: Optional[int] = None
+    sub_dup: Optional[int] = None
+    cp_dup: Optional[int] = None
 
 
 def _json_syntax_check(text: str) -> Tuple[list[ValidationIssue], Optional[Any]]:
     try:
-        data = json.loads(text)
-        return ([], data)
+        return ([], json.loads(text))
     except json.JSONDecodeError as e:
         return ([ValidationIssue("syntax", e.msg, e.lineno, e.colno)], None)
 
 
-def _collect_ids(items: Any, key: str) -> set[str]:
+def _index_ids(items: Any, key: str) -> Tuple[set[str], Optional[int]]:
+    """收集 items[*][key] 中的字符串 id，并同时返回首个重复项的下标。"""
     ids: set[str] = set()
+    dup: Optional[int] = None
     if isinstance(items, list):
-        for it in items:
+        for i, it in enumerate(items):
             if isinstance(it, dict):
                 v = it.get(key)
                 if isinstance(v, str):
-                    ids.add(v)
-    return ids
-
-
-def validate_mission_structure(obj: Any) -> List[ValidationIssue]:
-    issues: List[ValidationIssue] = []
-    if not isinstance(obj, dict):
-        return [ValidationIssue("schema", "顶层必须是对象")]
-
-    title = obj.get("title")
-    if not isinstance(title, str) or not title.strip():
-        issues.append(ValidationIssue("schema", "缺少必填字段 title 或为空"))
-
-    zones = obj.get("zones")
-    if not isinstance(zones, list) or not zones:
-        issues.append(ValidationIssue("schema", "zones 至少包含 1 个元素"))
-    else:
-        zone_ids = _collect_ids(zones, "id")
-        if len(zone_ids) != sum(1 for z in zones if isinstance(z, dict) and isinstance(z.get("id"), str)):
-            issues.append(ValidationIssue("schema", "zones.id 必须全局唯一且为字符串"))
-        # 基础 area 校验
-        for z in zones:
-            if not isinstance(z, dict):
-                continue
-            areas = z.get("areas")
-            if not isinstance(areas, list) or not areas:
-                issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 缺少 areas 或为空"))
-            else:
-                for a in areas:
-                    if not isinstance(a, dict):
-                        continue
-                    if not isinstance(a.get("stage"), str):
-                        issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 的 area 缺少 stage"))
-                    r = a.get("r")
-                    if not isinstance(r, (int, float)) or r <= 0:
-                        issues.append(ValidationIssue("schema", f"zone '{z.get('id','?')}' 的 area.r 必须 > 0"))
-
-    subconditions = obj.get("subconditions")
-    if isinstance(subconditions, list):
-        sub_ids = _collect_ids(subconditions, "id")
-        if len(sub_ids) != sum(1 for s in subconditions if isinstance(s, dict) and isinstance(s.get("id"), str)):
-            issues.append(ValidationIssue("schema", "subconditions.id 必须全局唯一"))
+                    if v in ids:
+                        if dup is None:
+                            dup = i
+                    else:
+                        ids.add(v)
+    return ids, dup
 
-    checkpoints = obj.get("checkpoints")
-    if not isinstance(checkpoints, list) or not checkpoints:
-        issues.append(ValidationIssue("schema", "checkpoints 至少包含 1 个元素"))
-    else:
-        cp_ids = _collect_ids(checkpoints, "id")
-        # 唯一性（可选 id）
-        if len(cp_ids) != sum(1 for c in checkpoints if isinstance(c, dict) and isinstance(c.get("id"), str)):
-            issues.append(ValidationIssue("schema", "checkpoints.id 若存在需唯一"))
-
-        # zone 引用合法性
-        zone_ids = _collect_ids(zones or [], "id")
-        for c in checkpoints:
-            if not isinstance(c, dict):
-                continue
-            z = c.get("zone")
-            if not isinstance(z, str) or z not in zone_ids:
-                issues.append(ValidationIssue("schema", f"checkpoint '{c.get('id','?')}' 的 zone 引用不存在"))
-            nxt = c.get("nextcheckpoint")
-            if isinstance(nxt, dict):
-                st = nxt.get("selectortype")
-                if st == "SpecificId":
-                    cid = nxt.get("id")
-                    if not isinstance(cid, str) or (cp_ids and cid not in cp_ids):
-                        issues.append(ValidationIssue("schema", f"nextcheckpoint.id '{cid}' 不存在于 checkpoints.id"))
-                elif st == "RandomId":
-                    ids = nxt.get("ids")
-                    if not isinstance(ids, list) or not ids or any(i not in cp_ids for i in ids if isinstance(i, str)):
-                        issues.append(ValidationIssue("schema", "nextcheckpoint.ids 非法或包含不存在的 id"))
 
+def build_mission_index(obj: Dict[str, Any]) -> MissionIndex:
+    zone_ids, zone_dup = _index_ids(obj.get("zones"), "id")
+    sub_ids, sub_dup = _index_ids(obj.get("subconditions"), "id")
+    cp_ids, cp_dup = _index_ids(obj.get("checkpoints"), "id")
+    return MissionIndex(zone_ids, sub_ids, cp_ids, zone_dup, sub_dup, cp_dup)
+
+
+def _ids_known(ids: list, known: set[str]) -> bool:
+    """ids 中的字符串是否都在 known 中（非字符串元素忽略）。"""
+    # 快路径：issuperset 在 C 层逐个查表，避免对数百个 id 的 Python 级循环
+    try:
+        if known.issuperset(ids):
+            return True
+    except TypeError:
+        pass
+    return all(i in known for i in ids if isinstance(i, str))
+
+
+def _check_references(obj: Dict[str, Any], index: MissionIndex, issues: List[ValidationIssue]) -> None:
+    """schema 无法表达的跨节点约束：id 唯一性与 zone / checkpoint 引用。字段类型由 schema 负责。"""
+    if isinstance(obj.get("zones"), list) and index.zone_dup is not None:
+        issues.append(ValidationIssue("schema", "zones.id 必须全局唯一且为字符串", pointer=f"/zones/{index.zone_dup}/id"))
+    if isinstance(obj.get("subconditions"), list) and index.sub_dup is not None:
+        issues.append(ValidationIssue("schema", "subconditions.id 必须全局唯一", pointer=f"/subconditions/{index.sub_dup}/id"))
+    checkpoints = obj.get("checkpoints")
+    if not isinstance(checkpoints, list):
+        return
+    if index.cp_dup is not None:
+        issues.append(ValidationIssue("schema", "checkpoints.id 若存在需唯一", pointer=f"/checkpoints/{index.cp_dup}/id"))
+    zone_ids = index.zone_ids
+    cp_ids = index.cp_ids
+    for i, c in enumerate(checkpoints):
+        if not isinstance(c, dict):
+            continue
+        z = c.get("zone")
+        if isinstance(z, str) and z not in zone_ids:
+            issues.append(ValidationIssue("schema", f"checkpoint '{c.get('id','?')}' 的 zone 引用不存在", pointer=f"/checkpoints/{i}/zone"))
+        nxt = c.get("nextcheckpoint")
+        if not isinstance(nxt, dict):
+            continue
+        st = nxt.get("selectortype")
+        if st == "SpecificId":
+            cid = nxt.get("id")
+            if isinstance(cid, str) and cp_ids and cid not in cp_ids:
+                issues.append(ValidationIssue("schema", f"nextcheckpoint.id '{cid}' 不存在于 checkpoints.id", pointer=f"/checkpoints/{i}/nextcheckpoint/id"))
+        elif st == "RandomId":
+            ids = nxt.get("ids")
+            if isinstance(ids, list) and not _ids_known(ids, cp_ids):
+                issues.append(ValidationIssue("schema", "nextcheckpoint.ids 包含不存在的 id", pointer=f"/checkpoints/{i}/nextcheckpoint/ids"))
+
+
+def _check_flow(obj: Dict[str, Any], issues: List[ValidationIssue]) -> None:
+    """流程图检查：不可达的 checkpoint、无出口的环、之后无法结束任务的 checkpoint。"""
+    graph = build_checkpoint_graph(obj)
+    report = analyze_flow(obj, graph)
+    labels = graph.labels
+    for i in report.unreachable:
+        issues.append(ValidationIssue("flow", f"checkpoint '{labels[i]}' 从起点不可达", pointer=f"/checkpoints/{i}"))
+    in_cycle: set[int] = set()
+    for cyc in report.closed_cycles:
+        in_cycle.update(cyc)
+        names = " → ".join(labels[i] for i in cyc[:6]) + (" …" if len(cyc) > 6 else "")
+        issues.append(ValidationIssue("flow", f"checkpoint 环 [{names}] 没有出口，任务无法结束", pointer=f"/checkpoints/{cyc[0]}"))
+    for i in report.dead_ends:
+        if i not in in_cycle:
+            issues.append(ValidationIssue("flow", f"checkpoint '{labels[i]}' 之后无法到达任务终点", pointer=f"/checkpoints/{i}"))
+
+
+def _check_geometry(obj: Dict[str, Any], issues: List[ValidationIssue], bounds: Optional[StageBounds]) -> None:
+    """几何检查中只报告基本可以确定是错误的几类：
+
+    同一 zone 内被完全包含的多余区域、同一动作列表里重复坐标的 dropItem、
+    远超场景范围的坐标。跨 zone 的嵌套/重叠以及不同 checkpoint 在同一位置掉落物品
+    在任务库中很常见，属于有意设计，不作为问题报告（可直接调用 analyze_geometry 查看）。
+    """
+    for f in analyze_geometry(obj, bounds):
+        if f.kind == "duplicate_drop" and f.other is not None and f.other.rsplit("/", 1)[0] != f.pointer.rsplit("/", 1)[0]:
+            continue
+        if f.kind in ("redundant", "duplicate_drop", "out_of_bounds"):
+            issues.append(ValidationIssue("geometry", f.message, pointer=f.pointer))
+
+
+def _check_conditions(
+    obj: Dict[str, Any],
+    index: MissionIndex,
+    issues: List[ValidationIssue],
+    spans: Optional[SpanMap],
+    vocabulary: Optional[ConditionVocabulary],
+) -> None:
+    """解析全部条件串（带缓存），检查语法、SubCondition 引用与词表。"""
+
+    def add(message: str, pointer: str, offset: int) -> None:
+        it = ValidationIssue("condition", message, pointer=pointer)
+        sp = spans.get(pointer) if spans is not None else None
+        if sp is not None:
+            # +1 跳过字符串开头的引号；条件串中不含转义，偏移即列差
+            it.line, it.column = sp.line, sp.column + 1 + offset
+        issues.append(it)
+
+    for pointer, text in iter_condition_strings(obj):
+        try:
+            atoms = condition_atoms(text)
+        except ConditionSyntaxError as e:
+            add(f"条件语法错误：{e.message}", pointer, e.pos)
+            continue
+        for atom in atoms:
+            ref = subcondition_ref(atom.name)
+            if ref is not None:
+                if ref not in index.sub_ids:
+                    add(f"引用的 subcondition '{ref}' 不存在于 subconditions.id", pointer, atom.start)
+            elif vocabulary is not None:
+                suggestion = vocabulary.suggest(atom.name)
+                if suggestion is not None:
+                    add(f"未知条件 '{atom.name}'，是否应为 '{suggestion}'？", pointer, atom.start)
+
+
+def attach_positions(issues: List[ValidationIssue], spans: SpanMap) -> None:
+    """按 pointer 从 span 表回填行列号；pointer 不存在时取最近的祖先节点。"""
+    for it in issues:
+        if it.pointer is None or it.line is not None:
+            continue
+        sp = find_span(spans, it.pointer)
+        if sp is not None:
+            it.line, it.column = sp.line, sp.column
+
+
+def validate_mission_structure(
+    obj: Any,
+    spans: Optional[SpanMap] = None,
+    vocabulary: Optional[ConditionVocabulary] = None,
+    bounds: Optional[StageBounds] = None,
+) -> List[ValidationIssue]:
+    """校验任务结构。
+
+    字段与类型由编译后的声明式 schema（mission_schema）检查；随后用 build_mission_index
+    一次性建好全部 id 索引检查唯一性与引用。按
+    schema → 引用 → 流程图 → 几何 → 条件表达式 的固定顺序报告问题，
+    同一输入总是得到同样顺序的结果。传入 spans 时为每个问题回填行列号；
+    传入 vocabulary 时额外提示疑似拼写错误的条件名；传入 bounds 时检查越界坐标。
+    """
+    issues = [ValidationIssue("schema", message, pointer=pointer) for pointer, message in check_mission_schema(obj)]
+    if isinstance(obj, dict):
+        index = build_mission_index(obj)
+        _check_references(obj, index, issues)
+        checkpoints = obj.get("checkpoints")
+        if isinstance(checkpoints, list) and checkpoints:
+            _check_flow(obj, issues)
+        _check_geometry(obj, issues, bounds)
+        _check_conditions(obj, index, issues, spans, vocabulary)
+
+    if spans is not None:
+        attach_positions(issues, spans)
     return issues
 
 
-def validate_text(text: str) -> List[ValidationIssue]:
+def validate_text_detailed(
+    text: str, vocabulary: Optional[ConditionVocabulary] = None, bounds: Optional[StageBounds] = None
+) -> Tuple[List[ValidationIssue], Optional[Any], Optional[SpanMap]]:
+    """校验文本，并把解析结果与 span 表一并返回，供编辑器复用（避免二次解析）。
+
+    解析只用 json.loads；span 表是 LazySpanMap，只有存在需要定位的问题、或调用方
+    （如编辑器的结构预览）读取它时才会构建。
+    """
     syntax_issues, data = _json_syntax_check(text)
     if data is None:
-        return syntax_issues
-    issues = validate_mission_structure(data)
-    return syntax_issues + issues
+        return syntax_issues, None, None
+    spans = LazySpanMap(text)
+    issues = validate_mission_structure(data, spans, vocabulary, bounds)
+    return syntax_issues + issues, data, spans
+
+
+def validate_text(
+    text: str, vocabulary: Optional[ConditionVocabulary] = None, bounds: Optional[StageBounds] = None
+) -> List[ValidationIssue]:
+    return validate_text_detailed(text, vocabulary, bounds)[0]
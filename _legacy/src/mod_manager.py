@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .config import CUSTOM_MISSIONS_DIR, MODS_STATE_FILE, ensure_directories
 
@@ -21,6 +22,19 @@ class ModInfo:
     is_warp: bool = False
 
 
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(text: str) -> Tuple:
+    """自然排序键：忽略大小写，数字段按数值比较（"00a2" < "00a10"）。
+
+    re.split 的结果中文本段与数字段严格交替，所以两个键逐项比较时类型总是一致；
+    数值相同的数字段再按长度比较，使 "1" 排在 "01" 之前且排序稳定。
+    """
+    parts = _DIGITS.split(text.casefold())
+    return tuple((int(part), len(part)) if i % 2 else part for i, part in enumerate(parts))
+
+
 def _load_state() -> Dict[str, bool]:
     ensure_directories()
     if not MODS_STATE_FILE.exists():
@@ -153,29 +167,35 @@ def _parse_metadata(p: Path) -> dict:
     return {"title": title, "version": version, "author": author, "descriptions": descs, "stage": stage, "is_warp": is_warp}
 
 
-def scan_mods() -> List[ModInfo]:
-    """扫描 CustomMissions 目录下的 .json 作为 Mod。
-    读取 mods_state.json 中的启用状态。
-    """
+def list_mod_files() -> List[Path]:
+    """工作区 CustomMissions 下的全部任务文件（只列目录，不解析）。"""
     ensure_directories()
+    return list(CUSTOM_MISSIONS_DIR.glob("*.json"))
+
+
+def load_mods(paths: Iterable[Path]) -> Iterator[ModInfo]:
+    """逐个解析任务文件并产出 ModInfo；启用状态只读取一次。"""
     state = _load_state()
-    mods: List[ModInfo] = []
-    for p in CUSTOM_MISSIONS_DIR.glob("*.json"):
+    for p in paths:
         enabled = bool(state.get(p.name, True))
         meta = _parse_metadata(p)
-        mods.append(
-            ModInfo(
-                name=str(meta.get("title") or p.stem),
-                path=p,
-                enabled=enabled,
-                version=meta.get("version"),
-                author=meta.get("author"),
-                descriptions=list(meta.get("descriptions") or []),
-                stage=meta.get("stage"),
-                is_warp=bool(meta.get("is_warp", False)),
-            )
+        yield ModInfo(
+            name=str(meta.get("title") or p.stem),
+            path=p,
+            enabled=enabled,
+            version=meta.get("version"),
+            author=meta.get("author"),
+            descriptions=list(meta.get("descriptions") or []),
+            stage=meta.get("stage"),
+            is_warp=bool(meta.get("is_warp", False)),
         )
-    return mods
+
+
+def scan_mods() -> List[ModInfo]:
+    """扫描 CustomMissions 目录下的 .json 作为 Mod。
+    读取 mods_state.json 中的启用状态。
+    """
+    return list(load_mods(list_mod_files()))
 
 
 def set_mod_enabled(filename: str, enabled: bool) -> None:
@@ -0,0 +1,345 @@
+"""把 JSON Schema（draft-07 子集）编译为专用的 Python 校验函数。
+
+不在运行时解释 schema，而是为每个 schema 节点生成对应的 Python 源码：
+属性读取、类型判断、枚举集合、数值边界都直接写进代码，嵌套的对象就地展开，
+只有数组元素与 $ref 定义才生成独立函数。allOf 中形如
+``if: {properties: {type: {const: X}}} then: ...`` 的分支会被识别为判别字段，
+编译成一次字典查表，而不是逐个尝试 if。
+
+生成的代码对象按 schema 内容哈希用 marshal 缓存到磁盘，后续启动直接加载。
+
+支持的关键字：type、enum、const、properties、required、items、minItems、
+minLength、pattern、minimum、exclusiveMinimum、$ref（#/definitions/...）、allOf、
+if/then，以及扩展关键字 x-message（覆盖该节点的错误消息）。其余关键字忽略。
+
+校验函数签名为 ``validate(instance) -> List[Tuple[pointer, message]]``。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+COMPILER_VERSION = 1
+
+SchemaError = Tuple[str, str]  # (JSON Pointer, 消息)
+Validator = Callable[[Any], List[SchemaError]]
+
+_TYPE_TESTS = {
+    "object": "type({v}) is dict",
+    "array": "type({v}) is list",
+    "string": "type({v}) is str",
+    "integer": "type({v}) is int or (type({v}) is float and {v}.is_integer())",  # 与 jsonschema 一致，1.0 也算整数
+    "number": "type({v}) in _NUM",
+    "boolean": "type({v}) is bool",
+    "null": "{v} is None",
+}
+_TYPE_NAMES = {
+    "object": "对象",
+    "array": "数组",
+    "string": "字符串",
+    "integer": "整数",
+    "number": "数字",
+    "boolean": "布尔值",
+    "null": "null",
+}
+
+
+class _CodeGen:
+    def __init__(self, root: Dict[str, Any]) -> None:
+        self.root = root
+        self.header: List[str] = []
+        self.tables: List[str] = []  # 分派表引用函数名，需放在函数定义之后
+        self.funcs: List[List[str]] = []
+        self._n = 0
+        self._consts: Dict[str, str] = {}
+        self._fn_by_id: Dict[Tuple[int, str], str] = {}
+        self._ref_fn: Dict[str, str] = {}
+
+    def name(self, prefix: str) -> str:
+        self._n += 1
+        return f"{prefix}{self._n}"
+
+    def const(self, expr: str, table: bool = False) -> str:
+        """模块级常量（枚举集合、正则、分派表），相同表达式只生成一次。"""
+        name = self._consts.get(expr)
+        if name is None:
+            name = self._consts[expr] = self.name("_c")
+            (self.tables if table else self.header).append(f"{name} = {expr}")
+        return name
+
+    def resolve(self, ref: str) -> Dict[str, Any]:
+        if not ref.startswith("#/"):
+            raise ValueError(f"仅支持文档内引用：{ref}")
+        node: Any = self.root
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+        return node
+
+    def function(self, schema: Dict[str, Any], label: str) -> str:
+        """为 schema 生成独立函数 f(x, p, e)，返回函数名。同一 schema 对象与标签只生成一次。"""
+        ref = schema.get("$ref")
+        if isinstance(ref, str) and len(schema) == 1:
+            fn = self._ref_fn.get(ref)
+            if fn is None:
+                fn = self._ref_fn[ref] = self.name("_d")
+                target = self.resolve(ref)
+                body = self.node(target, "x", "p", ref.rsplit("/", 1)[-1], 1)
+                self.funcs.append([f"def {fn}(x, p, e):"] + (body or ["    pass"]))
+            return fn
+        # 标签会写进错误消息，共享的子 schema 在不同位置需要各自的函数
+        fn = self._fn_by_id.get((id(schema), label))
+        if fn is None:
+            fn = self._fn_by_id[(id(schema), label)] = self.name("_f")
+            body = self.node(schema, "x", "p", label, 1)
+            self.funcs.append([f"def {fn}(x, p, e):"] + (body or ["    pass"]))
+        return fn
+
+    def node(self, s: Dict[str, Any], v: str, ptr: str, label: str, depth: int) -> List[str]:
+        """生成校验值 v 的语句；ptr 为求值得到 pointer 的表达式，只在出错时求值。"""
+        ind = "    " * depth
+        out: List[str] = []
+        msg_override = s.get("x-message")
+
+        def fail(default: str) -> str:
+            text = msg_override if isinstance(msg_override, str) else default
+            return f"e(({ptr}, {text!r}))"
+
+        if isinstance(s.get("$ref"), str):
+            fn = self.function({"$ref": s["$ref"]}, label)
+            out.append(f"{ind}{fn}({v}, {ptr}, e)")
+
+        # 有 type 时其余检查都写在类型判断的 else 分支里，类型不对就不再往下查
+        rest: List[str] = []
+        types = s.get("type")
+        tlist: List[str] = [] if types is None else ([types] if isinstance(types, str) else list(types))
+        body_depth = depth + 1 if tlist else depth
+        bind = "    " * body_depth
+
+        if "const" in s:
+            c = s["const"]
+            rest.append(f"{bind}if {v} != {c!r}:")
+            rest.append(f"{bind}    {fail(f'{label} 必须为 {c!r}')}")
+        if "enum" in s:
+            values = list(s["enum"])
+            shown = "、".join(str(x) for x in values[:8]) + ("…" if len(values) > 8 else "")
+            if all(isinstance(x, str) for x in values):
+                cname = self.const(f"frozenset({sorted(values)!r})")
+                cond = f"type({v}) is not str or {v} not in {cname}"
+            else:
+                cname = self.const(repr(tuple(values)))
+                cond = f"{v} not in {cname}"
+            rest.append(f"{bind}if {cond}:")
+            rest.append(f"{bind}    {fail(f'{label} 的取值不在允许范围内：{shown}')}")
+
+        if "minLength" in s or "pattern" in s:
+            guard = "" if tlist == ["string"] else f"type({v}) is str and "
+            if "minLength" in s:
+                n = int(s["minLength"])
+                default = f"{label} 不能为空" if n == 1 else f"{label} 长度至少为 {n}"
+                rest.append(f"{bind}if {guard}len({v}) < {n}:")
+                rest.append(f"{bind}    {fail(default)}")
+            if "pattern" in s:
+                rx = self.const(f"re.compile({s['pattern']!r})")
+                rest.append(f"{bind}if {guard}{rx}.search({v}) is None:")
+                rest.append(f"{bind}    {fail(f'{label} 格式不正确')}")
+
+        if "minimum" in s or "exclusiveMinimum" in s:
+            guard = "" if tlist and set(tlist) <= {"number", "integer"} else f"type({v}) in _NUM and "
+            if "minimum" in s:
+                m = s["minimum"]
+                rest.append(f"{bind}if {guard}{v} < {m!r}:")
+                rest.append(f"{bind}    {fail(f'{label} 必须 >= {m}')}")
+            if "exclusiveMinimum" in s:
+                m = s["exclusiveMinimum"]
+                rest.append(f"{bind}if {guard}{v} <= {m!r}:")
+                rest.append(f"{bind}    {fail(f'{label} 必须 > {m}')}")
+
+        is_array = tlist == ["array"]
+        if "minItems" in s:
+            n = int(s["minItems"])
+            guard = "" if is_array else f"type({v}) is list and "
+            default = f"{label} 至少包含 {n} 个元素"
+            rest.append(f"{bind}if {guard}len({v}) < {n}:")
+            rest.append(f"{bind}    {fail(default)}")
+        if isinstance(s.get("items"), dict):
+            fn = self.function(s["items"], f"{label}[]")
+            q, i, it = self.name("q"), self.name("i"), self.name("it")
+            loop_ind = bind
+            if not is_array:
+                rest.append(f"{bind}if type({v}) is list:")
+                loop_ind = bind + "    "
+            rest.append(f"{loop_ind}{q} = {ptr} + '/'")
+            rest.append(f"{loop_ind}for {i}, {it} in enumerate({v}):")
+            rest.append(f"{loop_ind}    {fn}({it}, {q} + str({i}), e)")
+
+        props = s.get("properties") or {}
+        required = list(s.get("required") or [])
+        if props or required:
+            obj_ind = bind
+            if tlist != ["object"]:
+                rest.append(f"{bind}if type({v}) is dict:")
+                obj_ind = bind + "    "
+            obj_depth = len(obj_ind) // 4
+            for key in list(props) + [k for k in required if k not in props]:
+                sub = props.get(key, {})
+                pv = self.name("v")
+                token = key.replace("~", "~0").replace("/", "~1")
+                sub_ptr = f"{ptr} + {('/' + token)!r}"
+                sub_label = f"{label}.{key}" if label else key
+                rest.append(f"{obj_ind}{pv} = {v}.get({key!r}, _MISSING)")
+                if key in required:
+                    missing_msg = sub.get("x-message") if isinstance(sub.get("x-message"), str) else f"缺少必填字段 {sub_label}"
+                    rest.append(f"{obj_ind}if {pv} is _MISSING:")
+                    rest.append(f"{obj_ind}    e(({sub_ptr}, {missing_msg!r}))")
+                    body = self.node(sub, pv, sub_ptr, sub_label, obj_depth + 1)
+                    if body:
+                        rest.append(f"{obj_ind}else:")
+                        rest.extend(body)
+                else:
+                    body = self.node(sub, pv, sub_ptr, sub_label, obj_depth + 1)
+                    if body:
+                        rest.append(f"{obj_ind}if {pv} is not _MISSING:")
+                        rest.extend(body)
+                    else:
+                        rest.pop()
+
+        for branch in s.get("allOf") or []:
+            rest.extend(self.branch(branch, v, ptr, label, body_depth, s.get("allOf")))
+        if "if" in s and "then" in s:
+            rest.extend(self.conditional(s["if"], s["then"], v, ptr, label, body_depth))
+
+        if tlist:
+            test = " or ".join(_TYPE_TESTS[t].format(v=v) for t in tlist)
+            names = "或".join(_TYPE_NAMES[t] for t in tlist)
+            out.append(f"{ind}if not ({test}):")
+            out.append(f"{ind}    {fail(f'{label} 应为{names}')}")
+            if rest:
+                out.append(f"{ind}else:")
+        out.extend(rest)
+        return out
+
+    def branch(self, b: Dict[str, Any], v: str, ptr: str, label: str, depth: int, siblings: List[Any]) -> List[str]:
+        # 判别字段分派：同一 allOf 内所有 if 都是 properties.K.const 时，整体编译成一次查表
+        disc = _discriminator(siblings)
+        if disc is not None:
+            if b is not siblings[0]:
+                return []
+            key, cases = disc
+            table = {c: self.function(then, f"{label}[{key}={c}]") for c, then in cases}
+            tname = self.const("{" + ", ".join(f"{c!r}: {fn}" for c, fn in table.items()) + "}", table=True)
+            ind = "    " * depth
+            k, fn = self.name("k"), self.name("fn")
+            return [
+                f"{ind}if type({v}) is dict:",
+                f"{ind}    {k} = {v}.get({key!r})",
+                f"{ind}    if type({k}) is str:",
+                f"{ind}        {fn} = {tname}.get({k})",
+                f"{ind}        if {fn} is not None:",
+                f"{ind}            {fn}({v}, {ptr}, e)",
+            ]
+        if "if" in b and "then" in b:
+            return self.conditional(b["if"], b["then"], v, ptr, label, depth)
+        return self.node(b, v, ptr, label, depth)
+
+    def conditional(self, cond: Dict[str, Any], then: Dict[str, Any], v: str, ptr: str, label: str, depth: int) -> List[str]:
+        ind = "    " * depth
+        fi = self.function(cond, label)
+        ft = self.function(then, label)
+        t = self.name("t")
+        return [f"{ind}{t} = []", f"{ind}{fi}({v}, {ptr}, {t}.append)", f"{ind}if not {t}:", f"{ind}    {ft}({v}, {ptr}, e)"]
+
+    def module(self) -> str:
+        entry = self.function(self.root, "")
+        lines = ["import re", "", "_MISSING = object()", "_NUM = (int, float)"]
+        lines.extend(self.header)
+        for f in self.funcs:
+            lines.append("")
+            lines.extend(f)
+        lines.append("")
+        lines.extend(self.tables)
+        lines.append("")
+        lines.append("def validate(instance):")
+        lines.append("    errors = []")
+        lines.append(f"    {entry}(instance, '', errors.append)")
+        lines.append("    return errors")
+        return "\n".join(lines) + "\n"
+
+
+def _discriminator(branches: Any) -> Optional[Tuple[str, List[Tuple[str, Dict[str, Any]]]]]:
+    if not isinstance(branches, list) or len(branches) < 2:
+        return None
+    key: Optional[str] = None
+    cases: List[Tuple[str, Dict[str, Any]]] = []
+    for b in branches:
+        if not isinstance(b, dict) or set(b) != {"if", "then"}:
+            return None
+        cond = b["if"]
+        props = cond.get("properties") if isinstance(cond, dict) else None
+        if not isinstance(props, dict) or len(props) != 1 or set(cond) - {"properties", "required"}:
+            return None
+        (k, sub), = props.items()
+        if not isinstance(sub, dict) or set(sub) != {"const"} or not isinstance(sub["const"], str):
+            return None
+        if key is not None and k != key:
+            return None
+        key = k
+        cases.append((sub["const"], b["then"]))
+    assert key is not None
+    return key, cases
+
+
+def generate_source(schema: Dict[str, Any]) -> str:
+    """生成校验模块的 Python 源码（便于调试查看）。"""
+    return _CodeGen(schema).module()
+
+
+@lru_cache(maxsize=1)
+def _compiler_digest() -> str:
+    # 生成器本身改动后，旧的缓存代码也必须失效
+    try:
+        return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    except OSError:
+        return str(COMPILER_VERSION)
+
+
+def schema_key(schema: Dict[str, Any]) -> str:
+    """缓存键：schema 内容 + 编译器版本与源码 + 解释器字节码版本。"""
+    raw = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+    tag = f"{COMPILER_VERSION}|{_compiler_digest()}|{sys.implementation.cache_tag}|{raw}"
+    return hashlib.sha256(tag.encode("utf-8")).hexdigest()[:32]
+
+
+def _load_code(path: Path) -> Any:
+    try:
+        return marshal.loads(path.read_bytes())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def compile_schema(schema: Dict[str, Any], cache_dir: Optional[Path] = None) -> Validator:
+    """编译 schema。提供 cache_dir 时优先加载磁盘上的代码对象，没有则编译后写入。"""
+    code = None
+    path: Optional[Path] = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"schema_{schema_key(schema)}.bin"
+        code = _load_code(path) if path.exists() else None
+    if code is None:
+        code = compile(generate_source(schema), "<compiled-schema>", "exec")
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_bytes(marshal.dumps(code))
+                tmp.replace(path)
+            except OSError:
+                pass  # 缓存只是加速，写不进去不影响使用
+    namespace: Dict[str, Any] = {"re": re}
+    exec(code, namespace)
+    return namespace["validate"]
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import atexit
 import json
-from pathlib import Path
-from typing import Any, Dict
-
-from jsonschema import validate, ValidationError
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .config import SETTINGS_FILE, ensure_directories
 
@@ -17,34 +17,8 @@ DEFAULT_SETTINGS: Dict[str, Any] = {
     "lastUpdateCheck": None,
 }
 
-SETTINGS_SCHEMA: Dict[str, Any] = {
-    "type": "object",
-    "properties": {
-        "language": {"type": "string"},
-        "theme": {"type": "string", "enum": ["light", "dark", "system"]},
-        "gameDir": {"type": ["string", "null"]},
-        "encoding": {"type": "string"},
-        "lastUpdateCheck": {"type": ["string", "null"]},
-    },
-    "additionalProperties": True,
-}
-
-
-def load_settings() -> Dict[str, Any]:
-    ensure_directories()
-    if not SETTINGS_FILE.exists():
-        save_settings(DEFAULT_SETTINGS)
-        return DEFAULT_SETTINGS.copy()
-    try:
-        raw = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
-        if not isinstance(raw, dict):
-            raise json.JSONDecodeError("settings must be object", "{}", 0)
-    except json.JSONDecodeError:
-        # 文件损坏：写入默认
-        save_settings(DEFAULT_SETTINGS)
-        return DEFAULT_SETTINGS.copy()
-
-    # 按字段容错合并，避免因单字段非法导致整体重置（例如 theme 值异常）
+def _normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """按字段容错合并到默认设置，避免因单字段非法导致整体重置（例如 theme 值异常）。"""
     result: Dict[str, Any] = DEFAULT_SETTINGS.copy()
     # 已知字段
     if isinstance(raw.get("language"), str):
@@ -65,20 +39,190 @@ def load_settings() -> Dict[str, Any]:
     for k, v in raw.items():
         if k not in result:
             result[k] = v
-    # 最终再做一次宽松校验（不抛出，仅保证已知字段合法）
-    try:
-        validate(instance=result, schema=SETTINGS_SCHEMA)
-    except ValidationError:
-        # 忽略校验错误（additionalProperties 或个别字段），已做字段级容错
-        pass
-    # 保存规范化后的设置（仅在有差异时也可以保存，这里统一保存一次）
+    return result
+
+
+def _read_raw() -> Optional[Dict[str, Any]]:
+    """读取 settings.json；文件不存在或损坏时返回 None。"""
     try:
-        save_settings(result)
-    except Exception:
-        pass
+        raw = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return raw if isinstance(raw, dict) else None
+
+
+def load_settings() -> Dict[str, Any]:
+    ensure_directories()
+    raw = _read_raw()
+    if raw is None:
+        # 文件缺失或损坏：写入默认
+        save_settings(DEFAULT_SETTINGS)
+        return DEFAULT_SETTINGS.copy()
+    result = _normalize(raw)
+    # 只有规范化后与磁盘内容不同才回写
+    if result != raw:
+        try:
+            save_settings(result)
+        except Exception:
+            pass
     return result
 
 
 def save_settings(data: Dict[str, Any]) -> None:
     ensure_directories()
-    SETTINGS_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    # 先写临时文件再原子替换，写到一半崩溃也不会留下损坏的 settings.json
+    tmp = SETTINGS_FILE.with_name(SETTINGS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, SETTINGS_FILE)
+
+
+def _file_stamp() -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(SETTINGS_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+SettingsListener = Callable[[Dict[str, Any], bool], None]
+
+
+class SettingsStore:
+    """内存中的设置，带变更通知与延迟合并写盘。
+
+    - get/snapshot 直接读内存；仅当 settings.json 的 (mtime, size) 被外部改动时才重新加载
+    - update 只在值确实变化时通知监听者，并在 delay 秒内没有新的修改后统一写盘一次
+    - 监听者签名为 listener(changed, external)：changed 为变化的键值，
+      external 表示变化来自外部修改的文件（而不是本进程的 update）
+    - 写盘在计时器线程中进行，监听者总是在调用 get/update 的线程上被调用：任何线程里的
+      get 都可能因发现外部修改而触发通知。操作界面的监听者不能直接注册，应注册一个
+      Qt 信号的 emit，由信号把通知排队送回 GUI 线程（见 SettingsTab）
+    """
+
+    def __init__(self, delay: float = 0.5) -> None:
+        self.delay = delay
+        self._lock = threading.RLock()
+        self._listeners: List[SettingsListener] = []
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._data = load_settings()
+        self._stamp = _file_stamp()
+
+    # ---- 读取 ----
+    def get(self, key: str, default: Any = None) -> Any:
+        self.reload_if_changed()
+        with self._lock:
+            return self._data.get(key, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.reload_if_changed()
+        with self._lock:
+            return dict(self._data)
+
+    def reload_if_changed(self) -> bool:
+        """文件被外部修改时重新加载并通知；有未写盘的本地修改时以内存为准。"""
+        stamp = _file_stamp()
+        with self._lock:
+            if stamp == self._stamp or self._dirty:
+                return False
+            self._stamp = stamp
+            raw = _read_raw()
+            if raw is None:
+                return False
+            fresh = _normalize(raw)
+            changed = {k: v for k, v in fresh.items() if self._data.get(k, _MISSING) != v}
+            self._data = fresh
+        self._notify(changed, True)
+        return bool(changed)
+
+    # ---- 修改 ----
+    def set(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        # 先合并外部修改，否则之后写盘会用旧的内存内容覆盖掉它们
+        self.reload_if_changed()
+        with self._lock:
+            changed = {k: v for k, v in changes.items() if self._data.get(k, _MISSING) != v}
+            if not changed:
+                return
+            self._data.update(changed)
+            self._schedule()
+        self._notify(changed, False)
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        """整体替换（例如恢复默认），被删除的键以 None 通知。"""
+        self.reload_if_changed()
+        with self._lock:
+            fresh = dict(data)
+            changed = {k: v for k, v in fresh.items() if self._data.get(k, _MISSING) != v}
+            changed.update({k: None for k in self._data if k not in fresh})
+            if not changed:
+                return
+            self._data = fresh
+            self._schedule()
+        self._notify(changed, False)
+
+    def flush(self) -> None:
+        """立即写盘（取消尚未触发的延迟写）。"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            save_settings(self._data)
+            self._dirty = False
+            # 记下自己写出的文件戳，避免把自己的写盘误认为外部修改
+            self._stamp = _file_stamp()
+
+    def _schedule(self) -> None:
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self._flush_quietly)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            # 写盘失败时保留 dirty，下一次 update 或退出时再试
+            pass
+
+    # ---- 通知 ----
+    def subscribe(self, listener: SettingsListener) -> Callable[[], None]:
+        """注册监听者，返回取消注册的函数。"""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _notify(self, changed: Dict[str, Any], external: bool) -> None:
+        if not changed:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for fn in listeners:
+            fn(changed, external)
+
+
+_MISSING = object()
+_STORE: Optional[SettingsStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def settings_store() -> SettingsStore:
+    """进程内共享的 SettingsStore；首次调用时加载，并在退出时写出未保存的修改。"""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = SettingsStore()
+            atexit.register(_STORE.flush)
+        return _STORE
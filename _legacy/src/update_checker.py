@@ -4,27 +4,40 @@ Contract:
 - check_for_updates(remote_api_url: str, current_version: str) -> dict
   returns { "update_available": bool, "latest_version": str, "assets": [{"name":..., "browser_download_url":...}], "message": ... }
 - download_asset(url: str, dest: Path) -> Path
+- UpdateService: cached, conditional (ETag / Last-Modified) checks with a TTL,
+  optionally run on a background thread.
 
-This module is small, synchronous, and uses only the standard library.
+This module uses only the standard library.
 """
 from __future__ import annotations
 
 import json
-import shutil
+import os
+import threading
+import time
+import urllib.error
 import urllib.request
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import CACHE_DIR
+from .downloader import Downloader, ProgressCallback
+
+USER_AGENT = "PracticeApp-UpdateChecker/1.0"
+DEFAULT_REPO = "felixchaos/Manaka-MOD-Station"
 
 
 @dataclass
 class ReleaseAsset:
     name: str
     url: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None  # from the API's "digest" field ("sha256:<hex>") when present
 
 
 def _fetch_json(url: str, timeout: int = 10) -> dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "PracticeApp-UpdateChecker/1.0"})
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
     with urllib.request.urlopen(req, timeout=timeout) as r:
         raw = r.read()
         return json.loads(raw.decode("utf-8"))
@@ -64,24 +77,196 @@ def check_for_updates_github(repo: str, current_version: str, timeout: int = 10)
     except Exception as e:
         return {"update_available": False, "latest_version": current_version, "assets": [], "error": str(e)}
 
+    return _release_result(data, current_version)
+
+
+def _release_result(data: dict, current_version: str) -> dict:
     latest_tag = data.get("tag_name") or data.get("name")
     assets = []
     for a in data.get("assets", []):
-        assets.append(ReleaseAsset(name=a.get("name"), url=a.get("browser_download_url")))
+        digest = a.get("digest") or ""
+        assets.append(
+            ReleaseAsset(
+                name=a.get("name"),
+                url=a.get("browser_download_url"),
+                size=a.get("size"),
+                sha256=digest[len("sha256:"):] if digest.startswith("sha256:") else None,
+            )
+        )
 
     update_available = _is_newer(latest_tag, current_version)
     return {"update_available": update_available, "latest_version": latest_tag, "assets": assets}
 
 
-def download_asset(url: str, dest: Path, timeout: int = 30) -> Path:
-    dest = Path(dest)
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    tmp = dest.with_suffix(dest.suffix + ".tmp")
-    req = urllib.request.Request(url, headers={"User-Agent": "PracticeApp-UpdateChecker/1.0"})
-    with urllib.request.urlopen(req, timeout=timeout) as resp, tmp.open("wb") as out:
-        shutil.copyfileobj(resp, out)
-    tmp.replace(dest)
-    return dest
+@dataclass
+class CachedRelease:
+    """Last successful response of the releases endpoint plus its validators."""
+
+    url: str
+    body: dict
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    checked_at: float = 0.0  # time.time() of the last request that reached the server
+
+
+class UpdateService:
+    """Update checks that are cheap to repeat.
+
+    - Within ``ttl`` seconds of the last successful check no request is made at all.
+    - After that a conditional request is sent (If-None-Match / If-Modified-Since);
+      a 304 answer has no body and simply renews the cached response.
+    - Network errors fall back to the cached response when one exists.
+
+    ``api_url`` defaults to the GitHub "releases/latest" endpoint of ``repo``; point it
+    at any server returning the same JSON (e.g. a local http.server) to test offline.
+    """
+
+    def __init__(
+        self,
+        current_version: str,
+        repo: str = DEFAULT_REPO,
+        api_url: Optional[str] = None,
+        cache_path: Optional[Path] = None,
+        ttl: float = 6 * 3600,
+        timeout: int = 10,
+    ) -> None:
+        self.current_version = current_version
+        self.api_url = api_url or f"https://api.github.com/repos/{repo}/releases/latest"
+        self.cache_path = Path(cache_path) if cache_path is not None else CACHE_DIR / "update_check.json"
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    # ---- cache ----
+    def load_cache(self) -> Optional[CachedRelease]:
+        try:
+            raw = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            cached = CachedRelease(**raw)
+        except (OSError, ValueError, TypeError):
+            return None
+        # a cache written for another endpoint is useless (and its validators wrong)
+        return cached if cached.url == self.api_url and isinstance(cached.body, dict) else None
+
+    def _save_cache(self, cached: CachedRelease) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(cached), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    # ---- network ----
+    def _request(self, cached: Optional[CachedRelease]) -> CachedRelease:
+        headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        req = urllib.request.Request(self.api_url, headers=headers)
+        now = time.time()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                body = json.loads(r.read().decode("utf-8"))
+                if not isinstance(body, dict):
+                    # valid JSON but not a release object: a failed request, never cached
+                    raise ValueError(f"unexpected response from {self.api_url}: expected a JSON object")
+                return CachedRelease(
+                    url=self.api_url,
+                    body=body,
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                    checked_at=now,
+                )
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or cached is None:
+                raise
+            # 304 Not Modified: keep the body, take any refreshed validators
+            return CachedRelease(
+                url=self.api_url,
+                body=cached.body,
+                etag=e.headers.get("ETag") or cached.etag,
+                last_modified=e.headers.get("Last-Modified") or cached.last_modified,
+                checked_at=now,
+            )
+
+    def check(self, force: bool = False) -> dict:
+        """Return the same dict as check_for_updates_github, plus bookkeeping keys:
+        ``source`` ("cache", "not_modified", "network" or "stale"), ``checked_at``
+        and ``error`` when the request failed.
+
+        ``force`` skips the TTL but still sends a conditional request.
+        """
+        with self._lock:
+            cached = self.load_cache()
+            if not force and cached is not None and time.time() - cached.checked_at < self.ttl:
+                return self._result(cached, "cache")
+            try:
+                fresh = self._request(cached)
+            except Exception as e:
+                if cached is None:
+                    return self._error_result(e)
+                res = self._result(cached, "stale")
+                res["error"] = str(e)
+                return res
+            try:
+                self._save_cache(fresh)
+            except OSError:
+                pass
+            not_modified = cached is not None and fresh.body is cached.body
+            return self._result(fresh, "not_modified" if not_modified else "network")
+
+    def check_in_background(self, callback: Callable[[dict], Any], force: bool = False) -> threading.Thread:
+        """Run check() on a daemon thread and pass its result to ``callback`` there.
+
+        GUI callers must marshal the result back to their own thread (e.g. via a Qt signal).
+        An unexpected exception in check() is reported as an "error" result, so the
+        callback always runs exactly once.
+        """
+
+        def run() -> None:
+            try:
+                res = self.check(force)
+            except Exception as e:
+                res = self._error_result(e)
+            callback(res)
+
+        t = threading.Thread(target=run, name="update-check", daemon=True)
+        t.start()
+        return t
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "update_available": False,
+            "latest_version": self.current_version,
+            "assets": [],
+            "error": str(error),
+            "source": "error",
+            "checked_at": None,
+        }
+
+    def _result(self, cached: CachedRelease, source: str) -> Dict[str, Any]:
+        res = _release_result(cached.body, self.current_version)
+        res["source"] = source
+        res["checked_at"] = cached.checked_at
+        return res
+
+
+def download_asset(
+    url: str,
+    dest: Path,
+    timeout: int = 30,
+    sha256: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Path:
+    """Download ``url`` to ``dest``, resuming a previous partial ``dest.tmp`` when possible.
+
+    Large files are fetched as parallel ranges; ``sha256`` (e.g. ReleaseAsset.sha256) is
+    verified before the file is renamed into place. See src.downloader for details.
+    """
+    dl = Downloader(timeout=timeout)
+    try:
+        return dl.download(url, Path(dest), sha256=sha256, progress=progress)
+    finally:
+        dl.close()
 
 
 if __name__ == "__main__":
@@ -89,7 +274,7 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 3:
-        print("Usage: update_checker.py owner/repo current_version")
+        print("Usage: python -m src.update_checker owner/repo current_version")
         raise SystemExit(2)
     repo = sys.argv[1]
     cur = sys.argv[2]
@@ -0,0 +1,351 @@
+"""区域与坐标的几何检查（NumPy 向量化）。
+
+- 同一场景（stage）内球形区域的包含（同一 zone 内即为多余区域）与跨 zone 的部分重叠
+- dropItem 坐标的近似重复（间距不超过 epsilon）
+- 明显超出场景已知范围的坐标（范围从任务库中统计得到）
+
+近邻查找使用均匀网格分桶：点按格子编号排序后，对“半邻域”的 14 个格子偏移各做一次
+searchsorted，得到全部候选点对，再向量化计算精确距离。整体 O(n log n)，
+没有任何逐点的 Python 循环，数千个点也只需毫秒级。
+
+半径不小于 WHOLE_STAGE_RADIUS 的球是覆盖整个场景的“全场景区域”（如 r=5000），
+不参与包含/重叠与范围检查。坐标或半径为 NaN、inf 或绝对值超过 MAX_COORDINATE 的点
+不参与任何计算，直接报告为越界。
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .config import CUSTOM_MISSIONS_DIR
+
+
+WHOLE_STAGE_RADIUS = 1000.0
+DROP_EPSILON = 0.05
+MAX_COORDINATE = 1e6  # 任务库中的坐标与半径都在几千以内
+# 格子编号的绝对值上限：floor 的结果在 float64 中仍精确，相邻编号之差也不会溢出 int64
+_MAX_CELL = float(2 ** 52)
+_JUMP_LISTS = ("oncomplete", "onviolatecondition", "onmetcondition")
+# 半邻域：(0,0,0) 与字典序大于它的 13 个偏移，每个无序格子对恰好枚举一次
+_HALF_NEIGHBOURS = np.array(
+    [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1) if (dx, dy, dz) >= (0, 0, 0)],
+    dtype=np.int64,
+)
+
+
+@dataclass
+class GeometryFinding:
+    kind: str  # "redundant" | "contained" | "overlap" | "duplicate_drop" | "out_of_bounds"
+    message: str
+    pointer: str  # 问题所在的 area / action
+    other: Optional[str] = None  # 相关的另一个 area / action
+
+
+@dataclass
+class _Points:
+    """同一场景下的点集；xyz 形状为 (n, 3)。"""
+    xyz: np.ndarray
+    r: np.ndarray
+    pointers: List[str]
+    groups: List[str]  # 所属 zone id（dropItem 为空串）
+
+
+_NUMBER_TYPES = (int, float)  # 精确类型匹配，排除 bool
+
+_Row = Tuple[str, float, float, float, float, str, str]
+
+
+def _in_range(*values: float) -> bool:
+    """所有值都在 ±MAX_COORDINATE 以内；NaN、inf 与超大整数都不算，比较不经过 float 转换。"""
+    return all(-MAX_COORDINATE <= v <= MAX_COORDINATE for v in values)
+
+
+def _partition(rows: Iterable[_Row]) -> Tuple[List[_Row], List[_Row]]:
+    """按坐标与半径是否可用拆成 (可用, 不可用) 两组，保持原有顺序。"""
+    good: List[_Row] = []
+    bad: List[_Row] = []
+    for row in rows:
+        (good if _in_range(*row[1:5]) else bad).append(row)
+    return good, bad
+
+
+def _collect(rows: Iterable[_Row]) -> Dict[str, _Points]:
+    by_stage: Dict[str, List[Tuple[float, float, float, float, str, str]]] = {}
+    for stage, x, y, z, r, ptr, group in rows:
+        by_stage.setdefault(stage, []).append((x, y, z, r, ptr, group))
+    out: Dict[str, _Points] = {}
+    for stage, items in by_stage.items():
+        arr = np.array([it[:4] for it in items], dtype=np.float64)
+        out[stage] = _Points(arr[:, :3], arr[:, 3], [it[4] for it in items], [it[5] for it in items])
+    return out
+
+
+def _iter_areas(obj: Any) -> Iterator[_Row]:
+    zones = obj.get("zones") if isinstance(obj, dict) else None
+    if not isinstance(zones, list):
+        return
+    for i, z in enumerate(zones):
+        if not isinstance(z, dict) or not isinstance(z.get("areas"), list):
+            continue
+        zid = z.get("id") if isinstance(z.get("id"), str) else f"#{i}"
+        for j, a in enumerate(z["areas"]):
+            if not isinstance(a, dict) or a.get("type", "sphere") != "sphere" or not isinstance(a.get("stage"), str):
+                continue
+            x, y, z, r = a.get("x"), a.get("y"), a.get("z"), a.get("r")
+            if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES and type(z) in _NUMBER_TYPES and type(r) in _NUMBER_TYPES:
+                yield a["stage"], x, y, z, r, f"/zones/{i}/areas/{j}", zid
+
+
+def _iter_drops(obj: Any) -> Iterator[_Row]:
+    cps = obj.get("checkpoints") if isinstance(obj, dict) else None
+    if not isinstance(cps, list):
+        return
+    for i, c in enumerate(cps):
+        if not isinstance(c, dict):
+            continue
+        for key in ("condition", "travelcondition"):
+            blk = c.get(key)
+            if not isinstance(blk, dict):
+                continue
+            for lk in _JUMP_LISTS:
+                acts = blk.get(lk)
+                if not isinstance(acts, list):
+                    continue
+                for k, a in enumerate(acts):
+                    if not isinstance(a, dict) or a.get("type") != "dropItem" or not isinstance(a.get("stage"), str):
+                        continue
+                    x, y, z = a.get("x"), a.get("y"), a.get("z")
+                    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES and type(z) in _NUMBER_TYPES:
+                        yield a["stage"], x, y, z, 0.0, f"/checkpoints/{i}/{key}/{lk}/{k}", ""
+
+
+def candidate_pairs(xyz: np.ndarray, cell: float) -> Tuple[np.ndarray, np.ndarray]:
+    """网格分桶后返回所有位于相邻格子（含同格）的点对 (i, j)，i < j。
+
+    任意两个距离小于 cell 的点必然出现在结果中；调用方再按精确距离过滤。
+    坐标不是有限数或大到无法换算成格子编号的点不参与配对。
+    """
+    n = len(xyz)
+    empty = np.empty(0, dtype=np.int64)
+    if n < 2:
+        return empty, empty
+    # 先比较再相除，避免 xyz / cell 本身溢出
+    ok = (np.isfinite(xyz) & (np.abs(xyz) <= _MAX_CELL * cell)).all(axis=1)
+    if not ok.all():
+        sub = np.flatnonzero(ok)
+        i, j = candidate_pairs(xyz[sub], cell)
+        return sub[i], sub[j]
+    cells = np.floor(xyz / cell).astype(np.int64)
+    # 逐轴压缩编号：相差 1 的格子仍相差 1，相差更多的一律记为 2。每轴不超过 2n 个编号，
+    # 编码后的键不会溢出；从 1 开始并留出一格余量，使邻格偏移不会“折返”到别的行
+    for d in range(3):
+        u, inv = np.unique(cells[:, d], return_inverse=True)
+        packed = np.concatenate(([1], 1 + np.cumsum(np.minimum(np.diff(u), 2))))
+        cells[:, d] = packed[inv.reshape(-1)]
+    dims = cells.max(axis=0) + 2
+    stride = np.array([dims[1] * dims[2], dims[2], 1], dtype=np.int64)
+    keys = cells @ stride
+    order = np.argsort(keys, kind="stable")
+    skeys = keys[order]
+    idx = np.arange(n, dtype=np.int64)
+    out_i: List[np.ndarray] = []
+    out_j: List[np.ndarray] = []
+    for off in _HALF_NEIGHBOURS @ stride:
+        target = keys + off
+        lo = np.searchsorted(skeys, target, "left")
+        hi = np.searchsorted(skeys, target, "right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        # 把每个点的 [lo, hi) 区间展开成扁平的下标序列
+        ends = np.cumsum(counts)
+        pos = np.arange(total, dtype=np.int64) - np.repeat(ends - counts, counts) + np.repeat(lo, counts)
+        i = np.repeat(idx, counts)
+        j = order[pos]
+        if off == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        out_i.append(np.minimum(i, j))
+        out_j.append(np.maximum(i, j))
+    if not out_i:
+        return empty, empty
+    return np.concatenate(out_i), np.concatenate(out_j)
+
+
+def _sphere_pairs(pts: _Points) -> Tuple[np.ndarray, np.ndarray]:
+    """半径之和大于球心距离的球对 (i, j)，i < j。大半径的球单独与全体比较，避免格子过大。"""
+    n = len(pts.r)
+    if n < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    cap = max(float(np.percentile(pts.r, 95)), 1e-6)
+    if float(pts.r.max()) <= 2 * cap:
+        # 半径分布集中时不需要单独处理大球
+        cap = float(pts.r.max())
+    small = np.flatnonzero(pts.r <= cap)
+    big = np.flatnonzero(pts.r > cap)
+    si, sj = candidate_pairs(pts.xyz[small], 2 * cap)
+    i_parts = [small[si]]
+    j_parts = [small[sj]]
+    if len(big):
+        # 大球数量很少（不超过 5%）且明显大于其余的球，直接与所有球做广播比较
+        bi = np.repeat(big, n)
+        bj = np.tile(np.arange(n, dtype=np.int64), len(big))
+        keep = (bi != bj) & ~((pts.r[bj] > cap) & (bj < bi))
+        i_parts.append(np.minimum(bi[keep], bj[keep]))
+        j_parts.append(np.maximum(bi[keep], bj[keep]))
+    i = np.concatenate(i_parts)
+    j = np.concatenate(j_parts)
+    d = np.linalg.norm(pts.xyz[i] - pts.xyz[j], axis=1)
+    hit = d < pts.r[i] + pts.r[j]
+    return i[hit], j[hit]
+
+
+def _sphere_findings(stage: str, pts: _Points, findings: List[GeometryFinding]) -> None:
+    mask = pts.r < WHOLE_STAGE_RADIUS
+    if mask.sum() < 2:
+        return
+    keep = np.flatnonzero(mask)
+    sub = _Points(pts.xyz[keep], pts.r[keep], [pts.pointers[k] for k in keep], [pts.groups[k] for k in keep])
+    i, j = _sphere_pairs(sub)
+    if not len(i):
+        return
+    order = np.lexsort((j, i))
+    i, j = i[order], j[order]
+    d = np.linalg.norm(sub.xyz[i] - sub.xyz[j], axis=1)
+    ri, rj = sub.r[i], sub.r[j]
+    # inner 为较小的球；d + r_inner <= r_outer 即完全包含
+    swap = ri > rj
+    inner = np.where(swap, j, i)
+    outer = np.where(swap, i, j)
+    contained = d + np.minimum(ri, rj) <= np.maximum(ri, rj) + 1e-9
+    for a, b, c in zip(inner.tolist(), outer.tolist(), contained.tolist()):
+        pa, pb = sub.pointers[a], sub.pointers[b]
+        same_zone = sub.groups[a] == sub.groups[b]
+        if c and same_zone:
+            findings.append(GeometryFinding("redundant", f"{stage} 区域 {pa} 完全位于同一 zone 的区域 {pb} 之内，是多余的", pa, pb))
+        elif c:
+            findings.append(GeometryFinding("contained", f"{stage} 区域 {pa} 完全位于 zone '{sub.groups[b]}' 的区域 {pb} 之内", pa, pb))
+        elif not same_zone:
+            findings.append(
+                GeometryFinding("overlap", f"{stage} 区域 {pa}（zone '{sub.groups[a]}'）与 zone '{sub.groups[b]}' 的 {pb} 部分重叠", pa, pb)
+            )
+
+
+def _drop_findings(stage: str, pts: _Points, eps: float, findings: List[GeometryFinding]) -> None:
+    i, j = candidate_pairs(pts.xyz, eps)
+    if not len(i):
+        return
+    d = np.linalg.norm(pts.xyz[i] - pts.xyz[j], axis=1)
+    hit = d <= eps
+    i, j, d = i[hit], j[hit], d[hit]
+    # 每个点只报告一次，指向文档中最早与它重合的点
+    order = np.lexsort((i, j))
+    seen: set[int] = set()
+    for a, b, dist in zip(i[order].tolist(), j[order].tolist(), d[order].tolist()):
+        if b in seen:
+            continue
+        seen.add(b)
+        pa, pb = pts.pointers[a], pts.pointers[b]
+        findings.append(GeometryFinding("duplicate_drop", f"{stage} dropItem 坐标与 {pa} 几乎重合（间距 {dist:.3f}）", pb, pa))
+
+
+@dataclass
+class StageBounds:
+    """每个场景的坐标范围：lo/hi 为各轴的观测范围（可用分位数去掉极端值），margin 为允许的额外余量。"""
+    lo: Dict[str, np.ndarray] = field(default_factory=dict)
+    hi: Dict[str, np.ndarray] = field(default_factory=dict)
+    margin: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def outside(self, stage: str, xyz: np.ndarray) -> np.ndarray:
+        """返回越界点的布尔掩码；未知场景不做判断。"""
+        if stage not in self.lo:
+            return np.zeros(len(xyz), dtype=bool)
+        lo = self.lo[stage] - self.margin[stage]
+        hi = self.hi[stage] + self.margin[stage]
+        return ((xyz < lo) | (xyz > hi)).any(axis=1)
+
+    @classmethod
+    def from_missions(
+        cls, missions: Iterable[Any], quantile: float = 0.0, rel_margin: float = 0.25, min_margin: float = 10.0
+    ) -> "StageBounds":
+        rows: List[_Row] = []
+        for obj in missions:
+            rows.extend(r for r in _partition(_iter_areas(obj))[0] if r[4] < WHOLE_STAGE_RADIUS)
+            rows.extend(_partition(_iter_drops(obj))[0])
+        bounds = cls()
+        for stage, pts in _collect(rows).items():
+            lo = np.percentile(pts.xyz, quantile, axis=0)
+            hi = np.percentile(pts.xyz, 100 - quantile, axis=0)
+            bounds.lo[stage] = lo
+            bounds.hi[stage] = hi
+            bounds.margin[stage] = np.maximum((hi - lo) * rel_margin, min_margin)
+        return bounds
+
+    @classmethod
+    def from_directory(cls, directory: Path = CUSTOM_MISSIONS_DIR) -> "StageBounds":
+        def load() -> Iterator[Any]:
+            for p in sorted(Path(directory).glob("*.json")):
+                try:
+                    yield json.loads(p.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+        return cls.from_missions(load())
+
+    def fingerprint(self) -> str:
+        return json.dumps(
+            {s: [self.lo[s].round(3).tolist(), self.hi[s].round(3).tolist(), self.margin[s].round(3).tolist()] for s in sorted(self.lo)}
+        )
+
+
+def _bounds_findings(
+    stage: str, pts: _Points, bounds: StageBounds, what: str, findings: List[GeometryFinding]
+) -> None:
+    mask = pts.r < WHOLE_STAGE_RADIUS
+    bad = np.flatnonzero(bounds.outside(stage, pts.xyz) & mask)
+    for k in bad.tolist():
+        x, y, z = pts.xyz[k].tolist()
+        findings.append(
+            GeometryFinding("out_of_bounds", f"{what}坐标 ({x:g}, {y:g}, {z:g}) 远超出场景 {stage} 的已知范围", pts.pointers[k])
+        )
+
+
+def _unusable_findings(rows: List[_Row], what: str, findings: List[GeometryFinding]) -> None:
+    for stage, *_, ptr, _group in rows:
+        findings.append(
+            GeometryFinding("out_of_bounds", f"{what}不是有限数，或绝对值超过 {MAX_COORDINATE:g}（场景 {stage}）", ptr)
+        )
+
+
+def analyze_geometry(
+    obj: Any, bounds: Optional[StageBounds] = None, drop_epsilon: float = DROP_EPSILON
+) -> List[GeometryFinding]:
+    """对单个任务做几何检查，按 区域 → dropItem 的顺序返回发现的问题。"""
+    findings: List[GeometryFinding] = []
+    area_rows, bad_areas = _partition(_iter_areas(obj))
+    drop_rows, bad_drops = _partition(_iter_drops(obj))
+    areas = _collect(area_rows)
+    drops = _collect(drop_rows)
+    for stage in sorted(areas):
+        _sphere_findings(stage, areas[stage], findings)
+        if bounds is not None:
+            _bounds_findings(stage, areas[stage], bounds, "区域", findings)
+    _unusable_findings(bad_areas, "区域坐标或半径", findings)
+    for stage in sorted(drops):
+        _drop_findings(stage, drops[stage], drop_epsilon, findings)
+        if bounds is not None:
+            _bounds_findings(stage, drops[stage], bounds, "dropItem ", findings)
+    _unusable_findings(bad_drops, "dropItem 坐标", findings)
+    return findings
+
+
+@lru_cache(maxsize=1)
+def library_stage_bounds() -> StageBounds:
+    """当前任务库的场景坐标范围（进程内只统计一次）。"""
+    return StageBounds.from_directory()
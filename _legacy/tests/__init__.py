@@ -0,0 +1,8 @@
+"""离线测试（python -m pytest 或 python -m unittest discover，在 _legacy 目录下运行）。
+
+src.config 在导入时读取 APPDATA：先把它指向临时目录，测试不会读写用户真实的任务库与设置。
+"""
+import os
+import tempfile
+
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="practiceapp-test-")
@@ -0,0 +1,210 @@
+"""delta_patch 的测试：生成/应用往返、损坏或截断的补丁、基线不符，以及 fetch_update 的整包回退。"""
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.delta_patch import PatchError, apply_patch, fetch_update, find_patch_asset, make_patch, patch_asset_name
+from src.downloader import Downloader
+from src.update_checker import ReleaseAsset
+from tests.local_server import LocalServer, QuietHandler
+
+
+def _edited(old: bytes, rng: random.Random) -> bytes:
+    """在 old 上做插入、删除与块移动，模拟两个版本之间的改动。"""
+    data = bytearray(old)
+    for _ in range(20):
+        at = rng.randrange(len(data))
+        if rng.random() < 0.5:
+            data[at:at] = os.urandom(rng.randint(1, 300))
+        else:
+            del data[at:at + rng.randint(1, 300)]
+    cut = len(data) // 3
+    return bytes(data[cut:2 * cut] + data[:cut] + data[2 * cut:])
+
+
+class DeltaPatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.rng = random.Random(1234)
+        self.old = self.write("old.bin", os.urandom(300 * 1024))
+
+    def write(self, name: str, data: bytes) -> Path:
+        p = self.dir / name
+        p.write_bytes(data)
+        return p
+
+    def roundtrip(self, new: bytes) -> int:
+        new_path = self.write("new.bin", new)
+        patch = self.dir / "p.patch"
+        out = self.dir / "out.bin"
+        make_patch(self.old, new_path, patch)
+        apply_patch(self.old, patch, out)
+        self.assertEqual(out.read_bytes(), new)
+        self.assertFalse(out.with_suffix(".bin.tmp").exists())
+        return patch.stat().st_size
+
+    def test_roundtrip_small_edits(self) -> None:
+        size = self.roundtrip(_edited(self.old.read_bytes(), self.rng))
+        self.assertLess(size, 32 * 1024)  # 大部分内容来自旧文件，补丁远小于 300 KiB
+
+    def test_roundtrip_large_edits(self) -> None:
+        old = self.old.read_bytes()
+        half = len(old) // 2
+        self.roundtrip(os.urandom(half) + old[half:] + os.urandom(100 * 1024))
+
+    def test_roundtrip_identical_and_empty_target(self) -> None:
+        self.roundtrip(self.old.read_bytes())
+        self.roundtrip(b"")
+
+    def test_roundtrip_smaller_than_a_block(self) -> None:
+        self.old = self.write("tiny.bin", b"abc")
+        self.roundtrip(b"abcd")
+
+    def _patch(self) -> Path:
+        new_path = self.write("new.bin", _edited(self.old.read_bytes(), self.rng))
+        patch = self.dir / "p.patch"
+        make_patch(self.old, new_path, patch)
+        return patch
+
+    def assert_rejected(self, patch: Path, old: Optional[Path] = None) -> PatchError:
+        out = self.dir / "out.bin"
+        with self.assertRaises(PatchError) as cm:
+            apply_patch(old or self.old, patch, out)
+        self.assertFalse(out.exists())
+        self.assertFalse(out.with_suffix(".bin.tmp").exists())
+        return cm.exception
+
+    def test_truncated_patch(self) -> None:
+        raw = self._patch().read_bytes()
+        for cut in (0, 10, 80, len(raw) // 2, len(raw) - 1):
+            self.assert_rejected(self.write("cut.patch", raw[:cut]))
+
+    def test_corrupted_patch(self) -> None:
+        raw = bytearray(self._patch().read_bytes())
+        bad_magic = bytes(b"X" + raw[1:])
+        self.assert_rejected(self.write("magic.patch", bad_magic))
+        for at in (len(raw) // 2, len(raw) - 5):
+            broken = bytearray(raw)
+            broken[at] ^= 0xFF
+            self.assert_rejected(self.write("flip.patch", bytes(broken)))
+
+    def test_wrong_base(self) -> None:
+        patch = self._patch()
+        other = bytearray(self.old.read_bytes())
+        other[1000] ^= 1  # 大小相同、内容不同
+        err = self.assert_rejected(patch, self.write("other.bin", bytes(other)))
+        self.assertIn("base", str(err))
+
+    def test_patch_asset_lookup(self) -> None:
+        name = patch_asset_name("PracticeApp.zip", "v1.2.0")
+        self.assertEqual(name, "PracticeApp.zip.from-1.2.0.patch")
+        assets = [ReleaseAsset("PracticeApp.zip", "u1"), ReleaseAsset(name, "u2")]
+        self.assertEqual(find_patch_asset(assets, "PracticeApp.zip", "1.2.0").url, "u2")  # type: ignore[union-attr]
+        self.assertIsNone(find_patch_asset(assets, "PracticeApp.zip", "1.1.0"))
+
+
+class _FilesHandler(QuietHandler):
+    """按路径提供 server.files 中的内容，不存在的路径回 404。"""
+
+    def _body(self) -> Optional[bytes]:
+        return self.server.files.get(self.path)  # type: ignore[attr-defined]
+
+    def _head(self, body: Optional[bytes]) -> None:
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+    def do_HEAD(self) -> None:
+        self._head(self._body())
+
+    def do_GET(self) -> None:
+        body = self._body()
+        self.server.gets.append(self.path)  # type: ignore[attr-defined]
+        self._head(body)
+        if body is not None:
+            self.wfile.write(body)
+
+
+class FetchUpdateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        old = os.urandom(200 * 1024)
+        self.new = _edited(old, random.Random(99))
+        self.installed = self.dir / "installed.zip"
+        self.installed.write_bytes(old)
+        new_path = self.dir / "built.zip"
+        new_path.write_bytes(self.new)
+        patch_path = self.dir / "built.patch"
+        make_patch(self.installed, new_path, patch_path)
+        self.patch = patch_path.read_bytes()
+        self.server = LocalServer(_FilesHandler).start()
+        self.server.httpd.files = {"/full.zip": self.new, "/delta.patch": self.patch}  # type: ignore[attr-defined]
+        self.server.httpd.gets = []  # type: ignore[attr-defined]
+        self.dl = Downloader(timeout=5)
+        self.dest = self.dir / "out" / "PracticeApp.zip"
+        self.dest.parent.mkdir()
+
+    def tearDown(self) -> None:
+        self.dl.close()
+        self.server.stop()
+
+    @property
+    def files(self) -> Dict[str, bytes]:
+        return self.server.httpd.files  # type: ignore[attr-defined]
+
+    @property
+    def gets(self) -> List[str]:
+        return self.server.httpd.gets  # type: ignore[attr-defined]
+
+    def assets(self, patch_sha: Optional[str] = None) -> tuple:
+        full = ReleaseAsset("PracticeApp.zip", self.server.url("/full.zip"), len(self.new), hashlib.sha256(self.new).hexdigest())
+        patch = ReleaseAsset("PracticeApp.zip.from-1.0.0.patch", self.server.url("/delta.patch"), len(self.patch), patch_sha)
+        return full, patch
+
+    def fetch(self, with_patch: bool = True) -> bool:
+        full, patch = self.assets()
+        path, used_patch = fetch_update(self.installed, self.dest, full, patch if with_patch else None, downloader=self.dl)
+        self.assertEqual(Path(path).read_bytes(), self.new)
+        self.assertFalse((self.dest.parent / patch.name).exists())  # 下载的补丁用完即删
+        return used_patch
+
+    def test_uses_patch(self) -> None:
+        self.assertTrue(self.fetch())
+        self.assertEqual(self.gets, ["/delta.patch"])
+
+    def test_without_patch_downloads_full(self) -> None:
+        self.assertFalse(self.fetch(with_patch=False))
+        self.assertEqual(self.gets, ["/full.zip"])
+
+    def test_falls_back_when_patch_is_missing(self) -> None:
+        del self.files["/delta.patch"]
+        self.assertFalse(self.fetch())
+        self.assertIn("/full.zip", self.gets)
+
+    def test_falls_back_when_patch_is_corrupted(self) -> None:
+        broken = bytearray(self.patch)
+        broken[len(broken) // 2] ^= 0xFF
+        self.files["/delta.patch"] = bytes(broken)
+        self.assertFalse(self.fetch())
+        self.assertEqual(self.gets[-1], "/full.zip")
+
+    def test_falls_back_when_installed_artifact_differs(self) -> None:
+        data = bytearray(self.installed.read_bytes())
+        data[0] ^= 1
+        self.installed.write_bytes(bytes(data))
+        self.assertFalse(self.fetch())
+        self.assertEqual(self.gets[-1], "/full.zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""Downloader 对本地 Range 服务器的测试：并行分段、断线续传、If-Range 失效、SHA-256 校验、拒绝 HEAD。"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.downloader import Downloader, DownloadError, HashMismatch
+from tests.local_server import LocalServer, QuietHandler
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+class _RangeHandler(QuietHandler):
+    """按 server 上的 content / etag 提供文件，支持 Range 与 If-Range。
+
+    server.drop_after 不为 None 时，下一个 GET 只发出这么多字节就断开连接（仅一次）；
+    server.replace_on_drop 为真时，断开的同时把文件换成同样大小的新内容（ETag "v2"）；
+    server.reject_head 为真时 HEAD 一律回 405。
+    """
+
+    def _info(self) -> Tuple[bytes, str]:
+        return self.server.content, self.server.etag  # type: ignore[attr-defined]
+
+    def do_HEAD(self) -> None:
+        srv = self.server
+        srv.requests.append(("HEAD", dict(self.headers)))  # type: ignore[attr-defined]
+        if srv.reject_head:  # type: ignore[attr-defined]
+            self.send_response(405)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content, etag = self._info()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        srv = self.server
+        srv.requests.append(("GET", dict(self.headers)))  # type: ignore[attr-defined]
+        content, etag = self._info()
+        start, end = 0, len(content)
+        partial = False
+        m = _RANGE_RE.match(self.headers.get("Range") or "")
+        if_range = self.headers.get("If-Range")
+        if m and (if_range is None or if_range == etag):
+            start = int(m.group(1))
+            end = min(len(content), int(m.group(2)) + 1) if m.group(2) else len(content)
+            partial = True
+        body = content[start:end]
+        self.send_response(206 if partial else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        if partial:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(content)}")
+        self.end_headers()
+        with srv.lock:  # type: ignore[attr-defined]
+            drop, srv.drop_after = srv.drop_after, None  # type: ignore[attr-defined]
+            srv.in_flight += 1  # type: ignore[attr-defined]
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)  # type: ignore[attr-defined]
+        try:
+            if drop is not None:
+                self.wfile.write(body[:drop])
+                self.wfile.flush()
+                self.close_connection = True
+                if srv.replace_on_drop:  # type: ignore[attr-defined]
+                    srv.content = os.urandom(len(content))  # type: ignore[attr-defined]
+                    srv.etag = '"v2"'  # type: ignore[attr-defined]
+                return
+            for i in range(0, len(body), 64 * 1024):
+                self.wfile.write(body[i:i + 64 * 1024])
+                time.sleep(srv.delay)  # type: ignore[attr-defined]
+        finally:
+            with srv.lock:  # type: ignore[attr-defined]
+                srv.in_flight -= 1  # type: ignore[attr-defined]
+
+
+class DownloaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = LocalServer(_RangeHandler).start()
+        httpd = self.server.httpd
+        httpd.content = os.urandom(1024 * 1024)  # type: ignore[attr-defined]
+        httpd.etag = '"v1"'  # type: ignore[attr-defined]
+        httpd.requests = []  # type: ignore[attr-defined]
+        httpd.drop_after = None  # type: ignore[attr-defined]
+        httpd.replace_on_drop = False  # type: ignore[attr-defined]
+        httpd.reject_head = False  # type: ignore[attr-defined]
+        httpd.delay = 0.0  # type: ignore[attr-defined]
+        httpd.lock = threading.Lock()  # type: ignore[attr-defined]
+        httpd.in_flight = httpd.max_in_flight = 0  # type: ignore[attr-defined]
+        self.dir = Path(tempfile.mkdtemp())
+        self.dest = self.dir / "file.bin"
+        self.downloaders: List[Downloader] = []
+
+    def tearDown(self) -> None:
+        for dl in self.downloaders:
+            dl.close()
+        self.server.stop()
+
+    @property
+    def httpd(self):  # type: ignore[no-untyped-def]
+        return self.server.httpd
+
+    def downloader(self, **kw: int) -> Downloader:
+        opts: Dict[str, int] = {"workers": 4, "parallel_threshold": 64 * 1024, "chunk_size": 16 * 1024, "timeout": 5}
+        opts.update(kw)
+        dl = Downloader(**opts)
+        self.downloaders.append(dl)
+        return dl
+
+    def gets(self) -> List[Dict[str, str]]:
+        return [h for m, h in self.httpd.requests if m == "GET"]
+
+    def sha(self, data: Optional[bytes] = None) -> str:
+        return hashlib.sha256(self.httpd.content if data is None else data).hexdigest()
+
+    def test_parallel_ranges(self) -> None:
+        self.httpd.delay = 0.02
+        got: List[Tuple[int, Optional[int]]] = []
+        self.downloader().download(self.server.url("/f"), self.dest, sha256=self.sha(), progress=lambda d, t: got.append((d, t)))
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+        starts = sorted(int(_RANGE_RE.match(h["Range"]).group(1)) for h in self.gets())  # type: ignore[union-attr]
+        self.assertEqual(starts, [0, 256 * 1024, 512 * 1024, 768 * 1024])
+        self.assertGreater(self.httpd.max_in_flight, 1)
+        self.assertEqual(got[-1], (len(self.httpd.content), len(self.httpd.content)))
+        self.assertFalse(self.dest.with_suffix(".bin.tmp").exists())
+        self.assertFalse(self.dest.with_suffix(".bin.tmp.json").exists())
+
+    def test_dropped_connection_is_retried(self) -> None:
+        self.httpd.drop_after = 10_000
+        self.downloader(workers=1).download(self.server.url("/f"), self.dest, sha256=self.sha())
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+        retry = self.gets()[1]
+        self.assertTrue(retry["Range"].startswith("bytes="))
+        self.assertGreater(int(_RANGE_RE.match(retry["Range"]).group(1)), 0)  # type: ignore[union-attr]
+        self.assertEqual(retry.get("If-Range"), '"v1"')
+
+    def test_resume_after_failed_download(self) -> None:
+        self.httpd.drop_after = 100_000
+        with self.assertRaises(DownloadError):
+            self.downloader(workers=1, retries=0).download(self.server.url("/f"), self.dest)
+        self.assertTrue(self.dest.with_suffix(".bin.tmp.json").exists())
+        self.httpd.requests.clear()
+        self.downloader(workers=1).download(self.server.url("/f"), self.dest, sha256=self.sha())
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+        (resume,) = self.gets()
+        start = int(_RANGE_RE.match(resume["Range"]).group(1))  # type: ignore[union-attr]
+        self.assertGreaterEqual(start, 16 * 1024)  # 已写入的部分不再下载
+        self.assertEqual(resume.get("If-Range"), '"v1"')
+
+    def test_if_range_change_restarts(self) -> None:
+        self.httpd.drop_after = 100_000
+        with self.assertRaises(DownloadError):
+            self.downloader(workers=1, retries=0).download(self.server.url("/f"), self.dest)
+        # 远端文件在两次下载之间被替换：大小相同、ETag 不同
+        self.httpd.content = os.urandom(len(self.httpd.content))
+        self.httpd.etag = '"v2"'
+        self.downloader(workers=1).download(self.server.url("/f"), self.dest, sha256=self.sha())
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+
+    def test_if_range_change_during_download(self) -> None:
+        # 下载中途断线，重试前远端已被替换：If-Range 不匹配，服务器回 200，整体重新开始
+        self.httpd.drop_after = 100_000
+        self.httpd.replace_on_drop = True
+        self.downloader(workers=1).download(self.server.url("/f"), self.dest)
+        self.assertEqual(self.httpd.etag, '"v2"')
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+        self.assertEqual(self.gets()[1].get("If-Range"), '"v1"')
+
+    def test_sha256_mismatch(self) -> None:
+        with self.assertRaises(HashMismatch):
+            self.downloader().download(self.server.url("/f"), self.dest, sha256=self.sha(b"other"))
+        self.assertFalse(self.dest.exists())
+        self.assertFalse(self.dest.with_suffix(".bin.tmp").exists())
+        self.assertFalse(self.dest.with_suffix(".bin.tmp.json").exists())
+
+    def test_head_rejected_falls_back_to_ranged_get(self) -> None:
+        self.httpd.reject_head = True
+        self.downloader().download(self.server.url("/f"), self.dest, sha256=self.sha())
+        self.assertEqual(self.dest.read_bytes(), self.httpd.content)
+        self.assertEqual(self.gets()[0].get("Range"), "bytes=0-0")
+        self.assertEqual(len(self.gets()), 5)  # 探测 + 4 个并行分段
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""SettingsStore 的测试：本地修改写盘时不能覆盖掉外部对 settings.json 的修改。"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+from src import settings_manager
+from src.settings_manager import SettingsStore
+
+
+class SettingsStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.file = Path(tempfile.mkdtemp()) / "settings.json"
+        patcher = mock.patch.object(settings_manager, "SETTINGS_FILE", self.file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = SettingsStore(delay=60)
+        self.addCleanup(self.store.flush)
+        self.events: List[Tuple[Dict[str, Any], bool]] = []
+        self.store.subscribe(lambda changed, external: self.events.append((changed, external)))
+
+    def edit_externally(self, **changes: Any) -> None:
+        data = json.loads(self.file.read_text(encoding="utf-8"))
+        data.update(changes)
+        self.file.write_text(json.dumps(data), encoding="utf-8")
+        st = os.stat(self.file)
+        os.utime(self.file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # 确保文件戳一定变化
+
+    def saved(self) -> Dict[str, Any]:
+        return json.loads(self.file.read_text(encoding="utf-8"))
+
+    def test_update_keeps_external_edit(self) -> None:
+        self.edit_externally(theme="dark")
+        self.store.update({"language": "en"})
+        self.store.flush()
+        self.assertEqual(self.saved()["theme"], "dark")
+        self.assertEqual(self.saved()["language"], "en")
+        self.assertEqual(self.events, [({"theme": "dark"}, True), ({"language": "en"}, False)])
+
+    def test_unsaved_local_edit_wins(self) -> None:
+        self.store.update({"theme": "dark"})
+        self.edit_externally(theme="light", language="en")
+        self.store.update({"encoding": "GBK"})
+        self.store.flush()
+        self.assertEqual(self.saved()["theme"], "dark")
+        self.assertEqual(self.saved()["encoding"], "GBK")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""UpdateService 对本地 HTTP 替身的测试：首次请求、304 续期、TTL 命中、网络错误退回缓存。"""
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.update_checker import UpdateService
+from tests.local_server import LocalServer, QuietHandler
+
+
+def _release(tag: str) -> Dict[str, Any]:
+    return {
+        "tag_name": tag,
+        "assets": [{
+            "name": "PracticeApp.zip",
+            "browser_download_url": "http://example.invalid/PracticeApp.zip",
+            "size": 3,
+            "digest": "sha256:" + "ab" * 32,
+        }],
+    }
+
+
+class _ReleaseHandler(QuietHandler):
+    """releases/latest 的替身：带 ETag，If-None-Match 命中时回 304。"""
+
+    def do_GET(self) -> None:
+        srv = self.server
+        srv.requests.append(dict(self.headers))  # type: ignore[attr-defined]
+        etag = srv.etag  # type: ignore[attr-defined]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(srv.release).encode("utf-8")  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Mon, 01 Sep 2025 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UpdateServiceTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = LocalServer(_ReleaseHandler).start()
+        self.server.httpd.release = _release("v1.2.0")  # type: ignore[attr-defined]
+        self.server.httpd.etag = '"r1"'  # type: ignore[attr-defined]
+        self.server.httpd.requests = []  # type: ignore[attr-defined]
+        self.cache_path = Path(tempfile.mkdtemp()) / "update_check.json"
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    @property
+    def requests(self) -> List[Dict[str, str]]:
+        return self.server.httpd.requests  # type: ignore[attr-defined]
+
+    def service(self, ttl: float = 0) -> UpdateService:
+        return UpdateService("1.0.0", api_url=self.server.url("/releases/latest"), cache_path=self.cache_path, ttl=ttl, timeout=5)
+
+    def test_first_check_fetches_and_caches(self) -> None:
+        res = self.service().check()
+        self.assertEqual(res["source"], "network")
+        self.assertTrue(res["update_available"])
+        self.assertEqual(res["latest_version"], "v1.2.0")
+        self.assertEqual(res["assets"][0].sha256, "ab" * 32)
+        self.assertEqual(len(self.requests), 1)
+        self.assertNotIn("If-None-Match", self.requests[0])
+        cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        self.assertEqual(cached["etag"], '"r1"')
+
+    def test_conditional_request_gets_304(self) -> None:
+        svc = self.service()
+        svc.check()
+        res = svc.check()
+        self.assertEqual(res["source"], "not_modified")
+        self.assertEqual(res["latest_version"], "v1.2.0")
+        self.assertEqual(self.requests[1].get("If-None-Match"), '"r1"')
+        self.assertEqual(self.requests[1].get("If-Modified-Since"), "Mon, 01 Sep 2025 00:00:00 GMT")
+
+    def test_changed_release_replaces_cache(self) -> None:
+        svc = self.service()
+        svc.check()
+        self.server.httpd.release = _release("v1.3.0")  # type: ignore[attr-defined]
+        self.server.httpd.etag = '"r2"'  # type: ignore[attr-defined]
+        res = svc.check()
+        self.assertEqual(res["source"], "network")
+        self.assertEqual(res["latest_version"], "v1.3.0")
+        self.assertEqual(svc.load_cache().etag, '"r2"')  # type: ignore[union-attr]
+
+    def test_ttl_hit_sends_no_request(self) -> None:
+        svc = self.service(ttl=3600)
+        first = svc.check()
+        res = svc.check()
+        self.assertEqual(res["source"], "cache")
+        self.assertEqual(res["checked_at"], first["checked_at"])
+        self.assertEqual(len(self.requests), 1)
+        # force 跳过 TTL，但仍是条件请求
+        self.assertEqual(svc.check(force=True)["source"], "not_modified")
+        self.assertEqual(len(self.requests), 2)
+
+    def test_network_error_returns_stale_cache(self) -> None:
+        svc = self.service()
+        svc.check()
+        self.server.stop()
+        res = svc.check()
+        self.assertEqual(res["source"], "stale")
+        self.assertEqual(res["latest_version"], "v1.2.0")
+        self.assertTrue(res["update_available"])
+        self.assertTrue(res.get("error"))
+
+    def test_non_object_body_is_an_error_and_not_cached(self) -> None:
+        self.server.httpd.release = [_release("v9.0.0")]  # type: ignore[attr-defined]
+        svc = self.service(ttl=3600)
+        res = svc.check()
+        self.assertEqual(res["source"], "error")
+        self.assertTrue(res.get("error"))
+        self.assertFalse(self.cache_path.exists())
+        # 之后的检查仍会请求服务器，而不是命中一份坏缓存
+        self.server.httpd.release = _release("v1.2.0")  # type: ignore[attr-defined]
+        self.assertEqual(svc.check()["source"], "network")
+
+    def test_non_object_body_with_cache_returns_stale(self) -> None:
+        svc = self.service()
+        svc.check()
+        self.server.httpd.release = ["not", "a", "release"]  # type: ignore[attr-defined]
+        self.server.httpd.etag = '"r2"'  # type: ignore[attr-defined]
+        res = svc.check()
+        self.assertEqual(res["source"], "stale")
+        self.assertEqual(res["latest_version"], "v1.2.0")
+        self.assertTrue(res.get("error"))
+        self.assertEqual(svc.load_cache().etag, '"r1"')  # type: ignore[union-attr]
+
+    def test_background_check_always_calls_back(self) -> None:
+        svc = self.service()
+        got: List[dict] = []
+        done = threading.Event()
+
+        def callback(res: dict) -> None:
+            got.append(res)
+            done.set()
+
+        def boom(force: bool = False) -> dict:
+            raise RuntimeError("boom")
+
+        svc.check = boom  # type: ignore[method-assign]
+        svc.check_in_background(callback).join(5)
+        self.assertTrue(done.is_set())
+        self.assertEqual(got[0]["source"], "error")
+        self.assertIn("boom", got[0]["error"])
+
+    def test_network_error_without_cache(self) -> None:
+        self.server.stop()
+        res = self.service().check()
+        self.assertEqual(res["source"], "error")
+        self.assertFalse(res["update_available"])
+        self.assertIsNone(res["checked_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""zone_geometry 的测试：候选点对不漏报，非有限或超大坐标不产生 RuntimeWarning 而是报告为越界。"""
+from __future__ import annotations
+
+import unittest
+import warnings
+
+import numpy as np
+
+from src.zone_geometry import analyze_geometry, candidate_pairs
+
+
+def _brute_pairs(xyz: np.ndarray, cell: float) -> set:
+    d = np.linalg.norm(xyz[:, None] - xyz[None], axis=2)
+    i, j = np.nonzero(np.triu(d < cell, 1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def _area(x, r=1.0) -> dict:
+    return {"type": "sphere", "stage": "Park", "x": x, "y": 0, "z": 0, "r": r}
+
+
+class CandidatePairsTest(unittest.TestCase):
+    def test_finds_every_close_pair(self) -> None:
+        rng = np.random.default_rng(7)
+        for spread, cell in ((10.0, 1.0), (5000.0, 0.05), (1e6, 0.05)):
+            xyz = rng.uniform(-spread, spread, (300, 3))
+            xyz[150:] = xyz[:150] + rng.uniform(-cell, cell, (150, 3)) / 2  # 保证有近邻
+            i, j = candidate_pairs(xyz, cell)
+            self.assertTrue((i < j).all())
+            self.assertLessEqual(_brute_pairs(xyz, cell), set(zip(i.tolist(), j.tolist())))
+
+    def test_skips_non_finite_and_huge_points(self) -> None:
+        xyz = np.array([[0, 0, 0], [1e300, 0, 0], [np.inf, 0, 0], [0.01, 0, 0], [np.nan, 0, 0], [-1e300, 0, 0]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            i, j = candidate_pairs(xyz, 0.05)
+        self.assertEqual(list(zip(i.tolist(), j.tolist())), [(0, 3)])
+
+
+class AnalyzeGeometryTest(unittest.TestCase):
+    def test_reports_unusable_coordinates_as_out_of_bounds(self) -> None:
+        mission = {
+            "zones": [
+                {"id": "a", "areas": [_area(0, 3), _area(1e300), _area(10 ** 400), _area(0, float("nan"))]},
+                {"id": "b", "areas": [_area(float("inf")), _area(1)]},
+            ],
+            "checkpoints": [
+                {"condition": {"oncomplete": [{"type": "dropItem", "stage": "Park", "x": float("-inf"), "y": 0, "z": 0}]}}
+            ],
+        }
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            findings = analyze_geometry(mission)
+        bad = [f.pointer for f in findings if f.kind == "out_of_bounds"]
+        self.assertEqual(
+            bad,
+            ["/zones/0/areas/1", "/zones/0/areas/2", "/zones/0/areas/3", "/zones/1/areas/0", "/checkpoints/0/condition/oncomplete/0"],
+        )
+        # 其余正常的区域照常检查
+        self.assertIn(("contained", "/zones/1/areas/1"), [(f.kind, f.pointer) for f in findings])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""命令行批量校验任务库（无需 PyQt）。
+
+用法：
+    python validate_missions.py [目录] [--json report.json] [--junit report.xml]
+
+退出码：0 全部通过；1 存在问题；2 参数错误。
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from src.batch_validator import validate_directory, write_reports
+from src.condition_dsl import ConditionVocabulary
+from src.config import CACHE_DIR, CUSTOM_MISSIONS_DIR
+from src.zone_geometry import StageBounds
+
+
+DEFAULT_CACHE = CACHE_DIR / "validation_cache.json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="校验目录树下的全部任务 JSON")
+    ap.add_argument("root", nargs="?", type=Path, default=CUSTOM_MISSIONS_DIR, help="任务目录（默认为程序的 CustomMissions）")
+    ap.add_argument("--json", type=Path, help="写出 JSON 报告")
+    ap.add_argument("--junit", type=Path, help="写出 JUnit-XML 报告")
+    ap.add_argument("--jobs", "-j", type=int, default=None, help="进程数（默认 CPU 核数，0/1 为单进程）")
+    ap.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="结果缓存文件")
+    ap.add_argument("--no-cache", action="store_true", help="不读写缓存")
+    ap.add_argument("--vocab", type=Path, help="从该目录挖掘条件词表，用于提示拼写错误")
+    ap.add_argument("--bounds", type=Path, help="从该目录统计各场景的坐标范围，用于检查越界坐标")
+    ap.add_argument("--quiet", "-q", action="store_true", help="只输出汇总")
+    args = ap.parse_args(argv)
+
+    if not args.root.is_dir():
+        print(f"目录不存在：{args.root}", file=sys.stderr)
+        return 2
+    vocabulary = ConditionVocabulary.from_directory(args.vocab) if args.vocab else None
+    bounds = StageBounds.from_directory(args.bounds) if args.bounds else None
+    report = validate_directory(
+        args.root,
+        cache_path=None if args.no_cache else args.cache,
+        vocabulary=vocabulary,
+        bounds=bounds,
+        workers=args.jobs,
+    )
+    write_reports(report, args.json, args.junit)
+
+    if not args.quiet:
+        for r in report.failed:
+            print(r.path)
+            for i in r.issues:
+                loc = f"{i.line}:{i.column}" if i.line is not None else "-"
+                print(f"  {loc:>9}  [{i.kind}] {i.message}")
+    print(
+        f"{len(report.results)} 个文件，{len(report.failed)} 个有问题，"
+        f"缓存命中 {report.cached_count}，耗时 {report.elapsed:.3f}s"
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())